@@ -3,6 +3,7 @@ from __future__ import annotations
 import argparse
 from pathlib import Path
 
+from NCAA_BBALL_MODELING.gamelog_scraping import configure_cache
 from NCAA_BBALL_MODELING.pipelines.engineering import run_engineering
 from NCAA_BBALL_MODELING.pipelines.modeling import run_modeling_pipeline
 
@@ -26,6 +27,21 @@ def parse_args() -> argparse.Namespace:
         action="store_true",
         help="Skip the feature creation step.",
     )
+    parser.add_argument(
+        "--full-features",
+        action="store_true",
+        help="Rebuild the season's features from scratch instead of updating incrementally.",
+    )
+    parser.add_argument(
+        "--verify-features",
+        action="store_true",
+        help="After an incremental update, diff the features against a full rebuild.",
+    )
+    parser.add_argument(
+        "--lazy-features",
+        action="store_true",
+        help="Score from the gamelogs, building only the model's features (skips the feature step).",
+    )
     parser.add_argument(
         "--run-modeling",
         action="store_true",
@@ -48,6 +64,45 @@ def parse_args() -> argparse.Namespace:
         type=int,
         help="Only update first N teams found on --date (checker mode).",
     )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=4,
+        help="Concurrent team scrapes during the update step.",
+    )
+    parser.add_argument(
+        "--requests-per-minute",
+        type=float,
+        help="Global Sports Reference request budget (default: 15).",
+    )
+    parser.add_argument(
+        "--no-mirror",
+        action="store_true",
+        help="Scrape both teams of every game instead of mirroring one side.",
+    )
+    parser.add_argument(
+        "--cache-max-age",
+        type=float,
+        help=(
+            "Seconds a cached page is served without revalidating (default: 0, "
+            "always revalidate; -1 never expires). Raise it for crash reruns and backfills."
+        ),
+    )
+    parser.add_argument(
+        "--refresh",
+        action="store_true",
+        help="Ignore the HTTP cache and re-download every page.",
+    )
+    parser.add_argument(
+        "--offline",
+        action="store_true",
+        help="Only serve pages from the HTTP cache; never hit the network.",
+    )
+    parser.add_argument(
+        "--export-xlsx",
+        action="store_true",
+        help="Also write the updated season to NCAAB_<season>_Team_Gamelogs_now.xlsx.",
+    )
 
     return parser.parse_args()
 
@@ -56,17 +111,29 @@ def main() -> None:
     args = parse_args()
 
     run_update = not args.skip_update
-    run_features = not args.skip_features
+    run_features = not args.skip_features and not args.lazy_features
 
     if run_update and not args.target_date:
         raise SystemExit("--date is required unless --skip-update is set")
 
+    configure_cache(
+        max_age=args.cache_max_age,
+        force_refresh=args.refresh,
+        offline=args.offline,
+    )
+
     features_path = run_engineering(
         target_date=args.target_date,
         season=args.season,
         run_update=run_update,
         run_features=run_features,
+        full_features=args.full_features,
+        verify_features=args.verify_features,
         max_teams=args.max_teams,
+        workers=args.workers,
+        requests_per_minute=args.requests_per_minute,
+        mirror=not args.no_mirror,
+        export_xlsx=args.export_xlsx,
     )
 
     if args.run_modeling:
@@ -75,6 +142,7 @@ def main() -> None:
             features_path=args.features_path or features_path,
             predictions_path=args.predictions_path,
             season_test=args.season,
+            lazy_features=args.lazy_features,
         )
 
 
@@ -3,31 +3,10 @@ import pandas as pd
 from pathlib import Path
 
 
-RENAME_MAP = {
-    "Texas A&M–Commerce": "East Texas A&M",
-    "Texas–Rio Grande Valley": "Texas-Rio Grande Valley",
-    "Sam Houston State": "Sam Houston",
-    "USC Upstate": "South Carolina Upstate",
-    "Arkansas–Pine Bluff": "Arkansas-Pine Bluff",
-    "UNLV": "Nevada-Las Vegas",
-    "Prairie View A&M": "Prairie View",
-    "Grambling State": "Grambling",
-    "LIU": "Long Island University",
-    "Loyola Chicago": "Loyola (IL)",
-    "UMBC": "Maryland-Baltimore County",
-    "UMass Lowell": "Massachusetts-Lowell",
-    "Ole Miss": "Mississippi",
-    "Texas A&M–Corpus Christi": "Texas A&M-Corpus Christi",
-    "Louisiana–Monroe": "Louisiana-Monroe",
-    "UT Martin": "Tennessee-Martin",
-    "Illinois–Chicago": "Illinois-Chicago",
-    "St. Mary's (CA)": "Saint Mary's (CA)",
-    "Fairleigh Dickinson": "FDU",
-    "Maryland Eastern Shore": "Maryland-Eastern Shore",
-    "IUPUI": "IU Indy",
-    "SMU": "Southern Methodist",
-    "VCU": "Virginia Commonwealth",
-}
+try:
+    from NCAA_BBALL_MODELING.teams import RENAME_MAP
+except ImportError:
+    from teams import RENAME_MAP
 
 
 def clean_gamelogs(df, rename_map=RENAME_MAP):
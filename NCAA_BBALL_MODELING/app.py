@@ -1,21 +1,65 @@
 import pandas as pd
 import streamlit as st
 from pathlib import Path
+from typing import Optional
+
+try:
+    from NCAA_BBALL_MODELING import warehouse
+except ImportError:
+    import warehouse
 
 
 DATA_PATH = Path(__file__).resolve().parent / "data" / "predictions.csv"
 
+# What the table shows; other columns in a full predictions file are not read.
+DISPLAY_COLUMNS = [
+    "date",
+    "school_name",
+    "opp_name_abbr",
+    "pred_final",
+    "pred_baseline",
+    "pred_residual",
+    "is_Home",
+    "team_game_score",
+    "opp_team_game_score",
+    "score_diff",
+    "KenPom_spread",
+    "kenpom_favorite",
+    "kenpom_spread_for_school",
+]
+
 
 @st.cache_data
-def load_predictions(path: Path) -> pd.DataFrame:
-    df = pd.read_csv(path)
+def load_predictions(path: Path, columns: Optional[list[str]] = None) -> pd.DataFrame:
+    wanted = set(DISPLAY_COLUMNS if columns is None else columns)
+    df = pd.read_csv(path, usecols=lambda column: column in wanted)
     if "date" in df.columns:
         df["date"] = pd.to_datetime(df["date"], errors="coerce")
     return df
 
+
+@st.cache_data
+def load_prediction_dates() -> list:
+    return warehouse.prediction_dates()
+
+
+@st.cache_data
+def load_predictions_on_date(date) -> pd.DataFrame:
+    return warehouse.predictions_on_date(date, columns=DISPLAY_COLUMNS)
+
+
 st.set_page_config(page_title="NCAAB Predictions", layout="wide")
 st.title("NCAAB Daily Predictions")
 
+# The warehouse serves one date per query; predictions.csv is the fallback.
+dates = load_prediction_dates()
+if dates:
+    selected = st.date_input(
+        "Date", value=dates[-1].date(), min_value=dates[0].date(), max_value=dates[-1].date()
+    )
+    st.dataframe(load_predictions_on_date(selected), use_container_width=True)
+    st.stop()
+
 if not DATA_PATH.exists():
     st.error(f"Missing predictions file: {DATA_PATH}")
     st.stop()
@@ -0,0 +1 @@
+"""Offline benchmarks and parity checks for the scraping and feature code."""
@@ -0,0 +1,85 @@
+"""Warm-started adjusted ratings vs solving every date from scratch.
+
+Builds four synthetic seasons through ``add_features`` and fits the
+point-in-time adjusted ratings of every row three ways: CG warm-started from
+the previous date (the default), CG from zero on every date, and a direct
+sparse solve of every date's system. Fails if the CG ratings stray from the
+direct ones by more than ``--atol`` points per 100 possessions.
+
+    python -m NCAA_BBALL_MODELING.benchmarks.bench_adjusted_ratings [--teams N]
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+
+import numpy as np
+from scipy.sparse.linalg import spsolve
+
+try:
+    from NCAA_BBALL_MODELING import utils
+    from NCAA_BBALL_MODELING.benchmarks.bench_rolling_features import synthetic_possessions
+    from NCAA_BBALL_MODELING.ratings import NormalEquations, adjusted_ratings
+    from NCAA_BBALL_MODELING.schema import compact_frame
+except ImportError:
+    import utils
+    from benchmarks.bench_rolling_features import synthetic_possessions
+    from ratings import NormalEquations, adjusted_ratings
+    from schema import compact_frame
+
+
+class DirectEquations(NormalEquations):
+    """The same system, factorized and solved exactly on every date."""
+
+    def solve(self, x0=None):
+        return spsolve(self.matrix.tocsc(), self.rhs)
+
+
+def fit(frame, warm_start: bool = True, equations=NormalEquations):
+    """(ratings, seconds, CG iterations) of one ``adjusted_ratings`` run."""
+    systems = []
+
+    def make(n_teams):
+        systems.append(equations(n_teams))
+        return systems[-1]
+
+    start = time.perf_counter()
+    ratings = adjusted_ratings(frame, warm_start=warm_start, equations=make)
+    seconds = time.perf_counter() - start
+    return ratings.to_numpy(), seconds, sum(system.iterations for system in systems)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--teams", type=int, default=360, help="Teams per season.")
+    parser.add_argument("--dates", type=int, default=120, help="Game dates per season.")
+    parser.add_argument("--atol", type=float, default=1e-3, help="Allowed rating error.")
+    args = parser.parse_args()
+
+    frame = compact_frame(utils.add_features(synthetic_possessions(args.teams, args.dates)))
+    n_dates = frame.groupby("season", observed=True)["date"].nunique().sum()
+    print(f"{len(frame)} rows, {frame['season'].nunique()} seasons, {n_dates} solves")
+
+    warm, warm_seconds, warm_iterations = fit(frame)
+    cold, cold_seconds, cold_iterations = fit(frame, warm_start=False)
+    direct, direct_seconds, _ = fit(frame, equations=DirectEquations)
+    errors = {
+        "warm": np.abs(warm - direct).max(),
+        "cold": np.abs(cold - direct).max(),
+    }
+    if max(errors.values()) > args.atol:
+        print(f"❌ CG ratings differ from the direct solve by up to {max(errors.values()):.2g}")
+        return 1
+    print(f"✅ Parity: CG within {errors['warm']:.1g} (warm) / {errors['cold']:.1g} (cold) of direct")
+
+    print(f"direct solve: {direct_seconds:.2f}s")
+    print(f"     cold CG: {cold_seconds:.2f}s, {cold_iterations} iterations")
+    print(f"     warm CG: {warm_seconds:.2f}s, {warm_iterations} iterations")
+    print(f"Speedup vs direct: {direct_seconds / warm_seconds:.1f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,85 @@
+"""Peak memory of the feature build with default dtypes vs the compact schema.
+
+Writes a synthetic multi-season gamelog store to a scratch directory, runs
+the feature stages once on frames widened to pandas' default dtypes and once
+through ``create_features``, and prints the traced peak of each plus a
+per-dtype memory report of the finished feature matrix.
+
+    python -m NCAA_BBALL_MODELING.benchmarks.bench_feature_memory [--teams N]
+"""
+
+from __future__ import annotations
+
+import argparse
+import contextlib
+import io
+import sys
+import tempfile
+import tracemalloc
+from pathlib import Path
+
+import pandas as pd
+
+try:
+    from NCAA_BBALL_MODELING import utils
+    from NCAA_BBALL_MODELING.benchmarks.corpus import synthesize_schedule
+    from NCAA_BBALL_MODELING.matrix_cache import read_csv_cached
+    from NCAA_BBALL_MODELING.schema import memory_report, widen_frame
+    from NCAA_BBALL_MODELING.storage import read_gamelogs, write_gamelogs
+except ImportError:
+    import utils
+    from benchmarks.corpus import synthesize_schedule
+    from matrix_cache import read_csv_cached
+    from schema import memory_report, widen_frame
+    from storage import read_gamelogs, write_gamelogs
+
+
+def traced_peak_mb(func) -> float:
+    """Peak bytes allocated while ``func`` runs, in MB."""
+    tracemalloc.start()
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            func()
+        return tracemalloc.get_traced_memory()[1] / 1e6
+    finally:
+        tracemalloc.stop()
+
+
+def build_default_dtypes(base_dir: Path) -> pd.DataFrame:
+    """The feature stages as they ran before the compact schema."""
+    all_df = widen_frame(read_gamelogs(utils.TRAINING_SEASONS, base_dir=base_dir))
+    clean_df = utils.clean_gamelogs(all_df)
+    merged_df = utils.calculate_possessions(clean_df)
+    added_df = utils.add_adjusted_ratings(utils.add_features(merged_df))
+    added_df = utils.add_schedule_strength(added_df)
+    return utils.add_opponent_features(added_df)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--teams", type=int, default=120, help="Teams per season.")
+    parser.add_argument("--dates", type=int, default=30, help="Game dates per season.")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as scratch:
+        base_dir = Path(scratch)
+        frames = [
+            synthesize_schedule(
+                args.teams, season=season, n_dates=args.dates, n_future_dates=0, seed=season
+            )[1]
+            for season in utils.TRAINING_SEASONS
+        ]
+        with contextlib.redirect_stdout(io.StringIO()):
+            write_gamelogs(pd.concat(frames, ignore_index=True), base_dir=base_dir)
+
+        default_peak = traced_peak_mb(lambda: build_default_dtypes(base_dir))
+        compact_peak = traced_peak_mb(lambda: utils.create_features(base_dir=base_dir))
+        print(f"Peak in create_features: {default_peak:.1f} MB default -> {compact_peak:.1f} MB compact")
+
+        features = read_csv_cached(base_dir / "data" / "merged_dataset.csv")
+        print(memory_report(features, "merged_dataset").round(2).to_string())
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,124 @@
+"""Lazy feature registry vs the full feature build.
+
+Writes a synthetic season to a scratch gamelog store, then:
+
+* checks that ``compute_features`` reproduces every column the full build
+  (``add_features``, the season-wide ratings and schedule strength,
+  ``add_opponent_features``) adds, value for value;
+* times the full build against ``build_features`` for the shipped model's
+  feature lists, both starting from the stored gamelogs.
+
+    python -m NCAA_BBALL_MODELING.benchmarks.bench_feature_registry [--teams N]
+"""
+
+from __future__ import annotations
+
+import argparse
+import contextlib
+import io
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+try:
+    from NCAA_BBALL_MODELING import feature_registry, utils
+    from NCAA_BBALL_MODELING.benchmarks.corpus import synthesize_schedule
+    from NCAA_BBALL_MODELING.pipelines import modeling
+    from NCAA_BBALL_MODELING.schema import compact_frame
+    from NCAA_BBALL_MODELING.storage import read_gamelogs, write_gamelogs
+except ImportError:
+    import feature_registry
+    import utils
+    from benchmarks.corpus import synthesize_schedule
+    from pipelines import modeling
+    from schema import compact_frame
+    from storage import read_gamelogs, write_gamelogs
+
+
+SEASON = 2026
+
+
+def full_build(base_dir: Path) -> pd.DataFrame:
+    """The season as the stage pipeline builds it, every feature included."""
+    frame = utils.clean_gamelogs(read_gamelogs([SEASON], base_dir=base_dir))
+    frame = compact_frame(utils.calculate_possessions(frame))
+    frame = compact_frame(utils.add_adjusted_ratings(compact_frame(utils.add_features(frame))))
+    frame = compact_frame(utils.add_schedule_strength(frame))
+    return compact_frame(utils.add_opponent_features(frame))
+
+
+def same_values(expected: pd.Series, actual: pd.Series) -> bool:
+    if pd.api.types.is_datetime64_any_dtype(expected.dtype):
+        return expected.equals(actual)
+    if isinstance(expected.dtype, pd.CategoricalDtype):
+        expected = expected.astype(object)
+        if pd.api.types.is_numeric_dtype(actual.dtype):
+            expected = pd.to_numeric(expected)
+    if pd.api.types.is_numeric_dtype(expected.dtype):
+        return np.array_equal(
+            expected.to_numpy(dtype=np.float64, na_value=np.nan),
+            actual.to_numpy(dtype=np.float64, na_value=np.nan),
+            equal_nan=True,
+        )
+    return (expected.astype(str).to_numpy() == actual.astype(str).to_numpy()).all()
+
+
+def best_of(func, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--teams", type=int, default=360, help="Teams in the season.")
+    parser.add_argument("--dates", type=int, default=60, help="Game dates in the season.")
+    parser.add_argument("--repeat", type=int, default=3, help="Timing repeats.")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as scratch:
+        base_dir = Path(scratch)
+        _, raw = synthesize_schedule(args.teams, season=SEASON, n_dates=args.dates, seed=SEASON)
+        with contextlib.redirect_stdout(io.StringIO()):
+            write_gamelogs(raw, base_dir=base_dir)
+
+        full = full_build(base_dir)
+        stored = set(utils.clean_gamelogs(read_gamelogs([SEASON], base_dir=base_dir)).columns)
+        added = [c for c in full.columns if c not in stored | set(feature_registry.POSSESSION_COLUMNS)]
+        lazy = feature_registry.build_features(
+            feature_registry.SORT_KEY + added, SEASON, base_dir=base_dir
+        )
+        mismatches = [c for c in added if not same_values(full[c], lazy[c])]
+        if len(full) != len(lazy) or mismatches:
+            print(f"❌ Registry differs from the full build in: {', '.join(mismatches) or 'row count'}")
+            return 1
+        print(f"✅ Parity: {len(full)} rows, all {len(added)} engineered columns match")
+
+        names = modeling.PREDICTION_COLUMNS + modeling.feature_columns(
+            modeling.DEFAULT_BASELINE_FEATURES + modeling.DEFAULT_RESIDUAL_FEATURES
+        )
+        features, _ = feature_registry.plan(names, feature_registry.BASE_COLUMNS)
+        columns = feature_registry.gamelog_columns(names)
+        print(
+            f"Shipped model: {len(features)} of {len(added)}+ features, "
+            f"{len(columns)} gamelog columns read"
+        )
+        full_seconds = best_of(lambda: full_build(base_dir), args.repeat)
+        lazy_seconds = best_of(
+            lambda: feature_registry.build_features(names, SEASON, base_dir=base_dir), args.repeat
+        )
+        print(f"full build: {full_seconds:.3f}s")
+        print(f"  registry: {lazy_seconds:.3f}s")
+        print(f"Speedup: {full_seconds / lazy_seconds:.1f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
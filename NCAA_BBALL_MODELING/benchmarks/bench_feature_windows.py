@@ -0,0 +1,96 @@
+"""Cost of sweeping rolling windows and EWMA half-lives in add_features.
+
+Runs ``add_features`` on four synthetic seasons with the default windows and
+with a research sweep, on every available kernel backend. Fails if the
+backends disagree or if the EWMA columns differ from pandas'
+``groupby().shift(1).ewm(halflife=h).mean()``. numba compiles the kernel on
+its first call in a process, so timings start after a warm-up.
+
+    python -m NCAA_BBALL_MODELING.benchmarks.bench_feature_windows \\
+        [--windows 3,5,7,10,15,20] [--halflives 2,5,10]
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+
+import numpy as np
+
+try:
+    from NCAA_BBALL_MODELING import utils
+    from NCAA_BBALL_MODELING.benchmarks.bench_rolling_features import (
+        best_of,
+        compare,
+        synthetic_possessions,
+    )
+    from NCAA_BBALL_MODELING.feature_kernels import BACKENDS, numba
+except ImportError:
+    import utils
+    from benchmarks.bench_rolling_features import best_of, compare, synthetic_possessions
+    from feature_kernels import BACKENDS, numba
+
+
+def _numbers(text: str, kind=int) -> list:
+    return [kind(part) for part in text.split(",") if part]
+
+
+def ewm_reference(df, halflives) -> dict[str, np.ndarray]:
+    """EWMA columns computed with pandas, for the parity check."""
+    df = utils.add_game_columns(utils._nullable_to_float(df.copy()))
+    df = df.sort_values(["season", "school_name", "date"])
+    grouped = df.groupby(["season", "school_name"], observed=True, sort=False)
+    reference = {}
+    for col in utils.ROLL_COLS:
+        for halflife in halflives:
+            values = grouped[col].transform(lambda s: s.shift(1).ewm(halflife=halflife).mean())
+            reference[f"ewm_{col}_hl_{halflife:g}"] = values.fillna(0).to_numpy()
+    return reference
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--teams", type=int, default=360, help="Teams per season.")
+    parser.add_argument("--dates", type=int, default=32, help="Game dates per season.")
+    parser.add_argument("--windows", default="3,5,7,10,15,20", help="Comma-separated windows.")
+    parser.add_argument("--halflives", default="2,5,10", help="Comma-separated EWMA half-lives.")
+    parser.add_argument("--repeat", type=int, default=3, help="Timing repeats.")
+    args = parser.parse_args()
+
+    windows, halflives = _numbers(args.windows), _numbers(args.halflives, float)
+    backends = [b for b in BACKENDS if b != "numba" or numba is not None]
+    df = synthetic_possessions(args.teams, args.dates)
+
+    def sweep(backend):
+        return lambda frame: utils.add_features(frame, windows, halflives, backend)
+
+    results = {backend: sweep(backend)(df) for backend in backends}
+    first, *others = backends
+    for backend in others:
+        mismatches = compare(results[first], results[backend])
+        if mismatches:
+            print(f"❌ {backend} differs from {first} in: {', '.join(mismatches)}")
+            return 1
+    reference = ewm_reference(df, halflives)
+    mismatches = [
+        name
+        for name, values in reference.items()
+        if not np.allclose(results[first][name].to_numpy(), values, rtol=0, atol=1e-9)
+    ]
+    if mismatches:
+        print(f"❌ EWMA columns differ from pandas in: {', '.join(mismatches)}")
+        return 1
+    n_columns = len(results[first].columns)
+    print(f"✅ Parity: {len(df)} rows, {n_columns} columns, backends {', '.join(backends)}")
+
+    for backend in backends:
+        default = best_of(lambda frame: utils.add_features(frame, backend=backend), df, args.repeat)
+        swept = best_of(sweep(backend), df, args.repeat)
+        print(f"{backend:>6}: default {default:.3f}s, {len(windows)} windows + {len(halflives)} half-lives {swept:.3f}s")
+    if numba is None:
+        print("numba is not installed; only the NumPy backend ran")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
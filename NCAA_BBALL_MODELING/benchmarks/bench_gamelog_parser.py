@@ -0,0 +1,92 @@
+"""Parity check and micro-benchmark for the gamelog parser backends.
+
+Runs every recorded gamelog page through the BeautifulSoup and lxml
+backends, fails if any page produces different rows, then times both.
+
+    python -m NCAA_BBALL_MODELING.benchmarks.bench_gamelog_parser [PAGES_DIR]
+
+By default the pages come from the HTTP response cache, so any earlier
+scrape doubles as the recorded corpus.
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+try:
+    from NCAA_BBALL_MODELING.gamelog_scraping import GAMELOG_PARSERS, parse_team_gamelog
+    from NCAA_BBALL_MODELING.http_cache import DEFAULT_CACHE_DIR
+except ImportError:
+    from gamelog_scraping import GAMELOG_PARSERS, parse_team_gamelog
+    from http_cache import DEFAULT_CACHE_DIR
+
+
+def load_gamelog_pages(pages_dir: str | Path) -> dict[str, str]:
+    """Read every *.html file under ``pages_dir`` that holds a gamelog table."""
+    pages = {}
+    for path in sorted(Path(pages_dir).rglob("*.html")):
+        text = path.read_text(encoding="utf-8", errors="replace")
+        if 'id="team_game_log"' in text:
+            pages[str(path)] = text
+    return pages
+
+
+def check_parity(pages: dict[str, str]) -> list[str]:
+    """Return the pages whose lxml rows differ from the BeautifulSoup rows."""
+    mismatches = []
+    for name, page in pages.items():
+        expected = parse_team_gamelog(page, "team", 2026, "Team", parser="bs4")
+        actual = parse_team_gamelog(page, "team", 2026, "Team", parser="lxml")
+        if expected != actual:
+            mismatches.append(name)
+    return mismatches
+
+
+def time_parser(pages: dict[str, str], parser: str, repeat: int) -> float:
+    """Best-of-``repeat`` seconds to parse every page once."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for page in pages.values():
+            parse_team_gamelog(page, "team", 2026, "Team", parser=parser)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "pages_dir",
+        nargs="?",
+        default=DEFAULT_CACHE_DIR,
+        help="Directory of recorded pages (default: HTTP response cache).",
+    )
+    parser.add_argument("--repeat", type=int, default=3, help="Timing repeats.")
+    args = parser.parse_args()
+
+    pages = load_gamelog_pages(args.pages_dir)
+    if not pages:
+        print(f"No recorded gamelog pages found under {args.pages_dir}")
+        return 1
+
+    mismatches = check_parity(pages)
+    if mismatches:
+        print(f"❌ Parser output differs on {len(mismatches)} page(s):")
+        for name in mismatches:
+            print(f"  {name}")
+        return 1
+    print(f"✅ Parity: {len(pages)} pages parse identically with {GAMELOG_PARSERS}")
+
+    timings = {name: time_parser(pages, name, args.repeat) for name in GAMELOG_PARSERS}
+    for name, seconds in timings.items():
+        per_page = 1000 * seconds / len(pages)
+        print(f"{name:>5}: {seconds:.3f}s total, {per_page:.2f} ms/page")
+    print(f"Speedup (bs4 / lxml): {timings['bs4'] / timings['lxml']:.1f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,85 @@
+"""Season-sharded process pool vs the single-process feature build.
+
+Writes a synthetic store of the training seasons to a scratch directory and
+runs ``create_features`` without the stage cache, once in-process and once
+with ``--workers`` processes. Fails unless both write byte-identical
+feature CSVs and a cached in-process run leaves nothing for the pool to
+recompute. Scaling is bounded by the number of seasons and CPU cores.
+
+    python -m NCAA_BBALL_MODELING.benchmarks.bench_parallel_features [--workers N]
+"""
+
+from __future__ import annotations
+
+import argparse
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import pandas as pd
+
+try:
+    from NCAA_BBALL_MODELING import utils
+    from NCAA_BBALL_MODELING.benchmarks.corpus import synthesize_schedule
+    from NCAA_BBALL_MODELING.storage import write_gamelogs
+except ImportError:
+    import utils
+    from benchmarks.corpus import synthesize_schedule
+    from storage import write_gamelogs
+
+
+def timed_build(base_dir: Path, workers: int, use_cache: bool = False) -> tuple[float, str, bytes]:
+    """Seconds, captured log and CSV bytes of one ``create_features`` run."""
+    log = io.StringIO()
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(log):
+        utils.create_features(base_dir=base_dir, use_cache=use_cache, workers=workers)
+    seconds = time.perf_counter() - start
+    return seconds, log.getvalue(), (base_dir / "data" / "merged_dataset.csv").read_bytes()
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--teams", type=int, default=360, help="Teams per season.")
+    parser.add_argument("--dates", type=int, default=60, help="Game dates per season.")
+    parser.add_argument("--workers", type=int, default=len(utils.TRAINING_SEASONS))
+    parser.add_argument("--repeat", type=int, default=2, help="Timing repeats.")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as scratch:
+        base_dir = Path(scratch)
+        frames = [
+            synthesize_schedule(
+                args.teams, season=season, n_dates=args.dates, n_future_dates=0, seed=season
+            )[1]
+            for season in utils.TRAINING_SEASONS
+        ]
+        with contextlib.redirect_stdout(io.StringIO()):
+            write_gamelogs(pd.concat(frames, ignore_index=True), base_dir=base_dir)
+
+        _, _, serial_csv = timed_build(base_dir, 1)
+        _, _, parallel_csv = timed_build(base_dir, args.workers)
+        if serial_csv != parallel_csv:
+            print("❌ Parallel build wrote a different feature CSV")
+            return 1
+        timed_build(base_dir, 1, use_cache=True)
+        _, log, _ = timed_build(base_dir, args.workers, use_cache=True)
+        if ", 0 misses" not in log:
+            print("❌ Parallel build missed stage cache entries written in-process")
+            return 1
+        print(f"✅ Parity: {len(utils.TRAINING_SEASONS)} seasons, identical CSVs, shared stage cache")
+
+        serial = min(timed_build(base_dir, 1)[0] for _ in range(args.repeat))
+        parallel = min(timed_build(base_dir, args.workers)[0] for _ in range(args.repeat))
+        print(f"in-process: {serial:.2f}s")
+        print(f"{args.workers} workers: {parallel:.2f}s ({os.cpu_count()} CPUs)")
+        print(f"Speedup: {serial / parallel:.1f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
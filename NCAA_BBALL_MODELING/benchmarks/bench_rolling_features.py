@@ -0,0 +1,254 @@
+"""Parity check and benchmark for the vectorized rolling kernel in add_features.
+
+Builds four synthetic seasons, runs ``add_features`` and the groupby-lambda
+version it replaced on the same input, fails if any column differs (floats
+within 1e-9), then times both on compact-schema input. Parity runs on
+float64 input: with float32 columns ``groupby().cumsum()`` accumulates in
+float32 while the kernel always uses float64, so there the two agree only
+to float32 rounding.
+
+    python -m NCAA_BBALL_MODELING.benchmarks.bench_rolling_features [--teams N]
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+try:
+    from NCAA_BBALL_MODELING import utils
+    from NCAA_BBALL_MODELING.benchmarks.corpus import synthesize_schedule
+    from NCAA_BBALL_MODELING.schema import compact_frame, widen_frame
+    from NCAA_BBALL_MODELING.storage import coerce_gamelogs
+except ImportError:
+    import utils
+    from benchmarks.corpus import synthesize_schedule
+    from schema import compact_frame, widen_frame
+    from storage import coerce_gamelogs
+
+
+def add_features_groupby(df):
+    """``add_features`` as it was: one groupby-transform lambda per column and window."""
+    df = utils._nullable_to_float(df.copy())
+
+    # Basic columns
+    df["game_location"] = utils._fill_text(df["game_location"], "")
+    df["is_Home"] = np.where(
+        df["game_location"] == "", 1.0, np.where(df["game_location"] == "N", 0.5, 0.0)
+    )
+    df["score_diff"] = df["team_game_score"] - df["opp_team_game_score"]
+    df["win"] = df["team_game_result"].map({"W": 1, "L": 0})
+
+    # Sort + group
+    df = df.sort_values(["season", "school_name", "date"])
+    g = df.groupby(["season", "school_name"])
+
+    # Ratings (per 100 possessions)
+    df["off_rtg"] = 100 * (df["team_game_score"] / df["possessions"])
+    df["def_rtg"] = 100 * (df["opp_team_game_score"] / df["possessions"])
+    df["net_rtg"] = df["off_rtg"] - df["def_rtg"]
+
+    # Cumulative ratings up to prior game
+    cum_pts = g["team_game_score"].transform(lambda s: s.shift(1).cumsum())
+    cum_opp_pts = g["opp_team_game_score"].transform(lambda s: s.shift(1).cumsum())
+    cum_poss = g["possessions"].transform(lambda s: s.shift(1).cumsum())
+
+    df["cum_off_rtg"] = 100 * (cum_pts / cum_poss)
+    df["cum_def_rtg"] = 100 * (cum_opp_pts / cum_poss)
+    df["cum_net_rtg"] = df["cum_off_rtg"] - df["cum_def_rtg"]
+
+    df["cum_off_rtg"] = df["cum_off_rtg"].fillna(0)
+    df["cum_def_rtg"] = df["cum_def_rtg"].fillna(0)
+    df["cum_net_rtg"] = df["cum_net_rtg"].fillna(0)
+
+    # Cumulative ratings home and away
+    is_home = df["is_Home"] == 1
+    is_away = df["is_Home"] == 0
+
+    home_pts = (
+        df.loc[is_home]
+        .groupby(["season", "school_name"])["team_game_score"]
+        .transform(lambda s: s.shift(1).cumsum())
+    )
+    home_opp_pts = (
+        df.loc[is_home]
+        .groupby(["season", "school_name"])["opp_team_game_score"]
+        .transform(lambda s: s.shift(1).cumsum())
+    )
+    home_poss = (
+        df.loc[is_home]
+        .groupby(["season", "school_name"])["possessions"]
+        .transform(lambda s: s.shift(1).cumsum())
+    )
+
+    away_pts = (
+        df.loc[is_away]
+        .groupby(["season", "school_name"])["team_game_score"]
+        .transform(lambda s: s.shift(1).cumsum())
+    )
+    away_opp_pts = (
+        df.loc[is_away]
+        .groupby(["season", "school_name"])["opp_team_game_score"]
+        .transform(lambda s: s.shift(1).cumsum())
+    )
+    away_poss = (
+        df.loc[is_away]
+        .groupby(["season", "school_name"])["possessions"]
+        .transform(lambda s: s.shift(1).cumsum())
+    )
+
+    df["home_cum_net_rtg"] = 0.0
+    df["away_cum_net_rtg"] = 0.0
+
+    df.loc[is_home, "home_cum_net_rtg"] = 100 * (home_pts / home_poss) - 100 * (
+        home_opp_pts / home_poss
+    )
+    df.loc[is_away, "away_cum_net_rtg"] = 100 * (away_pts / away_poss) - 100 * (
+        away_opp_pts / away_poss
+    )
+
+    df[["home_cum_net_rtg", "away_cum_net_rtg"]] = df[
+        ["home_cum_net_rtg", "away_cum_net_rtg"]
+    ].fillna(0)
+
+    df["home_road_split"] = df["home_cum_net_rtg"] - df["away_cum_net_rtg"]
+
+    # Rolling helper
+    def roll_mean(col, window):
+        return g[col].transform(
+            lambda s: s.shift(1).rolling(window, min_periods=1).mean()
+        )
+
+    # Win pct
+    df["win_pct_last_10"] = roll_mean("win", 10).fillna(0)
+
+    # Weighted eFG%
+    fg_roll_5 = g["fg"].transform(
+        lambda s: s.shift(1).rolling(5, min_periods=1).sum()
+    )
+    fg3_roll_5 = g["fg3"].transform(
+        lambda s: s.shift(1).rolling(5, min_periods=1).sum()
+    )
+    fga_roll_5 = g["fga"].transform(
+        lambda s: s.shift(1).rolling(5, min_periods=1).sum()
+    )
+    df["efg_pct_last_5"] = (fg_roll_5 + 0.5 * fg3_roll_5) / fga_roll_5
+
+    df["efg_pct_last_5"] = df["efg_pct_last_5"].fillna(0)
+
+    fg_roll_10 = g["fg"].transform(
+        lambda s: s.shift(1).rolling(10, min_periods=1).sum()
+    )
+    fg3_roll_10 = g["fg3"].transform(
+        lambda s: s.shift(1).rolling(10, min_periods=1).sum()
+    )
+    fga_roll_10 = g["fga"].transform(
+        lambda s: s.shift(1).rolling(10, min_periods=1).sum()
+    )
+    df["efg_pct_last_10"] = (fg_roll_10 + 0.5 * fg3_roll_10) / fga_roll_10
+
+    df["efg_pct_last_10"] = df["efg_pct_last_10"].fillna(0)
+
+    # Rolling stats
+    roll_cols = [
+        "fta",
+        "ast",
+        "trb",
+        "orb",
+        "tov",
+        "team_game_score",
+        "opp_team_game_score",
+        "score_diff",
+        "possessions",
+    ]
+    for col in roll_cols:
+        df[f"avg_{col}_last_5"] = roll_mean(col, 5)
+        df[f"avg_{col}_last_10"] = roll_mean(col, 10)
+
+    # Fill NaNs
+    fill_cols = (
+        [f"avg_{c}_last_5" for c in roll_cols]
+        + [f"avg_{c}_last_10" for c in roll_cols]
+    )
+    df[fill_cols] = df[fill_cols].fillna(0)
+
+    # Rest days
+    df["prev_game_date"] = g["date"].shift(1)
+    df["rest_days"] = (df["date"] - df["prev_game_date"]).dt.days
+    df["rest_days"] = df["rest_days"].fillna(7)
+
+    return df
+
+
+def synthetic_possessions(n_teams: int, n_dates: int) -> pd.DataFrame:
+    """Four cleaned seasons with possessions, as ``add_features`` receives them."""
+    frames = [
+        synthesize_schedule(n_teams, season=season, n_dates=n_dates, seed=season)[1]
+        for season in utils.TRAINING_SEASONS
+    ]
+    df = utils.clean_gamelogs(coerce_gamelogs(pd.concat(frames, ignore_index=True)))
+    return compact_frame(utils.calculate_possessions(df))
+
+
+def compare(expected: pd.DataFrame, actual: pd.DataFrame) -> list[str]:
+    """Columns whose values differ; column order must match too."""
+    if list(expected.columns) != list(actual.columns):
+        return ["<column order>"]
+    mismatches = []
+    for column in expected.columns:
+        left, right = expected[column], actual[column]
+        if pd.api.types.is_float_dtype(left.dtype):
+            same = np.allclose(
+                left.to_numpy(dtype=np.float64),
+                right.to_numpy(dtype=np.float64),
+                rtol=0,
+                atol=1e-9,
+                equal_nan=True,
+            )
+        else:
+            same = left.equals(right)
+        if not same or not left.index.equals(right.index):
+            mismatches.append(column)
+    return mismatches
+
+
+def best_of(func, df: pd.DataFrame, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(df)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--teams", type=int, default=360, help="Teams per season.")
+    parser.add_argument("--dates", type=int, default=32, help="Game dates per season.")
+    parser.add_argument("--repeat", type=int, default=3, help="Timing repeats.")
+    args = parser.parse_args()
+
+    df = synthetic_possessions(args.teams, args.dates)
+    wide = widen_frame(df)
+    mismatches = compare(add_features_groupby(wide), utils.add_features(wide))
+    if mismatches:
+        print(f"❌ add_features differs from the groupby version in: {', '.join(mismatches)}")
+        return 1
+    print(f"✅ Parity: {len(df)} rows, every add_features column matches")
+
+    timings = {
+        "groupby": best_of(add_features_groupby, df, args.repeat),
+        "vectorized": best_of(utils.add_features, df, args.repeat),
+    }
+    for name, seconds in timings.items():
+        print(f"{name:>10}: {seconds:.3f}s")
+    print(f"Speedup: {timings['groupby'] / timings['vectorized']:.1f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
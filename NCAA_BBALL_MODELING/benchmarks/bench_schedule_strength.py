@@ -0,0 +1,105 @@
+"""Sparse strength of schedule vs the pandas merge it replaces.
+
+Builds synthetic seasons through ``add_features`` and computes every row's
+``SOS_COLUMNS`` twice: with the sparse adjacency walk (the default) and by
+merging each row with all of its team's earlier games and each opponent's
+net rating as of the row's date. Fails unless the two agree to ``--atol``.
+
+    python -m NCAA_BBALL_MODELING.benchmarks.bench_schedule_strength [--teams N]
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+try:
+    from NCAA_BBALL_MODELING import utils
+    from NCAA_BBALL_MODELING.benchmarks.bench_rolling_features import synthetic_possessions
+    from NCAA_BBALL_MODELING.schedule_strength import SOS_COLUMNS, SOS_WINDOW, schedule_strength
+    from NCAA_BBALL_MODELING.schema import compact_frame
+except ImportError:
+    import utils
+    from benchmarks.bench_rolling_features import synthetic_possessions
+    from schedule_strength import SOS_COLUMNS, SOS_WINDOW, schedule_strength
+    from schema import compact_frame
+
+
+def merged_schedule_strength(frame: pd.DataFrame, window: int = SOS_WINDOW) -> pd.DataFrame:
+    """``SOS_COLUMNS`` from pandas merges: every row against every earlier game."""
+    rows = pd.DataFrame(
+        {
+            "season": frame["season"].to_numpy(),
+            "team": frame["school_name"].astype(str).to_numpy(),
+            "opp": frame["opp_name_abbr"].astype(str).to_numpy(),
+            "date": frame["date"].to_numpy(),
+            "points": frame["team_game_score"].astype(float).to_numpy(),
+            "opp_points": frame["opp_team_game_score"].astype(float).to_numpy(),
+            "possessions": frame["possessions"].astype(float).to_numpy(),
+            "row": np.arange(len(frame)),
+        }
+    ).sort_values(["season", "team", "date"])
+    rows["position"] = rows.groupby(["season", "team"]).cumcount()
+    games = rows[
+        rows["points"].notna() & rows["opp_points"].notna() & (rows["possessions"] > 0)
+    ].rename(columns={"date": "game_date", "position": "game_position"})
+
+    # Each team's net rating over its games before every date of the season.
+    dates = rows[["season", "date"]].drop_duplicates()
+    before = games.merge(dates, on="season").query("game_date < date")
+    totals = before.groupby(["season", "team", "date"])[["points", "opp_points", "possessions"]].sum()
+    snapshot = (100 * (totals["points"] - totals["opp_points"]) / totals["possessions"]).rename(
+        "opp_rating"
+    )
+    snapshot = snapshot.reset_index().rename(columns={"team": "opp"})
+
+    pairs = rows[["season", "team", "date", "position", "row"]].merge(
+        games[["season", "team", "opp", "game_date", "game_position"]], on=["season", "team"]
+    )
+    pairs = pairs[pairs["game_date"] < pairs["date"]]
+    pairs = pairs.merge(snapshot, on=["season", "opp", "date"], how="left")
+    pairs["opp_rating"] = pairs["opp_rating"].fillna(0.0)
+    recent = pairs[pairs["game_position"] >= pairs["position"] - window]
+
+    out = np.zeros((len(frame), 2))
+    for k, part in enumerate([pairs, recent]):
+        means = part.groupby("row")["opp_rating"].mean()
+        out[means.index.to_numpy(), k] = means.to_numpy()
+    return pd.DataFrame(out, index=frame.index, columns=SOS_COLUMNS)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--teams", type=int, default=200, help="Teams per season.")
+    parser.add_argument("--dates", type=int, default=60, help="Game dates per season.")
+    parser.add_argument("--atol", type=float, default=1e-9, help="Allowed difference.")
+    args = parser.parse_args()
+
+    frame = compact_frame(utils.add_features(synthetic_possessions(args.teams, args.dates)))
+    print(f"{len(frame)} rows, {frame['season'].nunique()} seasons")
+
+    start = time.perf_counter()
+    merged = merged_schedule_strength(frame).to_numpy()
+    merge_seconds = time.perf_counter() - start
+    start = time.perf_counter()
+    sparse = schedule_strength(frame).to_numpy()
+    sparse_seconds = time.perf_counter() - start
+
+    error = np.abs(sparse - merged).max()
+    if error > args.atol:
+        print(f"❌ Sparse schedule strength differs from the merge by up to {error:.2g}")
+        return 1
+    print(f"✅ Parity: {len(frame)} rows within {error:.1g} of the merge")
+
+    print(f"pandas merge: {merge_seconds:.2f}s")
+    print(f"      sparse: {sparse_seconds:.2f}s")
+    print(f"Speedup: {merge_seconds / sparse_seconds:.1f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
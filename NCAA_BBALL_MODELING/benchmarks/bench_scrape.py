@@ -0,0 +1,115 @@
+"""End-to-end scrape benchmark against the local stand-in server.
+
+Builds (or reuses) a corpus, serves it with injected latency and faults,
+runs a full-season ``scrape_all_gamelogs`` against it and reports pages/sec,
+retries and wall time.
+
+    python -m NCAA_BBALL_MODELING.benchmarks.bench_scrape --teams 360 \\
+        --workers 8 --rpm 0 --latency 0.3 --rate-429 0.02
+"""
+
+from __future__ import annotations
+
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+try:
+    from NCAA_BBALL_MODELING import gamelog_scraping as scraping
+    from NCAA_BBALL_MODELING.benchmarks.corpus import build_synthetic_corpus
+    from NCAA_BBALL_MODELING.benchmarks.standin_server import StandInConfig, StandInServer
+except ImportError:
+    import gamelog_scraping as scraping
+    from benchmarks.corpus import build_synthetic_corpus
+    from benchmarks.standin_server import StandInConfig, StandInServer
+
+
+def run_benchmark(
+    corpus_dir: str | Path,
+    *,
+    season: int = 2026,
+    workers: int = scraping.DEFAULT_WORKERS,
+    requests_per_minute: float = 0,
+    config: StandInConfig | None = None,
+    parser: str | None = None,
+) -> dict[str, float]:
+    """Scrape a full season from a stand-in server; returns the metrics."""
+    scraping.set_rate_limit(requests_per_minute)
+    scraping.configure_cache(enabled=False)
+    scraping.RETRY_BACKOFF = (0.1, 0.2)
+    scraping.fetch_stats.clear()
+
+    with StandInServer(corpus_dir, config) as server:
+        scraping.set_base_url(server.base_url)
+        start = time.perf_counter()
+        df = scraping.scrape_all_gamelogs(
+            season, limit=None, workers=workers, parser=parser
+        )
+        elapsed = time.perf_counter() - start
+        served = dict(server.stats.counts)
+
+    pages = served.get("200", 0)
+    return {
+        "rows": len(df),
+        "teams": df["school_slug"].nunique() if not df.empty else 0,
+        "requests": scraping.fetch_stats["requests"],
+        "pages": pages,
+        "retries": scraping.fetch_stats["retries"],
+        "failures": scraping.fetch_stats["failures"],
+        "server_429": served.get("429", 0),
+        "server_500": served.get("500", 0),
+        "seconds": elapsed,
+        "pages_per_sec": pages / elapsed if elapsed else float("inf"),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark a full-season scrape offline.")
+    parser.add_argument("--corpus", help="Existing corpus directory (default: synthesize one).")
+    parser.add_argument("--season", type=int, default=2026)
+    parser.add_argument("--teams", type=int, default=60, help="Teams in a synthetic corpus.")
+    parser.add_argument("--workers", type=int, default=scraping.DEFAULT_WORKERS)
+    parser.add_argument("--rpm", type=float, default=0, help="Request budget (0 = unthrottled).")
+    parser.add_argument("--parser", choices=scraping.GAMELOG_PARSERS)
+    parser.add_argument("--latency", type=float, default=0.1)
+    parser.add_argument("--jitter", type=float, default=0.05)
+    parser.add_argument("--rate-429", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    args = parser.parse_args()
+
+    config = StandInConfig(
+        latency=args.latency,
+        jitter=args.jitter,
+        rate_429=args.rate_429,
+        error_rate=args.error_rate,
+        retry_after=0.1,
+    )
+
+    with tempfile.TemporaryDirectory() as tmp:
+        corpus_dir = args.corpus
+        if corpus_dir is None:
+            corpus_dir = tmp
+            build_synthetic_corpus(corpus_dir, season=args.season, n_teams=args.teams)
+        metrics = run_benchmark(
+            corpus_dir,
+            season=args.season,
+            workers=args.workers,
+            requests_per_minute=args.rpm,
+            config=config,
+            parser=args.parser,
+        )
+
+    print(
+        f"{metrics['teams']} teams, {metrics['rows']} rows in {metrics['seconds']:.2f}s "
+        f"({metrics['pages_per_sec']:.1f} pages/sec)"
+    )
+    print(
+        f"requests={metrics['requests']} retries={metrics['retries']} "
+        f"failures={metrics['failures']} 429s={metrics['server_429']} "
+        f"500s={metrics['server_500']}"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""Integer team ids vs the team-name keys they replace.
+
+Builds four synthetic cleaned seasons and times the two pair keys that
+used to compare school names as text: the game id both rows of a game
+share (``assign_game_ids``), and the one-row-per-game dedupe of the
+favorites (``build_favorites_predictions``). Fails unless the name and id
+versions pair the same rows and keep the same favorites.
+
+    python -m NCAA_BBALL_MODELING.benchmarks.bench_team_ids [--teams N]
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+try:
+    from NCAA_BBALL_MODELING import utils
+    from NCAA_BBALL_MODELING.benchmarks.bench_rolling_features import synthetic_possessions
+    from NCAA_BBALL_MODELING.feature_kernels import pair_rows
+    from NCAA_BBALL_MODELING.pipelines.modeling import build_favorites_predictions
+except ImportError:
+    import utils
+    from benchmarks.bench_rolling_features import synthetic_possessions
+    from feature_kernels import pair_rows
+    from pipelines.modeling import build_favorites_predictions
+
+
+def name_game_ids(df: pd.DataFrame) -> pd.Series:
+    """The game id hashed from the unordered pair of names, as before team ids."""
+    team = df["school_name"].astype(str).to_numpy()
+    opp = df["opp_name_abbr"].astype(str).to_numpy()
+    key = pd.DataFrame(
+        {
+            "season": pd.to_numeric(df["season"]).to_numpy(dtype="float64"),
+            "date": df["date"].to_numpy(dtype="datetime64[ns]"),
+            "low": np.where(team < opp, team, opp),
+            "high": np.where(team < opp, opp, team),
+        }
+    )
+    hashes = pd.util.hash_pandas_object(key, index=False, categorize=False).to_numpy()
+    return pd.Series(hashes.view(np.int64), index=df.index, name="game_id")
+
+
+def name_favorites(pred_df: pd.DataFrame) -> pd.DataFrame:
+    """Favorites deduped on the row-wise min/max of the names as text."""
+    favored_df = pred_df[pred_df["pred_final"] > 0].copy()
+    teams = favored_df[["school_name", "opp_name_abbr"]].astype(str)
+    favored_df["team_a"] = teams.min(axis=1)
+    favored_df["team_b"] = teams.max(axis=1)
+    return favored_df.drop_duplicates(["date", "team_a", "team_b"])
+
+
+def timed(function, *args):
+    start = time.perf_counter()
+    result = function(*args)
+    return result, time.perf_counter() - start
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--teams", type=int, default=360, help="Teams per season.")
+    parser.add_argument("--dates", type=int, default=120, help="Game dates per season.")
+    args = parser.parse_args()
+
+    frame = synthetic_possessions(args.teams, args.dates)
+    rng = np.random.default_rng(0)
+    pred_df = frame[["date", "school_name", "opp_name_abbr", "team_id", "opp_team_id"]].assign(
+        pred_final=rng.normal(size=len(frame)), pred_baseline=0.0, pred_residual=0.0
+    )
+    for column in ["is_Home", "team_game_score", "opp_team_game_score", "score_diff"]:
+        pred_df[column] = 0.0
+    print(f"{len(frame)} rows, {frame['season'].nunique()} seasons")
+
+    by_name, name_ids_seconds = timed(name_game_ids, frame)
+    by_id, id_ids_seconds = timed(utils.assign_game_ids, frame)
+    if not np.array_equal(pair_rows(by_name.to_numpy()), pair_rows(by_id.to_numpy())):
+        print("❌ Team-id game ids pair different rows than the name hashes")
+        return 1
+    old, name_fav_seconds = timed(name_favorites, pred_df)
+    new, id_fav_seconds = timed(build_favorites_predictions, pred_df)
+    if not old.index.equals(new.index):
+        print("❌ Team-id dedupe keeps different favorites than the name dedupe")
+        return 1
+    print(f"✅ Parity: same game pairs, same {len(new)} favorites")
+
+    print(f"game ids:  names {name_ids_seconds:.3f}s, team ids {id_ids_seconds:.3f}s")
+    print(f"favorites: names {name_fav_seconds:.3f}s, team ids {id_fav_seconds:.3f}s")
+    print(
+        f"Speedup: {name_ids_seconds / id_ids_seconds:.1f}x (game ids), "
+        f"{name_fav_seconds / id_fav_seconds:.1f}x (favorites)"
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,340 @@
+"""HTML corpus for the local Sports Reference stand-in server.
+
+A corpus is a directory that mirrors the site's URL paths, e.g.
+``cbb/schools/duke/2026-gamelogs.html``. It can be recorded from the HTTP
+response cache after a real scrape, or synthesized with the same markup the
+scrapers read (school list, team gamelogs and conference school tables).
+
+    python -m NCAA_BBALL_MODELING.benchmarks.corpus synth OUT_DIR --teams 360
+    python -m NCAA_BBALL_MODELING.benchmarks.corpus record OUT_DIR
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import random
+from html import escape
+from pathlib import Path
+from typing import Optional
+from urllib.parse import urlsplit
+
+import pandas as pd
+
+try:
+    from NCAA_BBALL_MODELING.http_cache import DEFAULT_CACHE_DIR
+    from NCAA_BBALL_MODELING.pipelines.conferences import CONF_MAP
+except ImportError:
+    from http_cache import DEFAULT_CACHE_DIR
+    from pipelines.conferences import CONF_MAP
+
+
+BOX_SCORE_STATS = [
+    "fg",
+    "fga",
+    "fg_pct",
+    "fg3",
+    "fg3a",
+    "fg3_pct",
+    "fg2",
+    "fg2a",
+    "fg2_pct",
+    "efg_pct",
+    "ft",
+    "fta",
+    "ft_pct",
+    "orb",
+    "drb",
+    "trb",
+    "ast",
+    "stl",
+    "blk",
+    "tov",
+    "pf",
+]
+
+# School-list names whose gamelogs show a different opponent label, so the
+# synthetic pages exercise RENAME_MAP the way the live site does.
+ALIASED_SCHOOLS = {
+    "Nevada-Las Vegas": "UNLV",
+    "Southern Methodist": "SMU",
+    "Virginia Commonwealth": "VCU",
+    "Mississippi": "Ole Miss",
+    "Long Island University": "LIU",
+    "Maryland-Baltimore County": "UMBC",
+}
+
+
+def corpus_path(corpus_dir: str | Path, url: str) -> Path:
+    """File inside ``corpus_dir`` that serves ``url``'s path."""
+    return Path(corpus_dir) / urlsplit(url).path.lstrip("/")
+
+
+def record_corpus(
+    corpus_dir: str | Path,
+    cache_dir: str | Path = DEFAULT_CACHE_DIR,
+) -> int:
+    """Copy every cached response into ``corpus_dir``; returns pages written."""
+    written = 0
+    for meta_path in Path(cache_dir).glob("*/*.json"):
+        body_path = meta_path.with_suffix(".html")
+        if not body_path.exists():
+            continue
+        url = json.loads(meta_path.read_text(encoding="utf-8"))["url"]
+        target = corpus_path(corpus_dir, url)
+        target.parent.mkdir(parents=True, exist_ok=True)
+        target.write_text(body_path.read_text(encoding="utf-8"), encoding="utf-8")
+        written += 1
+    return written
+
+
+def _box_score(rng: random.Random) -> dict[str, float]:
+    fg2a = rng.randint(30, 48)
+    fg3a = rng.randint(14, 30)
+    fg2 = rng.randint(int(fg2a * 0.38), int(fg2a * 0.62))
+    fg3 = rng.randint(int(fg3a * 0.25), int(fg3a * 0.42))
+    fta = rng.randint(10, 30)
+    ft = rng.randint(int(fta * 0.6), fta)
+    orb = rng.randint(5, 16)
+    drb = rng.randint(18, 30)
+    fg, fga = fg2 + fg3, fg2a + fg3a
+    return {
+        "fg": fg,
+        "fga": fga,
+        "fg_pct": round(fg / fga, 3),
+        "fg3": fg3,
+        "fg3a": fg3a,
+        "fg3_pct": round(fg3 / fg3a, 3),
+        "fg2": fg2,
+        "fg2a": fg2a,
+        "fg2_pct": round(fg2 / fg2a, 3),
+        "efg_pct": round((fg + 0.5 * fg3) / fga, 3),
+        "ft": ft,
+        "fta": fta,
+        "ft_pct": round(ft / fta, 3),
+        "orb": orb,
+        "drb": drb,
+        "trb": orb + drb,
+        "ast": rng.randint(8, 22),
+        "stl": rng.randint(2, 12),
+        "blk": rng.randint(0, 8),
+        "tov": rng.randint(6, 18),
+        "pf": rng.randint(10, 24),
+        "team_game_score": 2 * fg2 + 3 * fg3 + ft,
+    }
+
+
+def synthesize_schedule(
+    n_teams: int = 40,
+    *,
+    season: int = 2026,
+    n_dates: int = 30,
+    n_future_dates: int = 3,
+    seed: int = 0,
+) -> tuple[dict[str, str], pd.DataFrame]:
+    """Random round-robin style schedule with mirrored box scores.
+
+    Returns ({slug: school name}, one row per team per game). The last
+    ``n_future_dates`` dates have no result yet.
+    """
+    rng = random.Random(seed)
+    aliases = list(ALIASED_SCHOOLS)
+    schools = {}
+    for i in range(n_teams):
+        name = aliases[i] if i < len(aliases) else f"Synthetic State {i:03d}"
+        slug = name.lower().replace(" ", "-").replace("(", "").replace(")", "")
+        schools[slug] = name
+
+    slugs = list(schools)
+    start = pd.Timestamp(f"{season - 1}-11-04")
+    rows = []
+    game_num = {slug: 0 for slug in slugs}
+    for day in range(n_dates):
+        date = start + pd.Timedelta(days=2 * day + rng.randint(0, 1))
+        completed = day < n_dates - n_future_dates
+        order = slugs[:]
+        rng.shuffle(order)
+        # Leave a couple of teams idle so schedules don't line up perfectly.
+        idle = rng.randint(0, 2) * 2
+        playing = order[idle:]
+        for home, away in zip(playing[0::2], playing[1::2]):
+            neutral = rng.random() < 0.1
+            home_box = _box_score(rng) if completed else {}
+            away_box = _box_score(rng) if completed else {}
+            if completed and home_box["team_game_score"] == away_box["team_game_score"]:
+                home_box["ft"] += 1
+                home_box["fta"] += 1
+                home_box["team_game_score"] += 1
+            for team, opp, box, opp_box, location in (
+                (home, away, home_box, away_box, "N" if neutral else ""),
+                (away, home, away_box, home_box, "N" if neutral else "@"),
+            ):
+                game_num[team] += 1
+                row = {
+                    "school_slug": team,
+                    "school_name": schools[team],
+                    "season": season,
+                    "ranker": game_num[team],
+                    "team_game_num_season": game_num[team],
+                    "date": date.strftime("%Y-%m-%d"),
+                    "game_location": location,
+                    "opp_name_abbr": ALIASED_SCHOOLS.get(schools[opp], schools[opp]),
+                    "game_type": "REG (Conf)" if day % 3 else "REG (Non-Conf)",
+                    "team_game_result": "",
+                    "team_game_score": "",
+                    "opp_team_game_score": "",
+                    "overtimes": "",
+                }
+                if completed:
+                    row["team_game_result"] = (
+                        "W" if box["team_game_score"] > opp_box["team_game_score"] else "L"
+                    )
+                    row["team_game_score"] = box["team_game_score"]
+                    row["opp_team_game_score"] = opp_box["team_game_score"]
+                for stat in BOX_SCORE_STATS:
+                    row[stat] = box.get(stat, "")
+                    row[f"opp_{stat}"] = opp_box.get(stat, "")
+                rows.append(row)
+
+    return schools, pd.DataFrame(rows)
+
+
+def _cell(tag: str, stat: str, value, link: Optional[str] = None) -> str:
+    text = "" if value is None else escape(str(value))
+    if link and text:
+        text = f'<a href="{escape(link)}">{text}</a>'
+    return f'<{tag} data-stat="{stat}">{text}</{tag}>'
+
+
+def render_gamelog_page(team_rows: pd.DataFrame, school_name: str) -> str:
+    stat_cols = [
+        "team_game_num_season",
+        "date",
+        "game_location",
+        "opp_name_abbr",
+        "game_type",
+        "team_game_result",
+        "team_game_score",
+        "opp_team_game_score",
+        "overtimes",
+    ] + BOX_SCORE_STATS + [f"opp_{stat}" for stat in BOX_SCORE_STATS]
+
+    body = []
+    for i, row in enumerate(team_rows.to_dict("records")):
+        if i and i % 20 == 0:
+            # The live site repeats the header inside tbody every 20 games.
+            body.append('<tr class="thead"><th data-stat="ranker">Rk</th></tr>')
+        cells = [_cell("th", "ranker", row["ranker"])]
+        for col in stat_cols:
+            link = f"/cbb/boxscores/{row['date']}.html" if col == "date" else None
+            cells.append(_cell("td", col, row[col], link))
+        body.append("<tr>" + "".join(cells) + "</tr>")
+
+    return (
+        "<!DOCTYPE html><html><head><meta charset=\"utf-8\">"
+        f"<title>{escape(school_name)} Game Log</title></head><body>"
+        '<table id="team_game_log"><thead><tr><th data-stat="ranker">Rk</th>'
+        "</tr></thead><tbody>" + "".join(body) + "</tbody></table></body></html>"
+    )
+
+
+def render_school_list_page(schools: dict[str, str], season: int) -> str:
+    rows = "".join(
+        "<tr>"
+        + _cell("th", "ranker", i)
+        + _cell("td", "school_name", name, f"/cbb/schools/{slug}/men/{season}.html")
+        + "</tr>"
+        for i, (slug, name) in enumerate(schools.items(), 1)
+    )
+    return (
+        "<!DOCTYPE html><html><body><table id=\"basic_school_stats\"><thead><tr>"
+        "<th>Rk</th><th>School</th></tr></thead><tbody>"
+        + rows
+        + "</tbody></table></body></html>"
+    )
+
+
+def render_conference_page(team_names: list[str], season: int) -> str:
+    rows = "".join(
+        f"<tr><td>{escape(name)}</td><td>1950</td><td>{season}</td></tr>"
+        for name in team_names
+    )
+    return (
+        "<!DOCTYPE html><html><body><table id=\"schools\"><thead><tr>"
+        "<th>School</th><th>From</th><th>To</th></tr></thead><tbody>"
+        + rows
+        + "</tbody></table></body></html>"
+    )
+
+
+def build_synthetic_corpus(
+    corpus_dir: str | Path,
+    *,
+    season: int = 2026,
+    n_teams: int = 40,
+    n_dates: int = 30,
+    seed: int = 0,
+) -> pd.DataFrame:
+    """Write a synthetic corpus; returns the underlying gamelog rows."""
+    corpus_dir = Path(corpus_dir)
+    schools, games = synthesize_schedule(
+        n_teams, season=season, n_dates=n_dates, seed=seed
+    )
+
+    def write(path: str, html: str) -> None:
+        target = corpus_dir / path
+        target.parent.mkdir(parents=True, exist_ok=True)
+        target.write_text(html, encoding="utf-8")
+
+    write(
+        f"cbb/seasons/{season}-school-stats.html",
+        render_school_list_page(schools, season),
+    )
+    for slug, team_rows in games.groupby("school_slug", sort=False):
+        write(
+            f"cbb/schools/{slug}/{season}-gamelogs.html",
+            render_gamelog_page(team_rows, schools[slug]),
+        )
+
+    names = list(schools.values())
+    conf_slugs = list(CONF_MAP.values())
+    for i, slug in enumerate(conf_slugs):
+        write(
+            f"cbb/conferences/{slug}/men/schools.html",
+            render_conference_page(names[i :: len(conf_slugs)], season),
+        )
+    return games
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Build a stand-in server corpus.")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    synth = sub.add_parser("synth", help="Generate synthetic pages.")
+    synth.add_argument("corpus_dir")
+    synth.add_argument("--season", type=int, default=2026)
+    synth.add_argument("--teams", type=int, default=40)
+    synth.add_argument("--dates", type=int, default=30)
+    synth.add_argument("--seed", type=int, default=0)
+
+    record = sub.add_parser("record", help="Copy pages out of the HTTP cache.")
+    record.add_argument("corpus_dir")
+    record.add_argument("--cache-dir", default=DEFAULT_CACHE_DIR)
+
+    args = parser.parse_args()
+    if args.command == "synth":
+        games = build_synthetic_corpus(
+            args.corpus_dir,
+            season=args.season,
+            n_teams=args.teams,
+            n_dates=args.dates,
+            seed=args.seed,
+        )
+        print(f"Wrote {games['school_slug'].nunique()} gamelog pages to {args.corpus_dir}")
+    else:
+        written = record_corpus(args.corpus_dir, args.cache_dir)
+        print(f"Recorded {written} cached pages to {args.corpus_dir}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,181 @@
+"""Local HTTP stand-in for Sports Reference that serves a recorded corpus.
+
+Latency, 429 responses and server errors can be injected so the scrapers'
+rate limiting and retry paths get exercised without touching the live site.
+
+    python -m NCAA_BBALL_MODELING.benchmarks.standin_server CORPUS_DIR \\
+        --port 8765 --latency 0.2 --rate-429 0.05 --error-rate 0.02
+
+Then point the scrapers at it with ``SPORTS_REFERENCE_BASE_URL`` or
+``gamelog_scraping.set_base_url("http://127.0.0.1:8765")``.
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import random
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from email.utils import formatdate
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Optional
+
+
+@dataclass
+class StandInConfig:
+    """Fault injection knobs; rates are probabilities per request."""
+
+    latency: float = 0.0
+    jitter: float = 0.0
+    rate_429: float = 0.0
+    error_rate: float = 0.0
+    retry_after: float = 1.0
+    seed: Optional[int] = 0
+
+
+@dataclass
+class StandInStats:
+    counts: Counter = field(default_factory=Counter)
+    lock: threading.Lock = field(default_factory=threading.Lock)
+
+    def add(self, key: str) -> None:
+        with self.lock:
+            self.counts[key] += 1
+
+
+class StandInServer:
+    """Threaded HTTP server over a corpus directory; usable as a context manager."""
+
+    def __init__(
+        self,
+        corpus_dir: str | Path,
+        config: Optional[StandInConfig] = None,
+        *,
+        host: str = "127.0.0.1",
+        port: int = 0,
+    ):
+        self.corpus_dir = Path(corpus_dir)
+        self.config = config or StandInConfig()
+        self.stats = StandInStats()
+        self._rng = random.Random(self.config.seed)
+        self._rng_lock = threading.Lock()
+        self._httpd = ThreadingHTTPServer((host, port), self._handler_class())
+        self._httpd.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "StandInServer":
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def __enter__(self) -> "StandInServer":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+    def _draw(self) -> float:
+        with self._rng_lock:
+            return self._rng.random()
+
+    def _handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):  # noqa: N802 - http.server naming
+                config = server.config
+                server.stats.add("requests")
+                delay = config.latency + config.jitter * server._draw()
+                if delay:
+                    time.sleep(delay)
+
+                draw = server._draw()
+                if draw < config.rate_429:
+                    server.stats.add("429")
+                    self._send(429, b"Too Many Requests", {"Retry-After": str(config.retry_after)})
+                    return
+                if draw < config.rate_429 + config.error_rate:
+                    server.stats.add("500")
+                    self._send(500, b"Internal Server Error")
+                    return
+
+                path = (server.corpus_dir / self.path.split("?", 1)[0].lstrip("/")).resolve()
+                if server.corpus_dir.resolve() not in path.parents or not path.is_file():
+                    server.stats.add("404")
+                    self._send(404, b"Not Found")
+                    return
+
+                body = path.read_bytes()
+                etag = '"' + hashlib.md5(body).hexdigest() + '"'
+                headers = {
+                    "ETag": etag,
+                    "Last-Modified": formatdate(path.stat().st_mtime, usegmt=True),
+                    "Content-Type": "text/html; charset=utf-8",
+                }
+                if self.headers.get("If-None-Match") == etag:
+                    server.stats.add("304")
+                    self._send(304, b"", headers)
+                    return
+                server.stats.add("200")
+                self._send(200, body, headers)
+
+            def _send(self, status, body, headers=None):
+                self.send_response(status)
+                for key, value in (headers or {}).items():
+                    self.send_header(key, value)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Serve a corpus as a Sports Reference stand-in.")
+    parser.add_argument("corpus_dir")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds added to every response.")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Extra random latency (seconds).")
+    parser.add_argument("--rate-429", type=float, default=0.0, help="Share of requests answered with 429.")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Share of requests answered with 500.")
+    parser.add_argument("--retry-after", type=float, default=1.0, help="Retry-After seconds sent with 429s.")
+    args = parser.parse_args()
+
+    config = StandInConfig(
+        latency=args.latency,
+        jitter=args.jitter,
+        rate_429=args.rate_429,
+        error_rate=args.error_rate,
+        retry_after=args.retry_after,
+        seed=None,
+    )
+    server = StandInServer(args.corpus_dir, config, host=args.host, port=args.port)
+    print(f"Serving {args.corpus_dir} at {server.base_url} (Ctrl+C to stop)")
+    try:
+        server._httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server._httpd.server_close()
+        print(dict(server.stats.counts))
+
+
+if __name__ == "__main__":
+    main()
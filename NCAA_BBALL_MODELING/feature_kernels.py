@@ -0,0 +1,254 @@
+"""Vectorized per-team rolling and cumulative stats over group-sorted rows.
+
+Rows must be sorted so each group (team-season) is contiguous and in game
+order. A window for row ``i`` covers the rows before it in its group, the
+same rows ``s.shift(1).rolling(w, min_periods=1)`` sees. All columns and
+windows come from one pair of prefix sums (values and non-NaN counts), so the
+cost does not grow with the number of groups.
+
+``prior_window_stats`` computes any list of windows plus exponentially
+weighted means in one pass. It runs as a compiled loop when numba is
+installed and falls back to NumPy otherwise.
+"""
+
+from __future__ import annotations
+
+from typing import Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+try:
+    import numba
+except ImportError:  # pragma: no cover - optional dependency
+    numba = None
+
+
+BACKENDS = ("numba", "numpy")
+
+
+def group_first_rows(keys: Sequence[np.ndarray]) -> np.ndarray:
+    """Index of the first row of each row's group, for group-contiguous ``keys``."""
+    n = len(keys[0]) if len(keys) else 0
+    new_group = np.zeros(n, dtype=bool)
+    if n:
+        new_group[0] = True
+        for key in keys:
+            key = np.asarray(key)
+            new_group[1:] |= key[1:] != key[:-1]
+    return np.maximum.accumulate(np.where(new_group, np.arange(n), 0))
+
+
+def pair_rows(ids) -> np.ndarray:
+    """Position of the other row sharing each row's id, or -1 unless exactly two do."""
+    codes, uniques = pd.factorize(np.asarray(ids))
+    rows = np.arange(len(codes))
+    first = np.empty(len(uniques), dtype=np.int64)
+    last = np.empty(len(uniques), dtype=np.int64)
+    # Reversed, the last write per code is its first row.
+    first[codes[::-1]] = rows[::-1]
+    last[codes] = rows
+    mirror = np.where(rows == first[codes], last[codes], first[codes])
+    return np.where(np.bincount(codes, minlength=len(uniques))[codes] == 2, mirror, -1)
+
+
+def _as_matrix(values) -> np.ndarray:
+    matrix = np.asarray(values, dtype=np.float64)
+    return matrix.reshape(len(matrix), -1)
+
+
+def _prefix_sums(matrix: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    valid = ~np.isnan(matrix)
+    zeros = np.zeros((1, matrix.shape[1]))
+    sums = np.concatenate([zeros, np.cumsum(np.where(valid, matrix, 0.0), axis=0)])
+    counts = np.concatenate([zeros, np.cumsum(valid, axis=0, dtype=np.float64)])
+    return sums, counts
+
+
+class PriorWindows:
+    """Sums and counts of the rows before each row in its group.
+
+    ``values`` is an (n, k) array (or n-vector); ``first`` comes from
+    ``group_first_rows``. Windows are in games; ``None`` means every earlier
+    game in the group.
+    """
+
+    def __init__(self, values, first: np.ndarray):
+        self.matrix = _as_matrix(values)
+        self.first = np.asarray(first)
+        self.rows = np.arange(len(self.matrix))
+        self._sums, self._counts = _prefix_sums(self.matrix)
+
+    def _bounds(self, window: Optional[int]) -> np.ndarray:
+        if window is None:
+            return self.first
+        return np.maximum(self.first, self.rows - window)
+
+    def sum_count(self, window: Optional[int]) -> tuple[np.ndarray, np.ndarray]:
+        lo = self._bounds(window)
+        sums = self._sums[self.rows] - self._sums[lo]
+        counts = self._counts[self.rows] - self._counts[lo]
+        return sums, counts
+
+    def sum(self, window: Optional[int]) -> np.ndarray:
+        """``s.shift(1).rolling(window, min_periods=1).sum()`` per group."""
+        sums, counts = self.sum_count(window)
+        return np.where(counts > 0, sums, np.nan)
+
+    def mean(self, window: Optional[int]) -> np.ndarray:
+        """``s.shift(1).rolling(window, min_periods=1).mean()`` per group."""
+        sums, counts = self.sum_count(window)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return np.where(counts > 0, sums / counts, np.nan)
+
+    def cumsum(self) -> np.ndarray:
+        """``s.shift(1).cumsum()`` per group: NaN where the previous game is NaN."""
+        sums, _ = self.sum_count(None)
+        previous = np.full_like(self.matrix, np.nan)
+        previous[1:] = self.matrix[:-1]
+        missing = (self.rows == self.first)[:, None] | np.isnan(previous)
+        return np.where(missing, np.nan, sums)
+
+    def cumsum_by(self, labels, n_labels: int) -> np.ndarray:
+        """``cumsum`` over only the earlier rows that share each row's label.
+
+        The same as running ``cumsum`` on the rows of one label at a time
+        (home, away and neutral games, say), for every label in one pass.
+        ``labels`` are ints in ``[0, n_labels)``.
+        """
+        labels = np.asarray(labels, dtype=np.int64)
+        n, k = self.matrix.shape
+        slots = labels[:, None] * k + np.arange(k)
+        spread = np.zeros((n, n_labels * k))
+        np.put_along_axis(spread, slots, np.where(np.isnan(self.matrix), 0.0, self.matrix), axis=1)
+        prefix = np.concatenate([np.zeros((1, n_labels * k)), np.cumsum(spread, axis=0)])
+        sums = np.take_along_axis(prefix[self.rows] - prefix[self.first], slots, axis=1)
+
+        # Each row's previous same-label row (or -1); NaN there, or none in
+        # the group, leaves the row NaN like ``shift(1).cumsum()``.
+        last = np.full((n, n_labels), -1)
+        for label in range(n_labels):
+            last[:, label] = np.maximum.accumulate(np.where(labels == label, self.rows, -1))
+        previous = np.full(n, -1)
+        previous[1:] = last[self.rows[:-1], labels[1:]]
+        missing = (previous < self.first)[:, None] | np.isnan(self.matrix[np.maximum(previous, 0)])
+        return np.where(missing, np.nan, sums)
+
+
+def halflife_decay(halflife: float) -> float:
+    """Weight kept per game by an EWMA with this half-life (``1 - alpha``)."""
+    return 0.5 ** (1.0 / halflife)
+
+
+def _prior_stats_python(matrix, first, windows, decays):
+    """One loop over the rows: window sums/counts and EWMAs of the earlier rows.
+
+    The EWMA follows ``ewm(adjust=True, ignore_na=False)``: weights decay
+    with every game, observed or not. Compiled with numba when available.
+    """
+    n, k = matrix.shape
+    sums = np.zeros((len(windows), n, k))
+    counts = np.zeros((len(windows), n, k))
+    ewm = np.full((len(decays), n, k), np.nan)
+    weighted = np.full((len(decays), k), np.nan)
+    old_weight = np.ones((len(decays), k))
+    for i in range(n):
+        if first[i] == i:
+            weighted[:, :] = np.nan
+            old_weight[:, :] = 1.0
+        for w in range(len(windows)):
+            for j in range(max(first[i], i - windows[w]), i):
+                for c in range(k):
+                    value = matrix[j, c]
+                    if not np.isnan(value):
+                        sums[w, i, c] += value
+                        counts[w, i, c] += 1.0
+        for d in range(len(decays)):
+            for c in range(k):
+                ewm[d, i, c] = weighted[d, c]
+                value = matrix[i, c]
+                if not np.isnan(weighted[d, c]):
+                    old_weight[d, c] *= decays[d]
+                    if not np.isnan(value):
+                        if weighted[d, c] != value:
+                            weighted[d, c] = (old_weight[d, c] * weighted[d, c] + value) / (
+                                old_weight[d, c] + 1.0
+                            )
+                        old_weight[d, c] += 1.0
+                elif not np.isnan(value):
+                    weighted[d, c] = value
+    return sums, counts, ewm
+
+
+# Compiled on first use in each process. No on-disk cache: it records the
+# module path, and this package is imported under two names.
+_prior_stats_compiled = (
+    numba.njit(nogil=True)(_prior_stats_python) if numba is not None else None
+)
+
+
+def _prior_ewm_numpy(matrix, first, decays) -> np.ndarray:
+    """The EWMA recurrence of ``_prior_stats_python``, stepped by game number
+    so each step is vectorized across groups."""
+    n, k = matrix.shape
+    ewm = np.full((len(decays), n, k), np.nan)
+    starts = np.flatnonzero(first == np.arange(n))
+    lengths = np.diff(np.append(starts, n))
+    decay = np.asarray(decays, dtype=np.float64)[:, None, None]
+    weighted = np.full((len(decays), len(starts), k), np.nan)
+    old_weight = np.ones_like(weighted)
+    for step in range(int(lengths.max()) if n else 0):
+        active = np.flatnonzero(lengths > step)
+        rows = starts[active] + step
+        current, previous = matrix[rows][None], weighted[:, active]
+        ewm[:, rows] = previous
+        observed, seen = ~np.isnan(current), ~np.isnan(previous)
+        scaled = np.where(seen, old_weight[:, active] * decay, old_weight[:, active])
+        with np.errstate(invalid="ignore"):
+            blended = np.where(
+                previous != current, (scaled * previous + current) / (scaled + 1.0), previous
+            )
+        weighted[:, active] = np.where(
+            seen & observed, blended, np.where(observed, current, previous)
+        )
+        old_weight[:, active] = np.where(seen & observed, scaled + 1.0, scaled)
+    return ewm
+
+
+def resolve_backend(backend: Optional[str] = None) -> str:
+    """``backend`` checked, or numba when installed and NumPy otherwise."""
+    if backend is None:
+        return "numba" if numba is not None else "numpy"
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown kernel backend {backend!r}; expected one of {BACKENDS}")
+    if backend == "numba" and numba is None:
+        raise ImportError("numba is not installed")
+    return backend
+
+
+def prior_window_stats(
+    values,
+    first: np.ndarray,
+    windows: Sequence[int],
+    halflives: Sequence[float] = (),
+    backend: Optional[str] = None,
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Window sums/counts and EWMAs over the rows before each row in its group.
+
+    Returns ``(sums, counts, ewm)``: ``sums`` and ``counts`` are
+    ``(len(windows), n, k)`` over each row's previous ``w`` rows (non-NaN
+    values only), and ``ewm`` is ``(len(halflives), n, k)``, matching
+    ``s.shift(1).ewm(halflife=h).mean()`` per group.
+    """
+    matrix = _as_matrix(values)
+    first = np.asarray(first, dtype=np.int64)
+    window_array = np.asarray(windows, dtype=np.int64)
+    decays = np.asarray([halflife_decay(h) for h in halflives], dtype=np.float64)
+    if resolve_backend(backend) == "numba":
+        return _prior_stats_compiled(np.ascontiguousarray(matrix), first, window_array, decays)
+
+    prior = PriorWindows(matrix, first)
+    pairs = [prior.sum_count(int(w)) for w in window_array]
+    sums = np.stack([s for s, _ in pairs]) if pairs else np.zeros((0,) + matrix.shape)
+    counts = np.stack([c for _, c in pairs]) if pairs else np.zeros((0,) + matrix.shape)
+    return sums, counts, _prior_ewm_numpy(matrix, first, decays)
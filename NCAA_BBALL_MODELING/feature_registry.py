@@ -0,0 +1,524 @@
+"""Registry of engineered features, evaluated lazily from what they need.
+
+Each feature declares the frame columns it reads (``inputs``) and the
+features or columns it builds on (``depends``). ``plan`` resolves a list of
+names, for example a ModelBundle's, to their transitive closure, and
+``compute_features`` builds only those columns. ``add_features`` and
+``add_opponent_features`` stay the full build; this is the path for scoring
+a model or trying a research feature without building everything else.
+Both compute through the same formula helpers in ``utils``, so a feature's
+arithmetic is defined once.
+
+Besides the fixed names below, these templates resolve for any window,
+half-life or column:
+
+    win_pct_last_<w>, efg_pct_last_<w>
+    avg_<col>_last_<w>            mean of the previous w games
+    ewm_<col>_hl_<h>              EWMA of earlier games, half-life h
+    avg_<col>_comp_last_<w>       team minus opponent rolling mean
+    avg_score_comp_last_<w>, efg_comp_last_<w>
+    sos_net_rtg_last_<w>          opponents' net rating over the last w games
+    opp_<name>                    the opponent's value of a feature or column
+
+Rows are the ones ``add_opponent_features`` keeps: games whose opponent row
+is present.
+"""
+
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass
+from typing import Callable, Iterable, Optional
+
+import numpy as np
+import pandas as pd
+
+try:
+    from . import ratings, schedule_strength, teams, utils
+    from .feature_kernels import PriorWindows, group_first_rows, prior_window_stats
+    from .schema import FEATURE_FLOAT_DTYPE, GAMELOG_DTYPES, compact_frame
+    from .storage import read_gamelogs
+except ImportError:
+    import ratings
+    import schedule_strength
+    import teams
+    import utils
+    from feature_kernels import PriorWindows, group_first_rows, prior_window_stats
+    from schema import FEATURE_FLOAT_DTYPE, GAMELOG_DTYPES, compact_frame
+    from storage import read_gamelogs
+
+
+SORT_KEY = ["season", "team_id", "date"]
+
+# Gamelog columns cleaning reads, and the ones calculate_possessions reads.
+CLEAN_COLUMNS = ["season", "school_name", "opp_name_abbr", "date"]
+POSSESSION_INPUTS = [
+    "fga",
+    "fg",
+    "fta",
+    "orb",
+    "drb",
+    "tov",
+    "opp_fga",
+    "opp_fg",
+    "opp_fta",
+    "opp_orb",
+    "opp_drb",
+    "opp_tov",
+]
+POSSESSION_COLUMNS = ["possessions", "team_possessions", "opp_possessions"]
+
+# Columns a cleaned season with possessions has before any feature is built.
+BASE_COLUMNS = (
+    set(GAMELOG_DTYPES) | {"game_id"} | set(teams.TEAM_ID_COLUMNS) | set(POSSESSION_COLUMNS)
+)
+
+SUM_INPUTS = ("team_game_score", "opp_team_game_score", "possessions")
+
+
+@dataclass(frozen=True)
+class Feature:
+    """One engineered column and what computing it reads.
+
+    ``rolls`` are ``(kind, column, span)`` kernel requests, ``"window"`` or
+    ``"ewm"``; one kernel call serves every request in a plan.
+    """
+
+    name: str
+    compute: Callable[["Evaluation"], np.ndarray]
+    inputs: tuple[str, ...] = ()
+    depends: tuple[str, ...] = ()
+    rolls: tuple[tuple[str, str, float], ...] = ()
+
+
+REGISTRY: dict[str, Feature] = {}
+TEMPLATES: list[tuple[re.Pattern, Callable[[re.Match], Feature]]] = []
+
+
+def register(name: str, *, inputs=(), depends=(), rolls=()):
+    """Decorator adding ``compute(ev)`` to the registry under ``name``."""
+
+    def wrap(compute):
+        REGISTRY[name] = Feature(name, compute, tuple(inputs), tuple(depends), tuple(rolls))
+        return compute
+
+    return wrap
+
+
+def register_columns(names: tuple[str, ...], *, inputs=(), depends=()):
+    """Decorator adding ``compute(ev) -> tuple`` as the features ``names``.
+
+    For a ``utils`` helper that returns several columns together; it runs
+    once per evaluation whichever of them are asked for.
+    """
+
+    def wrap(compute):
+        def column(ev, i):
+            return ev.memo(compute.__name__, lambda: compute(ev))[i]
+
+        for i, name in enumerate(names):
+            REGISTRY[name] = Feature(
+                name, lambda ev, i=i: column(ev, i), tuple(inputs), tuple(depends)
+            )
+        return compute
+
+    return wrap
+
+
+def template(pattern: str):
+    """Decorator adding a ``factory(match) -> Feature`` for names matching ``pattern``."""
+
+    def wrap(factory):
+        TEMPLATES.append((re.compile(pattern), factory))
+        return factory
+
+    return wrap
+
+
+def resolve(name: str) -> Optional[Feature]:
+    """The feature called ``name``, or None when no registry entry or template matches."""
+    if name in REGISTRY:
+        return REGISTRY[name]
+    for pattern, factory in TEMPLATES:
+        match = pattern.fullmatch(name)
+        if match:
+            return factory(match)
+    return None
+
+
+def _source(name: str) -> dict:
+    """``depends`` for a registered feature, ``inputs`` for anything else."""
+    return {"depends": (name,)} if name in REGISTRY else {"inputs": (name,)}
+
+
+def plan(names: Iterable[str], columns: Iterable[str]) -> tuple[list[Feature], set[str]]:
+    """Features needed for ``names``, dependencies first, and the columns they read.
+
+    Names present in ``columns`` are read as they are. Raises KeyError for a
+    name that is neither a column nor a feature, ValueError on a cycle.
+    """
+    columns = set(columns)
+    order, reads, state = [], set(), {}
+
+    def visit(name):
+        if name in columns:
+            reads.add(name)
+            return
+        if state.get(name) == "done":
+            return
+        if state.get(name) == "visiting":
+            raise ValueError(f"Feature dependency cycle at {name!r}")
+        feature = resolve(name)
+        if feature is None:
+            raise KeyError(f"Unknown feature or column: {name!r}")
+        state[name] = "visiting"
+        for column in feature.inputs:
+            if column not in columns:
+                raise KeyError(f"{name!r} needs column {column!r}")
+            reads.add(column)
+        for dependency in feature.depends:
+            visit(dependency)
+        state[name] = "done"
+        order.append(feature)
+
+    for name in names:
+        visit(name)
+    return order, reads
+
+
+def feature_names(source) -> list[str]:
+    """Feature names of a ModelBundle (baseline then residual), or ``source`` as a list."""
+    if hasattr(source, "baseline_features") and hasattr(source, "residual_features"):
+        return list(dict.fromkeys(source.baseline_features + source.residual_features))
+    return list(dict.fromkeys(source))
+
+
+class Evaluation:
+    """A season frame sorted like ``add_features`` and the values computed on it.
+
+    ``get`` computes a feature on first use (its dependencies first) and
+    keeps it; intermediate results shared by several features are memoized.
+    """
+
+    def __init__(self, frame: pd.DataFrame, features: list[Feature], backend=None):
+        self.frame = frame.sort_values(SORT_KEY).reset_index(drop=True)
+        self.features = {feature.name: feature for feature in features}
+        self.backend = backend
+        self.values: dict[str, np.ndarray] = {}
+        self._memo: dict = {}
+        self.rows = np.arange(len(self.frame))
+        self.first = group_first_rows(
+            [self.frame["season"].to_numpy(), self.frame["team_id"].to_numpy()]
+        )
+        rolls = sorted({roll for feature in features for roll in feature.rolls})
+        self._roll_columns = list(dict.fromkeys(column for _, column, _ in rolls))
+        self._windows = sorted({int(span) for kind, _, span in rolls if kind == "window"})
+        self._halflives = sorted({span for kind, _, span in rolls if kind == "ewm"})
+
+    def get(self, name: str) -> np.ndarray:
+        if name not in self.values:
+            feature = self.features.get(name)
+            if feature is None:
+                self.values[name] = self._column(name)
+            else:
+                self.values[name] = np.asarray(feature.compute(self))
+        return self.values[name]
+
+    def _column(self, name: str) -> np.ndarray:
+        """A frame column as add_features sees it after ``_nullable_to_float``."""
+        return utils._float_values(self.frame[name])
+
+    def memo(self, key, compute):
+        if key not in self._memo:
+            self._memo[key] = compute()
+        return self._memo[key]
+
+    def _rolled(self):
+        matrix = np.column_stack([self.get(column) for column in self._roll_columns])
+        return prior_window_stats(
+            matrix, self.first, self._windows, self._halflives, self.backend
+        )
+
+    def window(self, column: str, window: int) -> tuple[np.ndarray, np.ndarray]:
+        """Sums and non-NaN counts of ``column`` over each row's previous ``window`` games."""
+        sums, counts, _ = self.memo("rolled", self._rolled)
+        i, w = self._roll_columns.index(column), self._windows.index(window)
+        return sums[w, :, i], counts[w, :, i]
+
+    def window_sum(self, column: str, window: int) -> np.ndarray:
+        return utils._prior_sums(*self.window(column, window))
+
+    def window_mean(self, column: str, window: int) -> np.ndarray:
+        return utils._prior_means(*self.window(column, window))
+
+    def ewm(self, column: str, halflife: float) -> np.ndarray:
+        _, _, ewm = self.memo("rolled", self._rolled)
+        return ewm[self._halflives.index(halflife), :, self._roll_columns.index(column)]
+
+    def mirror(self) -> tuple[np.ndarray, np.ndarray]:
+        """(opponent row of each row, rows that have one), as add_opponent_features pairs them."""
+
+        def pair():
+            mirror, matched = utils._opponent_rows(
+                self.frame["game_id"].to_numpy(), self.frame["team_id"].to_numpy()
+            )
+            return np.where(matched, mirror, self.rows), matched
+
+        return self.memo("mirror", pair)
+
+
+def _cum_sums(ev: Evaluation) -> np.ndarray:
+    return ev.memo(
+        "totals",
+        lambda: PriorWindows(np.column_stack([ev.get(c) for c in SUM_INPUTS]), ev.first),
+    )
+
+
+# Per-game columns (add_game_columns)
+
+
+@register("is_Home", inputs=("game_location",))
+def _is_home(ev):
+    return utils._home_flags(ev.frame["game_location"])
+
+
+@register("score_diff", inputs=("team_game_score", "opp_team_game_score"))
+def _score_diff(ev):
+    return ev.get("team_game_score") - ev.get("opp_team_game_score")
+
+
+@register("win", inputs=("team_game_result",))
+def _win(ev):
+    return np.asarray(utils._win_flags(ev.frame["team_game_result"]), dtype=np.float64)
+
+
+@register_columns(("off_rtg", "def_rtg", "net_rtg"), inputs=SUM_INPUTS)
+def _game_ratings(ev):
+    return utils._ratings(*(ev.get(column) for column in SUM_INPUTS))
+
+
+# Each team's earlier games (add_features)
+
+
+@register_columns(("cum_off_rtg", "cum_def_rtg", "cum_net_rtg"), inputs=SUM_INPUTS)
+def _cumulative_ratings(ev):
+    return utils._cumulative_ratings(_cum_sums(ev))
+
+
+@register_columns(
+    ("home_cum_net_rtg", "away_cum_net_rtg", "home_road_split"),
+    inputs=SUM_INPUTS,
+    depends=("is_Home",),
+)
+def _split_net_ratings(ev):
+    return utils._split_net_ratings(_cum_sums(ev), ev.get("is_Home"))
+
+
+@register_columns(("prev_game_date", "rest_days"), inputs=("date",))
+def _rest_days(ev):
+    previous, rest = utils._rest_days(ev.frame["date"], ev.first)
+    return previous.to_numpy(), rest.to_numpy(dtype=np.float64)
+
+
+@template(r"win_pct_last_(\d+)")
+def _win_pct(match):
+    window = int(match.group(1))
+    return Feature(
+        match.group(0),
+        lambda ev: utils._fill_zero(ev.window_mean("win", window)),
+        depends=("win",),
+        rolls=(("window", "win", window),),
+    )
+
+
+@template(r"efg_pct_last_(\d+)")
+def _efg_pct(match):
+    window = int(match.group(1))
+
+    def compute(ev):
+        return utils._fill_zero(utils._efg_pct(*(ev.window_sum(c, window) for c in ("fg", "fg3", "fga"))))
+
+    return Feature(
+        match.group(0),
+        compute,
+        inputs=("fg", "fg3", "fga"),
+        rolls=tuple(("window", c, window) for c in ("fg", "fg3", "fga")),
+    )
+
+
+# Team minus opponent (add_opponent_features); these come before the generic
+# avg_ template, which would otherwise claim them.
+
+
+def _stored(values: np.ndarray) -> np.ndarray:
+    """Values at the width the staged build stores team features between stages."""
+    return values.astype(FEATURE_FLOAT_DTYPE) if values.dtype.kind == "f" else values
+
+
+def _difference(name: str, left: str, right: str) -> Feature:
+    def compute(ev):
+        return _stored(ev.get(left)) - _stored(ev.get(right))
+
+    return Feature(name, compute, depends=(left, right))
+
+
+@template(r"avg_score_comp_last_(\d+)")
+def _score_comp(match):
+    column = f"avg_team_game_score_last_{match.group(1)}"
+    return _difference(match.group(0), column, f"opp_{column}")
+
+
+@template(r"efg_comp_last_(\d+)")
+def _efg_comp(match):
+    column = f"efg_pct_last_{match.group(1)}"
+    return _difference(match.group(0), column, f"opp_{column}")
+
+
+@template(r"avg_(\w+)_comp_last_(\d+)")
+def _avg_comp(match):
+    column = f"avg_{match.group(1)}_last_{match.group(2)}"
+    return _difference(match.group(0), column, f"opp_{column}")
+
+
+@template(r"avg_(\w+)_last_(\d+)")
+def _rolling_mean(match):
+    column, window = match.group(1), int(match.group(2))
+    return Feature(
+        match.group(0),
+        lambda ev: utils._fill_zero(ev.window_mean(column, window)),
+        rolls=(("window", column, window),),
+        **_source(column),
+    )
+
+
+@template(r"ewm_(\w+)_hl_([\d.]+)")
+def _ewm(match):
+    column, halflife = match.group(1), float(match.group(2))
+    return Feature(
+        match.group(0),
+        lambda ev: utils._fill_zero(ev.ewm(column, halflife)),
+        rolls=(("ewm", column, halflife),),
+        **_source(column),
+    )
+
+
+# The comps add_opponent_features builds, including ones no template covers.
+for _name, _column in utils.COMP_FEATURES.items():
+    REGISTRY[_name] = _difference(_name, _column, f"opp_{_column}")
+
+
+@register("net_rtg_home_interaction", depends=("net_rtg_comp", "is_Home"))
+def _net_rtg_home_interaction(ev):
+    return utils._home_interaction(ev.get("net_rtg_comp"), _stored(ev.get("is_Home")))
+
+
+# Opponent-adjusted ratings (ratings), fitted on the whole season frame
+
+
+def _adjusted(ev: Evaluation) -> np.ndarray:
+    def compute():
+        frame = ev.frame[["season", "date", "team_id", "opp_team_id"]].assign(
+            off_rtg=_stored(ev.get("off_rtg")),
+            possessions=ev.get("possessions"),
+            is_Home=_stored(ev.get("is_Home")),
+        )
+        return ratings.adjusted_ratings(frame).to_numpy()
+
+    return ev.memo("adjusted", compute)
+
+
+for _i, _name in enumerate(ratings.RATING_COLUMNS):
+    REGISTRY[_name] = Feature(
+        _name,
+        lambda ev, i=_i: _adjusted(ev)[:, i],
+        inputs=("season", "date", "team_id", "opp_team_id", "possessions"),
+        depends=("off_rtg", "is_Home"),
+    )
+
+
+# Strength of schedule (schedule_strength), also season-wide
+
+
+def _schedule(ev: Evaluation, window: int) -> np.ndarray:
+    def compute():
+        frame = ev.frame[schedule_strength.SOS_INPUTS]
+        return schedule_strength.schedule_strength(frame, window).to_numpy()
+
+    return ev.memo(("schedule", window), compute)
+
+
+@register("sos_net_rtg", inputs=schedule_strength.SOS_INPUTS)
+def _sos_net_rtg(ev):
+    return _schedule(ev, schedule_strength.SOS_WINDOW)[:, 0]
+
+
+@template(r"sos_net_rtg_last_(\d+)")
+def _sos_window(match):
+    window = int(match.group(1))
+    return Feature(
+        match.group(0),
+        lambda ev: _schedule(ev, window)[:, 1],
+        inputs=tuple(schedule_strength.SOS_INPUTS),
+    )
+
+
+
+@template(r"opp_(.+)")
+def _opponent(match):
+    source = match.group(1)
+
+    def compute(ev):
+        mirror, _ = ev.mirror()
+        return ev.get(source)[mirror]
+
+    # ``source`` may be a feature or a frame column; plan handles both.
+    return Feature(match.group(0), compute, inputs=("game_id",), depends=(source,))
+
+
+def compute_features(frame: pd.DataFrame, names: Iterable[str], backend=None) -> pd.DataFrame:
+    """Columns ``names`` for a cleaned season frame with possessions, computing only what they need.
+
+    ``frame`` is what ``add_features`` receives (one or more seasons). The
+    result is in the compact schema, sorted like the full build.
+    """
+    names = list(dict.fromkeys(names))
+    features, _ = plan(names, frame.columns)
+    ev = Evaluation(frame, features, backend)
+    out = pd.DataFrame({name: ev.get(name) for name in names})
+    _, matched = ev.mirror()
+    return compact_frame(out[matched].reset_index(drop=True))
+
+
+def gamelog_columns(names: Iterable[str]) -> list[str]:
+    """Stored gamelog columns needed to build ``names`` from scratch."""
+    _, reads = plan(names, BASE_COLUMNS)
+    columns = set(CLEAN_COLUMNS) | (reads & set(GAMELOG_DTYPES))
+    if reads & set(POSSESSION_COLUMNS):
+        columns |= set(POSSESSION_INPUTS)
+    return [column for column in GAMELOG_DTYPES if column in columns]
+
+
+def build_features(names, seasons, *, base_dir=None, backend=None) -> pd.DataFrame:
+    """``names`` (or a ModelBundle's features) for ``seasons``, read straight from gamelogs.
+
+    Only the gamelog columns the plan needs are read. Each season is cleaned
+    against its own schools, as the incremental feature state does, with the
+    saved team ids.
+    """
+    names = feature_names(names)
+    seasons = [seasons] if isinstance(seasons, (int, np.integer)) else list(seasons)
+    columns = gamelog_columns(names)
+    frames = []
+    for season in seasons:
+        gamelogs = read_gamelogs([season], columns=columns, base_dir=base_dir)
+        schools = utils._strip_ncaa_suffix(gamelogs["school_name"]).dropna().unique()
+        registry = teams.load_team_registry(schools, base_dir=base_dir)
+        frame = utils.clean_gamelogs(gamelogs, registry=registry)
+        if set(POSSESSION_INPUTS) <= set(frame.columns):
+            # Compact like the possessions stage, so values match the full build.
+            frame = compact_frame(utils.calculate_possessions(frame))
+        frames.append(compute_features(frame, names, backend))
+    if len(frames) == 1:
+        return frames[0]
+    # Categories differ between seasons, so re-apply the schema after concat.
+    return compact_frame(pd.concat(frames, ignore_index=True))
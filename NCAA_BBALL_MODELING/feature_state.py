@@ -0,0 +1,507 @@
+"""Per-team feature state so a nightly update only computes new games.
+
+For each team-season the state holds what ``add_features`` needs from earlier
+games: running sums behind the cumulative and home/away ratings, the last
+``MAX_WINDOW`` rows of every rolling input, and the last game date. It
+mirrors the default build (``utils.ROLL_WINDOWS``, no EWMA columns). Completed
+games are folded in once. Upcoming games are recomputed from a copy of the
+state on every run, because they change as soon as an earlier game finishes.
+
+Layout under ``<base_dir>/data/feature_state/season=2026``::
+
+    teams.pkl       {team_id: TeamState}
+    base.parquet    the season's ``add_features`` rows and season-wide columns
+                    (opponent join input)
+    code.txt        hash of the code that built them; a mismatch starts over
+
+``update_features`` hashes each team's cleaned rows. Teams whose rows did
+not change are skipped. Changed teams resume from their state, or start over
+when a game they already consumed changed. Adjusted ratings and strength of
+schedule (``SEASON_WIDE``) couple every team, so they are refitted for the
+season on each update. Only rows on dates with a new or changed game, or
+whose season-wide columns moved, are rewritten in the features store.
+``verify_features`` rebuilds the season from scratch and diffs it against
+the stored output.
+"""
+
+from __future__ import annotations
+
+import copy
+import os
+import pickle
+import sys
+import time
+import uuid
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+try:
+    from . import feature_kernels, ratings, schedule_strength, schema, teams, utils
+    from .feature_kernels import group_first_rows
+    from .matrix_cache import build_matrix_cache, read_csv_cached
+    from .schema import compact_frame
+    from .stage_cache import StageCache, code_key, stage_key
+    from .storage import read_gamelogs
+    from .warehouse import replace_rows
+except ImportError:
+    import feature_kernels
+    import ratings
+    import schedule_strength
+    import schema
+    import teams
+    import utils
+    from feature_kernels import group_first_rows
+    from matrix_cache import build_matrix_cache, read_csv_cached
+    from schema import compact_frame
+    from stage_cache import StageCache, code_key, stage_key
+    from storage import read_gamelogs
+    from warehouse import replace_rows
+
+
+STATE_DIRNAME = "feature_state"
+
+WINDOWS = sorted(set(utils.ROLL_WINDOWS) | {utils.BASE_WINDOW})
+MAX_WINDOW = max(WINDOWS)
+
+# Inputs of the running sums (score, allowed, possessions) and rolling windows.
+SUM_INPUTS = ["team_game_score", "opp_team_game_score", "possessions"]
+ROLL_INPUTS = ["win", "fg", "fg3", "fga"] + utils.ROLL_COLS
+
+# Columns the state computes, in the order ``add_features`` adds them.
+STATE_COLUMNS = (
+    [
+        "cum_off_rtg",
+        "cum_def_rtg",
+        "cum_net_rtg",
+        "home_cum_net_rtg",
+        "away_cum_net_rtg",
+        "home_road_split",
+        f"win_pct_last_{utils.BASE_WINDOW}",
+    ]
+    + [f"efg_pct_last_{w}" for w in WINDOWS]
+    + [f"avg_{col}_last_{w}" for col in utils.ROLL_COLS for w in WINDOWS]
+    + ["prev_game_date", "rest_days"]
+)
+
+FEATURE_KEY = ["season", "school_name", "date", "team_game_num_season"]
+
+# Columns fitted across every team of the season, after the per-team ones,
+# and the function that builds them from ``base``.
+SEASON_WIDE = [
+    (ratings.RATING_COLUMNS, ratings.adjusted_ratings),
+    (schedule_strength.SOS_COLUMNS, schedule_strength.schedule_strength),
+]
+
+
+def _zero_nan(value: float) -> float:
+    return 0.0 if np.isnan(value) else value
+
+
+def _net_rtg(sums: np.ndarray) -> float:
+    return utils._ratings(*sums)[2]
+
+
+@dataclass
+class RunningSums:
+    """``s.shift(1).cumsum()`` for the SUM_INPUTS over one team's rows."""
+
+    sums: np.ndarray = field(default_factory=lambda: np.zeros(len(SUM_INPUTS)))
+    previous: Optional[np.ndarray] = None
+
+    def value(self) -> np.ndarray:
+        if self.previous is None:
+            return np.full(len(SUM_INPUTS), np.nan)
+        return np.where(np.isnan(self.previous), np.nan, self.sums)
+
+    def push(self, values: np.ndarray) -> None:
+        self.sums = self.sums + np.where(np.isnan(values), 0.0, values)
+        self.previous = values
+
+
+@dataclass
+class TeamState:
+    """Everything ``add_features`` reads from a team-season's earlier rows."""
+
+    consumed: int = 0
+    prefix_hash: int = 0
+    rows_hash: int = 0
+    total: RunningSums = field(default_factory=RunningSums)
+    home: RunningSums = field(default_factory=RunningSums)
+    away: RunningSums = field(default_factory=RunningSums)
+    recent: np.ndarray = field(default_factory=lambda: np.empty((0, len(ROLL_INPUTS))))
+    last_date: Optional[pd.Timestamp] = None
+
+    def features(self, is_home: float, date) -> list:
+        """STATE_COLUMNS values for the next row, given its location and date."""
+        cum_off, cum_def, cum_net = utils._ratings(*self.total.value())
+        home = _zero_nan(_net_rtg(self.home.value())) if is_home == 1 else 0.0
+        away = _zero_nan(_net_rtg(self.away.value())) if is_home == 0 else 0.0
+
+        windows = {}
+        for w in WINDOWS:
+            recent = self.recent[-w:]
+            counts = (~np.isnan(recent)).sum(axis=0)
+            totals = np.where(np.isnan(recent), 0.0, recent).sum(axis=0)
+            with np.errstate(invalid="ignore", divide="ignore"):
+                windows[w] = (
+                    np.where(counts > 0, totals, np.nan),
+                    np.where(counts > 0, totals / np.maximum(counts, 1), np.nan),
+                )
+        efg = {}
+        for w, (totals, _) in windows.items():
+            efg[w] = _zero_nan(utils._efg_pct(*totals[1:4]))
+
+        values = [
+            _zero_nan(cum_off),
+            _zero_nan(cum_def),
+            _zero_nan(cum_net),
+            home,
+            away,
+            home - away,
+            _zero_nan(windows[utils.BASE_WINDOW][1][0]),
+        ]
+        values.extend(efg[w] for w in WINDOWS)
+        for i in range(len(utils.ROLL_COLS)):
+            values.extend(_zero_nan(windows[w][1][4 + i]) for w in WINDOWS)
+        previous = self.last_date if self.last_date is not None else pd.NaT
+        rest = (date - previous).days if pd.notna(previous) and pd.notna(date) else np.nan
+        values.extend([previous, 7.0 if np.isnan(rest) else float(rest)])
+        return values
+
+    def push(self, sums: np.ndarray, is_home: float, rolls: np.ndarray, date) -> None:
+        self.total.push(sums)
+        if is_home == 1:
+            self.home.push(sums)
+        elif is_home == 0:
+            self.away.push(sums)
+        self.recent = np.vstack([self.recent, rolls])[-MAX_WINDOW:]
+        self.last_date = date
+
+
+def _root(base_dir=None) -> Path:
+    return utils._resolve_base_dir() if base_dir is None else Path(base_dir)
+
+
+def state_dir(season: int, base_dir=None) -> Path:
+    return _root(base_dir) / "data" / STATE_DIRNAME / f"season={int(season)}"
+
+
+def _state_code() -> str:
+    # Whole modules, as for the stage cache: any edit to the code the state
+    # runs (or to the schema it is stored with) starts the season over.
+    code = code_key(
+        [
+            sys.modules[__name__],
+            utils,
+            feature_kernels,
+            ratings,
+            schedule_strength,
+            schema,
+            teams,
+        ]
+    )
+    params = {"windows": WINDOWS}
+    return stage_key(STATE_DIRNAME, "", code, params)
+
+
+def load_state(season: int, base_dir=None) -> tuple[dict, Optional[pd.DataFrame]]:
+    directory = state_dir(season, base_dir)
+    teams_path, base_path = directory / "teams.pkl", directory / "base.parquet"
+    code_path = directory / "code.txt"
+    if not teams_path.exists() or not base_path.exists() or not code_path.exists():
+        return {}, None
+    if code_path.read_text(encoding="utf-8") != _state_code():
+        return {}, None
+    with teams_path.open("rb") as handle:
+        states = pickle.load(handle)
+    return states, pd.read_parquet(base_path)
+
+
+def save_state(season: int, states: dict, base: pd.DataFrame, base_dir=None) -> None:
+    directory = state_dir(season, base_dir)
+    directory.mkdir(parents=True, exist_ok=True)
+    tag = uuid.uuid4().hex
+    scratch_teams = directory / f".teams.pkl.{tag}"
+    scratch_base = directory / f".base.parquet.{tag}"
+    try:
+        with scratch_teams.open("wb") as handle:
+            pickle.dump(states, handle)
+        base.to_parquet(scratch_base, index=False)
+        os.replace(scratch_base, directory / "base.parquet")
+        os.replace(scratch_teams, directory / "teams.pkl")
+        (directory / "code.txt").write_text(_state_code(), encoding="utf-8")
+    finally:
+        for scratch in (scratch_teams, scratch_base):
+            if scratch.exists():
+                scratch.unlink()
+
+
+def _registry(gamelogs: pd.DataFrame, base_dir=None) -> teams.TeamRegistry:
+    schools = utils._strip_ncaa_suffix(gamelogs["school_name"]).dropna().unique()
+    return teams.load_team_registry(schools, base_dir=base_dir)
+
+
+def season_inputs(season: int, base_dir=None) -> pd.DataFrame:
+    """The season's cleaned rows with possessions, sorted the way add_features sorts."""
+    gamelogs = read_gamelogs([season], base_dir=base_dir)
+    df = utils.clean_gamelogs(gamelogs, registry=_registry(gamelogs, base_dir))
+    df = compact_frame(utils.calculate_possessions(df))
+    df = df.sort_values(["season", "team_id", "date"]).reset_index(drop=True)
+    return df
+
+
+def _team_hashes(df: pd.DataFrame, first: np.ndarray) -> np.ndarray:
+    """Prefix hashes per row: entry i covers the team's rows before row i."""
+    rows = pd.util.hash_pandas_object(df, index=False).to_numpy()
+    position = np.arange(len(df)) - first
+    with np.errstate(over="ignore"):
+        weighted = rows * (position + 1).astype(np.uint64)
+        prefix = np.cumsum(weighted, dtype=np.uint64)
+    # Python ints, so differences of prefixes wrap without numpy warnings.
+    return [0] + [int(value) for value in prefix]
+
+
+def _step_inputs(df: pd.DataFrame):
+    games = utils.add_game_columns(utils._nullable_to_float(df.copy()))
+    sums = games[SUM_INPUTS].to_numpy(dtype=np.float64, na_value=np.nan)
+    rolls = games[ROLL_INPUTS].to_numpy(dtype=np.float64, na_value=np.nan)
+    completed = games["team_game_result"].notna().to_numpy()
+    return games, sums, games["is_Home"].to_numpy(), rolls, games["date"].to_numpy(), completed
+
+
+def _advance_teams(df: pd.DataFrame, saved: dict) -> tuple[pd.DataFrame, dict, dict]:
+    """Feature rows for every unconsumed row of teams whose rows changed.
+
+    Returns (emitted rows, updated states, {team_id: first emitted position}).
+    """
+    first = group_first_rows([df["team_id"].to_numpy()])
+    prefix = _team_hashes(df, first)
+    starts = np.flatnonzero(first == np.arange(len(df)))
+    ends = np.append(starts[1:], len(df))
+    team_ids = df["team_id"].to_numpy()
+
+    # Decide per team first, so game columns are only built for changed teams.
+    plan, states = [], {}
+    for start, end in zip(starts, ends):
+        team_id = int(team_ids[start])
+        rows_hash = (prefix[end] - prefix[start]) % 2**64
+        state = saved.get(team_id)
+        if state is not None and state.rows_hash == rows_hash:
+            states[team_id] = state
+            continue
+        if (
+            state is None
+            or state.consumed > end - start
+            or (prefix[start + state.consumed] - prefix[start]) % 2**64 != state.prefix_hash
+        ):
+            state = TeamState()
+        else:
+            state = copy.deepcopy(state)
+        state.rows_hash = rows_hash
+        states[team_id] = state
+        plan.append((team_id, start, end, state))
+
+    take = np.concatenate(
+        [np.arange(start + state.consumed, end) for _, start, end, state in plan] or [[]]
+    ).astype(np.int64)
+    games, sums, is_home, rolls, dates, completed = _step_inputs(df.iloc[take])
+    emit_values, resumed, j = [], {}, 0
+    for team_id, start, end, state in plan:
+        resumed[team_id] = state.consumed
+        pending = None
+        for i in range(start + state.consumed, end):
+            date = pd.Timestamp(dates[j])
+            # Rows after the first unfinished game are projected from a copy.
+            if pending is None and not completed[j]:
+                pending = copy.deepcopy(state)
+            current = state if pending is None else pending
+            emit_values.append(current.features(is_home[j], date))
+            current.push(sums[j], is_home[j], rolls[j], date)
+            if pending is None:
+                state.consumed += 1
+                state.prefix_hash = (prefix[i + 1] - prefix[start]) % 2**64
+            j += 1
+
+    emitted = games.reset_index(drop=True)
+    values = pd.DataFrame(emit_values, columns=STATE_COLUMNS)
+    for column in STATE_COLUMNS:
+        emitted[column] = values[column].to_numpy()
+    if not emitted.empty:
+        emitted["prev_game_date"] = pd.to_datetime(emitted["prev_game_date"])
+    return emitted, states, resumed
+
+
+def _positions(frame: pd.DataFrame) -> pd.Series:
+    return frame.groupby("team_id").cumcount()
+
+
+def update_features(
+    season: int = 2026,
+    *,
+    base_dir=None,
+    export_csv: bool = True,
+    output_path: Optional[str | Path] = None,
+) -> pd.DataFrame:
+    """Fold new games into the per-team state and refresh the affected feature rows.
+
+    Returns the rewritten rows of the features store. With no saved state the
+    whole season is emitted, which also builds the state.
+    """
+    start_time = time.perf_counter()
+    saved, base = load_state(season, base_dir)
+    df = season_inputs(season, base_dir)
+    emitted, states, resumed = _advance_teams(df, saved)
+    if base is not None and not resumed and set(states) == set(saved):
+        print(f"Features {season}: no team changed ({time.perf_counter() - start_time:.3f}s)")
+        return base.iloc[0:0]
+
+    # Replace each resumed team's rows from its first emitted position on,
+    # and drop teams that are no longer in the season.
+    removed_dates = set()
+    if base is not None:
+        team_ids = base["team_id"].astype(np.int64)
+        drop_from = team_ids.map(resumed).astype(float).fillna(np.inf)
+        drop = _positions(base).to_numpy() >= drop_from.to_numpy()
+        drop |= ~team_ids.isin(list(states)).to_numpy()
+        removed_dates = set(base.loc[drop, "date"])
+        base = base[~drop]
+    if base is None:
+        base = compact_frame(emitted)
+    elif not emitted.empty:
+        emitted = compact_frame(emitted[[c for c in base.columns if c in emitted.columns]])
+        base = compact_frame(pd.concat([base, emitted], ignore_index=True))
+    base = base.sort_values(["season", "team_id", "date"]).reset_index(drop=True)
+
+    # Season-wide columns couple teams, so a new game moves every later
+    # date; they are refitted for the season and compared instead.
+    refit_dates = set()
+    for columns, build in SEASON_WIDE:
+        fitted = compact_frame(build(base))
+        if set(columns) <= set(base.columns):
+            stored = base[columns].to_numpy(dtype=np.float64, na_value=np.nan)
+            same = (stored == fitted.to_numpy(dtype=np.float64)).all(axis=1)
+            refit_dates |= set(base.loc[~same, "date"])
+        else:
+            refit_dates |= set(base["date"])
+        base[columns] = fitted
+    save_state(season, states, base, base_dir)
+
+    # Opponent columns only look at the same date, so these dates are all
+    # that can change.
+    dates = set(emitted["date"]) | removed_dates | refit_dates
+    on_dates = base[base["date"].isin(dates)]
+    rows = compact_frame(utils.add_opponent_features(on_dates))
+    rows = rows.sort_values(["season", "team_id", "date"]).reset_index(drop=True)
+    replace_rows(
+        "team_features",
+        rows,
+        {"season": [int(season)], "date": sorted(dates)},
+        base_dir=base_dir,
+    )
+    elapsed = time.perf_counter() - start_time
+    print(
+        f"Features {season}: {len(emitted)} rows from {len(resumed)} teams, "
+        f"{len(rows)} rows on {len(dates)} dates rewritten ({elapsed:.3f}s)"
+    )
+
+    if export_csv:
+        if output_path is None:
+            output_path = _feature_csv_path(season, base_dir)
+        _patch_feature_csv(output_path, rows, dates, season)
+    return rows
+
+
+def _feature_csv_path(season: int, base_dir=None) -> Path:
+    return _root(base_dir) / "data" / str(season) / f"features_{season}.csv"
+
+
+def _patch_feature_csv(path: str | Path, rows: pd.DataFrame, dates: set, season: int) -> Path:
+    """Swap the rows on ``dates`` in a season feature CSV for ``rows``."""
+    path = Path(path)
+    if path.exists():
+        stored = read_csv_cached(path)
+        stored["date"] = pd.to_datetime(stored["date"])
+        keep = ~(stored["date"].isin(dates) & (stored["season"] == season))
+        rows = pd.concat([stored[keep], rows], ignore_index=True)
+    rows = rows.sort_values(["season", "team_id", "date"])
+    path.parent.mkdir(parents=True, exist_ok=True)
+    rows.to_csv(path, index=False)
+    build_matrix_cache(path)
+    return path
+
+
+def rebuild_features(season: int, base_dir=None) -> pd.DataFrame:
+    """The season's feature rows computed from scratch (no state, no stage cache)."""
+    gamelogs = read_gamelogs([season], base_dir=base_dir)
+    valid_schools = set(utils._strip_ncaa_suffix(gamelogs["school_name"]).dropna().unique())
+    rows = utils.build_season_features(
+        gamelogs,
+        valid_schools,
+        StageCache(base_dir, enabled=False),
+        registry=_registry(gamelogs, base_dir),
+    )
+    return rows
+
+
+def _comparable(series: pd.Series) -> pd.Series:
+    """Floats when every value is numeric (categoricals included), else text with '' for nulls."""
+    values = series.astype(object).where(series.notna(), None)
+    numeric = pd.to_numeric(values, errors="coerce")
+    if numeric.notna().sum() == values.notna().sum():
+        return numeric.astype(np.float64)
+    return values.fillna("").astype(str)
+
+
+def diff_features(expected: pd.DataFrame, actual: pd.DataFrame, atol: float = 1e-4) -> dict:
+    """Rows missing on either side and columns whose values differ, by FEATURE_KEY."""
+
+    def keyed(frame):
+        frame = frame.copy()
+        frame["date"] = pd.to_datetime(frame["date"])
+        for column in FEATURE_KEY:
+            frame[column] = frame[column].astype(str)
+        return frame.set_index(FEATURE_KEY).sort_index()
+
+    expected, actual = keyed(expected), keyed(actual)
+    common = expected.index.intersection(actual.index)
+    report = {
+        "missing": len(expected.index.difference(actual.index)),
+        "extra": len(actual.index.difference(expected.index)),
+        "columns": {},
+    }
+    for column in expected.columns:
+        if column not in actual.columns:
+            report["columns"][column] = len(common)
+            continue
+        left = _comparable(expected.loc[common, column])
+        right = _comparable(actual.loc[common, column])
+        if left.dtype == np.float64 and right.dtype == np.float64:
+            bad = ~np.isclose(left, right, rtol=1e-5, atol=atol, equal_nan=True)
+        else:
+            bad = (left.astype(str) != right.astype(str)).to_numpy()
+        if bad.any():
+            report["columns"][column] = int(bad.sum())
+    return report
+
+
+def verify_features(season: int = 2026, base_dir=None) -> dict:
+    """Diff the incrementally maintained feature rows against a full rebuild."""
+    try:
+        from .warehouse import query
+    except ImportError:
+        from warehouse import query
+
+    expected = rebuild_features(season, base_dir)
+    actual = query("team_features", "season = ?", [int(season)], base_dir=base_dir)
+    report = diff_features(expected, actual)
+    ok = not report["missing"] and not report["extra"] and not report["columns"]
+    status = "✅ incremental features match a full rebuild" if ok else "❌ incremental features differ"
+    print(
+        f"{status}: {len(expected)} rows, {report['missing']} missing, "
+        f"{report['extra']} extra, columns {report['columns'] or 'all equal'}"
+    )
+    return report
@@ -1,13 +1,31 @@
 #!/usr/bin/env python
 # coding: utf-8
 
+from array import array
 from bs4 import BeautifulSoup
+from lxml import html as lxml_html
+import numpy as np
 import pandas as pd
+import os
 import requests
+import threading
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
 from random import uniform
-from time import sleep
+from time import monotonic, sleep
 from pathlib import Path
 
+try:
+    from .http_cache import CachePolicy, ResponseCache
+    from .schema import GAMELOG_DTYPES
+    from .scrape_journal import ScrapeJournal
+    from .storage import write_gamelogs
+except ImportError:
+    from http_cache import CachePolicy, ResponseCache
+    from schema import GAMELOG_DTYPES
+    from scrape_journal import ScrapeJournal
+    from storage import write_gamelogs
+
 
 def _normalize_text(value: str) -> str:
     if value is None:
@@ -28,23 +46,164 @@ HEADERS = {
     )
 }
 
+BASE_URL = os.getenv("SPORTS_REFERENCE_BASE_URL", "https://www.sports-reference.com")
+
+# Sports Reference blocks clients that go over ~20 requests per minute.
+DEFAULT_REQUESTS_PER_MINUTE = 15
+DEFAULT_WORKERS = 4
+
+GAMELOG_PARSERS = ("lxml", "bs4")
+# "lxml" is opt-in through --parser until benchmarks/bench_gamelog_parser.py
+# has passed on a recorded corpus of real pages.
+DEFAULT_PARSER = "bs4"
+
 session = requests.Session()
 session.headers.update(HEADERS)
+for _scheme in ("https://", "http://"):
+    session.mount(
+        _scheme, requests.adapters.HTTPAdapter(pool_connections=4, pool_maxsize=16)
+    )
+
+# Seconds range for the randomized backoff between retries (scaled by attempt).
+RETRY_BACKOFF = (6, 12)
+
+fetch_stats = Counter()
+_stats_lock = threading.Lock()
+
+
+def _count(stat):
+    with _stats_lock:
+        fetch_stats[stat] += 1
+
+
+def set_base_url(url):
+    """Point every scraper at another host (e.g. a local stand-in server)."""
+    global BASE_URL
+    BASE_URL = url.rstrip("/")
+
+
+def site_url(path):
+    return BASE_URL + path
+
+
+class RateLimiter:
+    """Thread-safe token bucket shared by every Sports Reference request."""
+
+    def __init__(self, requests_per_minute=DEFAULT_REQUESTS_PER_MINUTE, burst=1):
+        self._lock = threading.Lock()
+        self.configure(requests_per_minute, burst)
+
+    def configure(self, requests_per_minute, burst=1):
+        with self._lock:
+            self.requests_per_minute = requests_per_minute
+            self.capacity = float(max(burst, 1))
+            self._tokens = self.capacity
+            self._updated = monotonic()
+
+    def acquire(self):
+        """Block until a request token is available."""
+        while True:
+            with self._lock:
+                if not self.requests_per_minute:
+                    return
+                rate = self.requests_per_minute / 60.0
+                now = monotonic()
+                self._tokens = min(
+                    self.capacity, self._tokens + (now - self._updated) * rate
+                )
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait_time = (1 - self._tokens) / rate
+            sleep(wait_time)
+
+
+rate_limiter = RateLimiter()
+
+
+def set_rate_limit(requests_per_minute, burst=1):
+    """Change the global request budget (None or 0 disables throttling)."""
+    rate_limiter.configure(requests_per_minute, burst)
+
+
+response_cache = ResponseCache()
+cache_policy = CachePolicy()
+
+
+def configure_cache(
+    directory=None, max_age=None, force_refresh=None, offline=None, enabled=True
+):
+    """Adjust the global response cache; ``enabled=False`` bypasses it."""
+    global response_cache
+
+    if not enabled:
+        response_cache = None
+    elif directory is not None or response_cache is None:
+        response_cache = ResponseCache(directory) if directory else ResponseCache()
+    if max_age is not None:
+        cache_policy.max_age = max_age if max_age >= 0 else None
+    if force_refresh is not None:
+        cache_policy.force_refresh = force_refresh
+    if offline is not None:
+        cache_policy.offline = offline
+
+
+def _retry_after_seconds(response):
+    if response is None:
+        return None
+    value = response.headers.get("Retry-After")
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
 
 
 # Function to prevent rate limiting and transient connection failures
-def fetch_page_safe(url, label=""):
+def fetch_page_safe(url, label="", http_session=None, policy=None):
     max_retries = 3
+    http_session = http_session or session
+    policy = policy or cache_policy
+    cache = response_cache
+
+    cached = None
+    if cache is not None and not policy.force_refresh:
+        cached = cache.get(url)
+        # Fresh hits skip the network and the rate limiter entirely.
+        if cached is not None and (policy.offline or cached.is_fresh(policy.max_age)):
+            _count("cache_hits")
+            return cached.body
+    if policy.offline:
+        print(f"⚠️ Offline and not cached: {label or url}")
+        return None
+
+    request_headers = cached.validators() if cached is not None else {}
 
     for attempt in range(1, max_retries + 1):
+        rate_limiter.acquire()
+        _count("requests")
         try:
-            response = session.get(url, timeout=30)
+            response = http_session.get(url, headers=request_headers, timeout=30)
+            if response.status_code == 304 and cached is not None:
+                _count("not_modified")
+                return cache.touch(cached).body
             response.raise_for_status()
+            if cache is not None:
+                cache.put(
+                    url,
+                    response.text,
+                    etag=response.headers.get("ETag"),
+                    last_modified=response.headers.get("Last-Modified"),
+                )
             return response.text
-        except requests.exceptions.RequestException:
+        except requests.exceptions.RequestException as exc:
             if attempt == max_retries:
+                _count("failures")
                 break
-            wait_time = uniform(6, 12) * attempt
+            _count("retries")
+            wait_time = _retry_after_seconds(getattr(exc, "response", None))
+            if wait_time is None:
+                wait_time = uniform(*RETRY_BACKOFF) * attempt
             print(f"⚠️ Connection issue {label}, waiting {int(wait_time)}s")
             sleep(wait_time)
 
@@ -53,7 +212,7 @@ def fetch_page_safe(url, label=""):
 
 # GET SCHOOLS
 def get_schools(year):
-    url = "https://www.sports-reference.com/cbb/seasons/" + str(year) + "-school-stats.html"
+    url = site_url("/cbb/seasons/" + str(year) + "-school-stats.html")
     page = fetch_page_safe(url, f"season {year} school list")
     if page is None:
         print(f"❌ Could not fetch school list for {year}")
@@ -81,36 +240,46 @@ def get_schools(year):
 # --------------------------------------------------
 # SCRAPE ONE TEAM GAMELOG
 # --------------------------------------------------
-def scrape_team_gamelog(team_slug, year, school_name):
-    url = (
-        "https://www.sports-reference.com/cbb/schools/"
-        + team_slug + "/" + str(year) + "-gamelogs.html"
-    )
+def scrape_team_gamelog(team_slug, year, school_name, parser=None, builder=None):
+    url = site_url("/cbb/schools/" + team_slug + "/" + str(year) + "-gamelogs.html")
 
     print(f"📍 Fetching: {url}")
 
     page = fetch_page_safe(url, team_slug)
     if page is None:
         print(f"Skipping {team_slug} after retries")
-        return []
-
-    soup = BeautifulSoup(page, "lxml")
-    table = soup.find("table", id="team_game_log")
+        return [] if builder is None else builder
 
-    if table is None:
+    games = parse_team_gamelog(
+        page, team_slug, year, school_name, parser=parser, builder=builder
+    )
+    if games is None:
         print(f"❌ No gamelog table for {team_slug}")
-        return []
+        return [] if builder is None else builder
+    return games
 
-    rows = table.find("tbody").find_all("tr")
-    games = []
 
-    parsed_rows = []
-    for row in rows:
-        result_cell = row.find("td", {"data-stat": "team_game_result"})
-        if result_cell is None:
-            continue
-        parsed_rows.append((row, result_cell.get_text(strip=True)))
+def parse_team_gamelog(page, team_slug, year, school_name, parser=None, builder=None):
+    """Parse gamelog HTML into row dicts (None when the table is missing).
+
+    ``parser`` picks the backend: "lxml" pulls ``table#team_game_log`` out
+    with XPath, "bs4" walks a full BeautifulSoup tree. Both return the same
+    rows. With a GamelogBuilder the rows are appended to it (and it is
+    returned) instead of being built as dicts.
+    """
+    parser = parser or DEFAULT_PARSER
+    if parser == "lxml":
+        parsed = _gamelog_rows_lxml(page)
+    elif parser == "bs4":
+        parsed = _gamelog_rows_bs4(page)
+    else:
+        raise ValueError(f"Unknown gamelog parser: {parser!r} (use one of {GAMELOG_PARSERS})")
+
+    if parsed is None:
+        return None
+    parsed_rows, row_cells = parsed
 
+    games = []
     last_completed_idx = None
     for idx, (_, result) in enumerate(parsed_rows):
         if result != "":
@@ -118,56 +287,330 @@ def scrape_team_gamelog(team_slug, year, school_name):
 
     future_added = False
     for idx, (row, result) in enumerate(parsed_rows):
-        if result != "":
-            game = {
-                "school_name": school_name,
-                "school_slug": team_slug,
-                "season": year,
-            }
-            for cell in row.find_all(["th", "td"]):
-                stat = cell.get("data-stat")
-                if stat:
-                    game[stat] = _normalize_text(cell.get_text(strip=True))
-            games.append(game)
+        if result == "":
+            if last_completed_idx is None:
+                is_after_last = True
+            else:
+                is_after_last = idx > last_completed_idx
+            if not is_after_last or future_added:
+                continue
+            future_added = True
+
+        if builder is not None:
+            base = [("school_name", school_name), ("school_slug", team_slug), ("season", year)]
+            builder.append_cells(base + list(row_cells(row)))
+            continue
+
+        game = {
+            "school_name": school_name,
+            "school_slug": team_slug,
+            "season": year,
+        }
+        for stat, text in row_cells(row):
+            game[stat] = _normalize_text(text)
+        games.append(game)
+    return games if builder is None else builder
+
+
+def _gamelog_rows_bs4(page):
+    soup = BeautifulSoup(page, "lxml")
+    table = soup.find("table", id="team_game_log")
+    if table is None:
+        return None
+
+    parsed_rows = []
+    for row in table.find("tbody").find_all("tr"):
+        result_cell = row.find("td", {"data-stat": "team_game_result"})
+        if result_cell is None:
             continue
+        parsed_rows.append((row, result_cell.get_text(strip=True)))
+
+    def row_cells(row):
+        for cell in row.find_all(["th", "td"]):
+            stat = cell.get("data-stat")
+            if stat:
+                yield stat, cell.get_text(strip=True)
+
+    return parsed_rows, row_cells
+
+
+def _cell_text(cell):
+    # Same as BeautifulSoup's get_text(strip=True): strip each text node, join.
+    return "".join(part.strip() for part in cell.itertext())
+
+
+def _gamelog_rows_lxml(page):
+    try:
+        tree = lxml_html.fromstring(page)
+    except ValueError:
+        # Unicode input with an XML encoding declaration must go in as bytes.
+        tree = lxml_html.fromstring(page.encode("utf-8"))
+
+    tables = tree.xpath('//table[@id="team_game_log"]')
+    if not tables:
+        return None
+
+    parsed_rows = []
+    for row in tables[0].xpath("(.//tbody)[1]//tr"):
+        result_cells = row.xpath('.//td[@data-stat="team_game_result"]')
+        if not result_cells:
+            continue
+        parsed_rows.append((row, _cell_text(result_cells[0])))
+
+    def row_cells(row):
+        for cell in row.iterdescendants("th", "td"):
+            stat = cell.get("data-stat")
+            if stat:
+                yield stat, _cell_text(cell)
 
-        if last_completed_idx is None:
-            is_after_last = True
+    return parsed_rows, row_cells
+
+
+# --------------------------------------------------
+# TYPED COLUMN BUFFERS
+# --------------------------------------------------
+def _column_kind(column):
+    dtype = GAMELOG_DTYPES.get(column)
+    if dtype is None:
+        return "object"
+    if dtype.startswith("Int"):
+        return "int"
+    if dtype.startswith("float"):
+        return "float"
+    if dtype.startswith("datetime"):
+        return "date"
+    return "text"
+
+
+class GamelogBuilder:
+    """Typed column buffers that scraped cells are parsed straight into.
+
+    Counts go into int64 arrays with a missing-value mask, rates into float
+    arrays, and text into lists that become categoricals in ``to_frame``, so
+    no per-row dicts or object columns are built along the way.
+    """
+
+    def __init__(self):
+        self.n_rows = 0
+        self._kinds = {}
+        self._columns = {}
+
+    def __len__(self):
+        return self.n_rows
+
+    def _buffer(self, column):
+        buffer = self._columns.get(column)
+        if buffer is None:
+            kind = self._kinds[column] = _column_kind(column)
+            if kind == "int":
+                buffer = (array("q"), bytearray())
+            elif kind == "float":
+                buffer = array("d")
+            else:
+                buffer = []
+            self._columns[column] = buffer
+            self._pad(column, self.n_rows)
+        return buffer
+
+    def _length(self, column):
+        buffer = self._columns[column]
+        return len(buffer[1]) if self._kinds[column] == "int" else len(buffer)
+
+    def _pad(self, column, n_rows):
+        missing = n_rows - self._length(column)
+        if missing <= 0:
+            return
+        buffer, kind = self._columns[column], self._kinds[column]
+        if kind == "int":
+            buffer[0].extend([0] * missing)
+            buffer[1].extend(b"\x01" * missing)
+        elif kind == "float":
+            buffer.extend([float("nan")] * missing)
         else:
-            is_after_last = idx > last_completed_idx
-
-        if is_after_last and not future_added:
-            game = {
-                "school_name": school_name,
-                "school_slug": team_slug,
-                "season": year,
-            }
-            for cell in row.find_all(["th", "td"]):
-                stat = cell.get("data-stat")
-                if stat:
-                    game[stat] = _normalize_text(cell.get_text(strip=True))
-            games.append(game)
-            future_added = True
-    return games
+            buffer.extend([None] * missing)
+
+    def _push(self, column, value):
+        buffer = self._buffer(column)
+        kind = self._kinds[column]
+        if kind == "int":
+            try:
+                buffer[0].append(int(value))
+                buffer[1].append(0)
+            except (TypeError, ValueError):
+                buffer[0].append(0)
+                buffer[1].append(1)
+        elif kind == "float":
+            try:
+                buffer.append(float(value))
+            except (TypeError, ValueError):
+                buffer.append(float("nan"))
+        elif kind == "date":
+            buffer.append(value or None)
+        else:
+            # Blank cells are missing, matching how the xlsx round-trip reads them.
+            buffer.append(_normalize_text(value) if value != "" else None)
+
+    def append_cells(self, cells):
+        """Add one row from (column, value) pairs; absent columns are missing."""
+        for column, value in cells:
+            self._push(column, value)
+        self.n_rows += 1
+        for column in self._columns:
+            self._pad(column, self.n_rows)
+
+    def extend(self, games):
+        """Add row dicts (e.g. rows replayed from a ScrapeJournal)."""
+        for game in games:
+            self.append_cells(game.items())
+
+    @classmethod
+    def concat(cls, builders):
+        merged = cls()
+        for builder in builders:
+            for column, buffer in builder._columns.items():
+                target = merged._buffer(column)
+                merged._pad(column, merged.n_rows)
+                if merged._kinds[column] == "int":
+                    target[0].extend(buffer[0])
+                    target[1].extend(buffer[1])
+                else:
+                    target.extend(buffer)
+            merged.n_rows += builder.n_rows
+            for column in merged._columns:
+                merged._pad(column, merged.n_rows)
+        return merged
+
+    def to_frame(self):
+        data = {}
+        for column, buffer in self._columns.items():
+            kind = self._kinds[column]
+            if kind == "int":
+                values = np.array(buffer[0], dtype=np.int64)
+                mask = np.frombuffer(bytes(buffer[1]), dtype=np.uint8).astype(bool)
+                data[column] = pd.arrays.IntegerArray(values, mask).astype(
+                    GAMELOG_DTYPES[column]
+                )
+            elif kind == "float":
+                data[column] = np.array(buffer, dtype=np.float64).astype(
+                    GAMELOG_DTYPES[column]
+                )
+            elif kind == "date":
+                data[column] = pd.to_datetime(
+                    pd.Series(buffer, dtype=object), format="%Y-%m-%d", errors="coerce"
+                ).astype(GAMELOG_DTYPES[column])
+            elif kind == "text":
+                data[column] = pd.Categorical(buffer)
+            else:
+                data[column] = pd.Series(buffer, dtype=object)
+        return pd.DataFrame(data, index=pd.RangeIndex(self.n_rows))
 
 
 # --------------------------------------------------
 # SCRAPE ALL TEAMS
 # --------------------------------------------------
-def scrape_all_gamelogs(year, limit=5):
+def scrape_teams(
+    teams, year, workers=DEFAULT_WORKERS, parser=None, journal=None, typed=False
+):
+    """Scrape (slug, name) pairs concurrently; results keep the input order.
+
+    Request pacing comes from the shared ``rate_limiter``, so ``workers`` only
+    bounds how many fetches/parses can overlap while waiting on the network.
+    With a ``journal``, each team's rows are appended as soon as they are in.
+    ``typed=True`` returns one GamelogBuilder per team instead of row dicts.
+    """
+    teams = list(teams)
+
+    def scrape(item):
+        i, (slug, name) = item
+        print(f"{i}/{len(teams)}  Scraping {slug}")
+        if typed and journal is None:
+            return scrape_team_gamelog(
+                slug, year, name, parser=parser, builder=GamelogBuilder()
+            )
+
+        games = scrape_team_gamelog(slug, year, name, parser=parser)
+        if journal is not None and games:
+            journal.record(slug, games)
+        if typed:
+            builder = GamelogBuilder()
+            builder.extend(games)
+            return builder
+        return games
+
+    if workers is None or workers <= 1:
+        return [scrape(item) for item in enumerate(teams, 1)]
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(scrape, enumerate(teams, 1)))
+
+
+def default_journal_path(year):
+    return Path(__file__).resolve().parent / "data" / str(year) / f"scrape_journal_{year}.jsonl"
+
+
+def scrape_all_gamelogs(
+    year,
+    limit=5,
+    workers=DEFAULT_WORKERS,
+    requests_per_minute=None,
+    parser=None,
+    journal_path=None,
+    resume=False,
+    typed=False,
+):
+    """Scrape every school's gamelog for a season.
+
+    With ``journal_path`` each finished team is appended to a ScrapeJournal;
+    ``resume=True`` keeps the journal and skips slugs it already holds.
+    ``typed=True`` parses cells straight into a GamelogBuilder and returns a
+    frame with the dtypes from ``schema.GAMELOG_DTYPES``.
+    """
+    if requests_per_minute is not None:
+        set_rate_limit(requests_per_minute)
+
     schools = get_schools(year)
     if limit is not None:
         schools = dict(list(schools.items())[:limit])
-    all_games = []
 
-    for i, (slug, name) in enumerate(schools.items(), 1):
-        print(f"{i}/{len(schools)}  Scraping {slug}")
+    journal = None
+    done = {}
+    if journal_path is not None:
+        journal = ScrapeJournal(journal_path)
+        if resume:
+            done = journal.completed()
+            print(f"Resuming: {len(done)} teams already in {journal_path}")
+        else:
+            journal.reset()
+
+    pending = [(slug, name) for slug, name in schools.items() if slug not in done]
+    scraped = dict(
+        zip(
+            [slug for slug, _ in pending],
+            scrape_teams(
+                pending,
+                year,
+                workers=workers,
+                parser=parser,
+                journal=journal,
+                typed=typed,
+            ),
+        )
+    )
 
-        team_games = scrape_team_gamelog(slug, year, name)
-        all_games.extend(team_games)
+    if typed:
+        builders = []
+        for slug in schools:
+            if slug in done:
+                builder = GamelogBuilder()
+                builder.extend(done[slug])
+                builders.append(builder)
+            elif slug in scraped:
+                builders.append(scraped[slug])
+        return GamelogBuilder.concat(builders).to_frame()
 
-        # 👇 SAME SAFE DELAY YOU USED BEFORE
-        sleep(8)
+    all_games = []
+    for slug in schools:
+        all_games.extend(done.get(slug) or scraped.get(slug) or [])
 
     return pd.DataFrame(all_games)
 
@@ -175,16 +618,63 @@ def scrape_all_gamelogs(year, limit=5):
 # --------------------------------------------------
 # MAIN
 # --------------------------------------------------
-if __name__ == "__main__":
-    SEASON = 2026
+def main():
+    import argparse
 
-    df = scrape_all_gamelogs(SEASON)
+    arg_parser = argparse.ArgumentParser(description="Scrape a full season of team gamelogs.")
+    arg_parser.add_argument("--season", type=int, default=2026, help="Season year.")
+    arg_parser.add_argument(
+        "--limit", type=int, default=None, help="Only scrape the first N schools."
+    )
+    arg_parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS)
+    arg_parser.add_argument(
+        "--requests-per-minute",
+        type=float,
+        default=None,
+        help=f"Global request budget (default: {DEFAULT_REQUESTS_PER_MINUTE}).",
+    )
+    arg_parser.add_argument(
+        "--parser",
+        choices=GAMELOG_PARSERS,
+        default=None,
+        help=f"Gamelog HTML backend (default: {DEFAULT_PARSER}).",
+    )
+    arg_parser.add_argument(
+        "--journal", default=None, help="Journal path (default: data/<season>/)."
+    )
+    arg_parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="Skip teams already recorded in the journal from an earlier run.",
+    )
+    arg_parser.add_argument(
+        "--xlsx",
+        action="store_true",
+        help="Also export data/<season>/NCAAB_<season>_Team_Gamelogs_now.xlsx.",
+    )
+    args = arg_parser.parse_args()
+
+    season = args.season
+    df = scrape_all_gamelogs(
+        season,
+        limit=args.limit,
+        workers=args.workers,
+        requests_per_minute=args.requests_per_minute,
+        parser=args.parser,
+        journal_path=args.journal or default_journal_path(season),
+        resume=args.resume,
+    )
 
     base_dir = Path(__file__).resolve().parent
-    output_path = (
-    base_dir / "data" / "2026" / f"NCAAB_{SEASON}_Team_Gamelogs_now.xlsx"
-)
-    df.to_excel(output_path, index=False)
+    xlsx_path = (
+        base_dir / "data" / str(season) / f"NCAAB_{season}_Team_Gamelogs_now.xlsx"
+        if args.xlsx
+        else None
+    )
+    write_gamelogs(df, base_dir=base_dir, xlsx_path=xlsx_path)
 
-    print(f"\n✅ DONE — saved {len(df)} rows to:")
-    print(output_path)
+    print(f"\n✅ DONE — stored {len(df)} rows for {season}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+"""Persistent on-disk cache for scraped Sports Reference pages."""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional
+
+
+DEFAULT_CACHE_DIR = Path(
+    os.getenv(
+        "NCAAB_HTTP_CACHE_DIR",
+        Path(__file__).resolve().parent / "data" / "http_cache",
+    )
+)
+
+# Pages older than this are revalidated with a conditional GET. Zero
+# revalidates every hit, so a rerun still sees games finished since the
+# page was cached; an unchanged page costs one 304. Crash reruns and
+# backfills can opt into a longer max age.
+DEFAULT_MAX_AGE = 0
+
+
+@dataclass
+class CachePolicy:
+    """How ``fetch_page_safe`` should use the response cache.
+
+    ``max_age`` is in seconds (None means a cached page never goes stale),
+    ``force_refresh`` always re-downloads, and ``offline`` never touches the
+    network and only serves what is already cached.
+    """
+
+    max_age: Optional[float] = DEFAULT_MAX_AGE
+    force_refresh: bool = False
+    offline: bool = False
+
+
+@dataclass
+class CachedResponse:
+    url: str
+    body: str
+    fetched_at: float
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+
+    def age(self) -> float:
+        return time.time() - self.fetched_at
+
+    def is_fresh(self, max_age: Optional[float]) -> bool:
+        return max_age is None or self.age() <= max_age
+
+    def validators(self) -> dict[str, str]:
+        """Headers for a conditional GET against this entry."""
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+class ResponseCache:
+    """URL-keyed cache storing each body next to a small JSON metadata file."""
+
+    def __init__(self, directory: str | Path = DEFAULT_CACHE_DIR):
+        self.directory = Path(directory)
+        self._lock = threading.Lock()
+
+    def _paths(self, url: str) -> tuple[Path, Path]:
+        key = hashlib.sha256(url.encode("utf-8")).hexdigest()
+        folder = self.directory / key[:2]
+        return folder / f"{key}.html", folder / f"{key}.json"
+
+    def get(self, url: str) -> Optional[CachedResponse]:
+        body_path, meta_path = self._paths(url)
+        try:
+            meta = json.loads(meta_path.read_text(encoding="utf-8"))
+            body = body_path.read_text(encoding="utf-8")
+        except (OSError, ValueError):
+            return None
+        return CachedResponse(
+            url=url,
+            body=body,
+            fetched_at=meta.get("fetched_at", 0.0),
+            etag=meta.get("etag"),
+            last_modified=meta.get("last_modified"),
+        )
+
+    def put(
+        self,
+        url: str,
+        body: str,
+        *,
+        etag: Optional[str] = None,
+        last_modified: Optional[str] = None,
+    ) -> CachedResponse:
+        entry = CachedResponse(
+            url=url,
+            body=body,
+            fetched_at=time.time(),
+            etag=etag,
+            last_modified=last_modified,
+        )
+        body_path, _ = self._paths(url)
+        body_path.parent.mkdir(parents=True, exist_ok=True)
+        _atomic_write(body_path, body)
+        self._write_meta(entry)
+        return entry
+
+    def touch(self, entry: CachedResponse) -> CachedResponse:
+        """Mark an entry as freshly validated (e.g. after a 304)."""
+        entry.fetched_at = time.time()
+        self._write_meta(entry)
+        return entry
+
+    def clear(self) -> None:
+        for path in self.directory.glob("*/*"):
+            path.unlink(missing_ok=True)
+
+    def _write_meta(self, entry: CachedResponse) -> None:
+        _, meta_path = self._paths(entry.url)
+        meta = {
+            "url": entry.url,
+            "fetched_at": entry.fetched_at,
+            "etag": entry.etag,
+            "last_modified": entry.last_modified,
+        }
+        with self._lock:
+            _atomic_write(meta_path, json.dumps(meta))
+
+
+def _atomic_write(path: Path, text: str) -> None:
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    tmp_path.write_text(text, encoding="utf-8")
+    os.replace(tmp_path, path)
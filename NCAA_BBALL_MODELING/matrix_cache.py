@@ -0,0 +1,98 @@
+"""Arrow IPC copies of the feature CSVs for fast, memory-mapped loading.
+
+``merged_dataset.csv`` gets a sibling ``merged_dataset.arrow`` holding the
+frame ``pd.read_csv`` returns, narrowed to the compact schema (categoricals
+come back from Arrow dictionaries). The cache records the size
+and mtime of the CSV it came from and is rebuilt whenever those change.
+Reads go through ``pa.memory_map``, so numeric columns without nulls are
+handed to pandas without copying and the page cache is shared between
+processes that train or backtest on the same file.
+"""
+
+from __future__ import annotations
+
+import os
+import uuid
+from pathlib import Path
+from typing import Optional
+
+import pandas as pd
+import pyarrow as pa
+
+try:
+    from .schema import compact_frame
+except ImportError:
+    from schema import compact_frame
+
+_SOURCE_KEY = b"source_stat"
+
+
+def cache_path_for(csv_path: str | Path) -> Path:
+    return Path(csv_path).with_suffix(".arrow")
+
+
+def _source_stat(csv_path: Path) -> bytes:
+    stat = csv_path.stat()
+    return f"{stat.st_size}:{stat.st_mtime_ns}".encode()
+
+
+def is_fresh(csv_path: str | Path) -> bool:
+    """True when the cache exists and was built from the CSV as it is now."""
+    csv_path = Path(csv_path)
+    cache_path = cache_path_for(csv_path)
+    if not cache_path.exists() or not csv_path.exists():
+        return False
+    try:
+        with pa.memory_map(str(cache_path), "r") as source:
+            metadata = pa.ipc.open_file(source).schema.metadata or {}
+    except (pa.ArrowInvalid, OSError):
+        return False
+    return metadata.get(_SOURCE_KEY) == _source_stat(csv_path)
+
+
+def build_matrix_cache(csv_path: str | Path) -> Optional[Path]:
+    """Parse the CSV once and write its Arrow cache; None if it can't be encoded."""
+    csv_path = Path(csv_path)
+    cache_path = cache_path_for(csv_path)
+    stat_before = _source_stat(csv_path)
+    df = compact_frame(pd.read_csv(csv_path))
+    try:
+        table = pa.Table.from_pandas(df, preserve_index=False)
+    except (pa.ArrowInvalid, pa.ArrowTypeError) as exc:
+        print(f"Skipping Arrow cache for {csv_path}: {exc}")
+        return None
+    table = table.replace_schema_metadata(
+        {**(table.schema.metadata or {}), _SOURCE_KEY: stat_before}
+    )
+
+    scratch = cache_path.with_name(f".{cache_path.name}.{uuid.uuid4().hex}")
+    try:
+        with pa.OSFile(str(scratch), "wb") as sink:
+            with pa.ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+        os.replace(scratch, cache_path)
+    finally:
+        if scratch.exists():
+            scratch.unlink()
+    return cache_path
+
+
+def read_matrix_cache(
+    csv_path: str | Path, columns: Optional[list[str]] = None
+) -> pd.DataFrame:
+    """Memory-map the Arrow cache next to ``csv_path`` into a DataFrame."""
+    with pa.memory_map(str(cache_path_for(csv_path)), "r") as source:
+        table = pa.ipc.open_file(source).read_all()
+    if columns is not None:
+        table = table.select(columns)
+    return table.to_pandas(split_blocks=True)
+
+
+def read_csv_cached(
+    csv_path: str | Path, columns: Optional[list[str]] = None
+) -> pd.DataFrame:
+    """``pd.read_csv`` replacement that goes through (and maintains) the cache."""
+    csv_path = Path(csv_path)
+    if not is_fresh(csv_path) and build_matrix_cache(csv_path) is None:
+        return compact_frame(pd.read_csv(csv_path, usecols=columns))
+    return read_matrix_cache(csv_path, columns)
@@ -0,0 +1,190 @@
+from __future__ import annotations
+
+import argparse
+import os
+import queue
+import threading
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    Future,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+    wait,
+)
+from pathlib import Path
+from typing import Iterable, Optional
+
+import pandas as pd
+
+try:
+    from NCAA_BBALL_MODELING import gamelog_scraping as scraping
+    from NCAA_BBALL_MODELING.scrape_journal import ScrapeJournal
+    from NCAA_BBALL_MODELING.storage import season_dir, write_gamelogs
+    from NCAA_BBALL_MODELING.utils import _resolve_base_dir
+except ImportError:
+    import gamelog_scraping as scraping
+    from scrape_journal import ScrapeJournal
+    from storage import season_dir, write_gamelogs
+    from utils import _resolve_base_dir
+
+
+_DONE = object()
+
+
+def _fetch_all(
+    tasks: list[tuple[int, str, str]],
+    pages: "queue.Queue",
+    fetch_workers: int,
+) -> None:
+    """Producer: fetch every (season, slug, name) page onto the bounded queue."""
+
+    def fetch(task: tuple[int, str, str]) -> None:
+        season, slug, name = task
+        url = scraping.site_url(f"/cbb/schools/{slug}/{season}-gamelogs.html")
+        page = scraping.fetch_page_safe(url, f"{season} {slug}")
+        if page is None:
+            print(f"Skipping {season} {slug} after retries")
+            return
+        # Blocks when the parsers fall behind, which caps memory use.
+        pages.put((season, slug, name, page))
+
+    try:
+        with ThreadPoolExecutor(max_workers=max(fetch_workers, 1)) as pool:
+            list(pool.map(fetch, tasks))
+    finally:
+        pages.put(_DONE)
+
+
+def backfill_seasons(
+    seasons: Iterable[int],
+    *,
+    fetch_workers: int = scraping.DEFAULT_WORKERS,
+    parse_workers: Optional[int] = None,
+    queue_size: int = 32,
+    parser: Optional[str] = None,
+    limit: Optional[int] = None,
+    resume: bool = True,
+    base_dir: Optional[str | Path] = None,
+) -> dict[int, Path]:
+    """Scrape several seasons with network fetch and HTML parsing overlapped.
+
+    Fetch threads (paced by the shared rate limiter) push raw HTML onto a
+    bounded queue; a process pool parses it. Each parsed team is appended to
+    its season's ScrapeJournal as it finishes, and every season is written to
+    the Parquet gamelog store at the end. Returns each season's store directory.
+    """
+    base_dir = Path(base_dir) if base_dir is not None else _resolve_base_dir()
+    seasons = list(seasons)
+
+    journals: dict[int, ScrapeJournal] = {}
+    school_order: dict[int, list[str]] = {}
+    tasks: list[tuple[int, str, str]] = []
+    for season in seasons:
+        journal = ScrapeJournal(base_dir / "data" / str(season) / f"scrape_journal_{season}.jsonl")
+        done = journal.completed() if resume else {}
+        if not resume:
+            journal.reset()
+        journals[season] = journal
+
+        schools = scraping.get_schools(season)
+        if limit is not None:
+            schools = dict(list(schools.items())[:limit])
+        school_order[season] = list(schools)
+        pending = [(season, slug, name) for slug, name in schools.items() if slug not in done]
+        print(f"{season}: {len(done)} teams journaled, {len(pending)} to scrape")
+        tasks.extend(pending)
+
+    pages: "queue.Queue" = queue.Queue(maxsize=queue_size)
+    producer = threading.Thread(
+        target=_fetch_all, args=(tasks, pages, fetch_workers), daemon=True
+    )
+    producer.start()
+
+    in_flight: dict[Future, tuple[int, str]] = {}
+
+    def collect(futures) -> None:
+        for future in futures:
+            season, slug = in_flight.pop(future)
+            games = future.result()
+            if games:
+                journals[season].record(slug, games)
+            else:
+                print(f"❌ No gamelog rows for {season} {slug}")
+
+    parse_workers = parse_workers or os.cpu_count() or 1
+    max_in_flight = 2 * parse_workers
+    parsed = 0
+    with ProcessPoolExecutor(max_workers=parse_workers) as pool:
+        while True:
+            item = pages.get()
+            if item is _DONE:
+                break
+            season, slug, name, page = item
+            future = pool.submit(
+                scraping.parse_team_gamelog, page, slug, season, name, parser
+            )
+            in_flight[future] = (season, slug)
+            parsed += 1
+            if len(in_flight) >= max_in_flight:
+                finished, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                collect(finished)
+            if parsed % 25 == 0:
+                print(f"Parsed {parsed}/{len(tasks)} pages")
+        collect(wait(in_flight).done)
+
+    producer.join()
+
+    outputs: dict[int, Path] = {}
+    for season in seasons:
+        done = journals[season].completed()
+        rows = [row for slug in school_order[season] for row in done.get(slug, [])]
+        if not rows:
+            print(f"No rows for {season}; store left unchanged")
+            continue
+        write_gamelogs(pd.DataFrame(rows), base_dir=base_dir)
+        outputs[season] = season_dir(season, base_dir)
+    return outputs
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Backfill gamelogs for several seasons.")
+    parser.add_argument("--seasons", type=int, nargs="+", required=True)
+    parser.add_argument("--fetch-workers", type=int, default=scraping.DEFAULT_WORKERS)
+    parser.add_argument("--parse-workers", type=int, default=None)
+    parser.add_argument("--queue-size", type=int, default=32)
+    parser.add_argument(
+        "--parser",
+        choices=scraping.GAMELOG_PARSERS,
+        default=None,
+        help=f"Gamelog HTML backend (default: {scraping.DEFAULT_PARSER}).",
+    )
+    parser.add_argument("--limit", type=int, default=None, help="First N schools per season.")
+    parser.add_argument(
+        "--requests-per-minute",
+        type=float,
+        default=None,
+        help=f"Global request budget (default: {scraping.DEFAULT_REQUESTS_PER_MINUTE}).",
+    )
+    parser.add_argument(
+        "--restart",
+        action="store_true",
+        help="Discard existing journals instead of resuming from them.",
+    )
+    args = parser.parse_args()
+
+    if args.requests_per_minute is not None:
+        scraping.set_rate_limit(args.requests_per_minute)
+
+    backfill_seasons(
+        args.seasons,
+        fetch_workers=args.fetch_workers,
+        parse_workers=args.parse_workers,
+        queue_size=args.queue_size,
+        parser=args.parser,
+        limit=args.limit,
+        resume=not args.restart,
+    )
+
+
+if __name__ == "__main__":
+    main()
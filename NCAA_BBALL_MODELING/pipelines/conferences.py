@@ -1,11 +1,22 @@
 from __future__ import annotations
 
 import time
+from concurrent.futures import ThreadPoolExecutor
+from io import StringIO
 from typing import Iterable, Optional
 
 import pandas as pd
 import requests
 
+try:
+    from NCAA_BBALL_MODELING.gamelog_scraping import (
+        DEFAULT_WORKERS,
+        fetch_page_safe,
+        site_url,
+    )
+except ImportError:
+    from gamelog_scraping import DEFAULT_WORKERS, fetch_page_safe, site_url
+
 CONF_MAP = {
     "Atlantic Coast Conference": "acc",
     "America East Conference": "america-east",
@@ -40,7 +51,8 @@ CONF_MAP = {
     "West Coast Conference": "wcc",
 }
 
-BASE = "https://www.sports-reference.com/cbb/conferences/{}/men/schools.html"
+# Path on the Sports Reference host (see gamelog_scraping.set_base_url).
+BASE = "/cbb/conferences/{}/men/schools.html"
 
 
 def fetch_conference_teams(
@@ -48,18 +60,21 @@ def fetch_conference_teams(
     slug: str,
     *,
     to_year: int = 2026,
-    sleep_seconds: float = 2.0,
+    sleep_seconds: float = 0.0,
     session: Optional[requests.Session] = None,
 ) -> pd.DataFrame:
-    """Fetch a single conference's teams for a given year."""
-    url = BASE.format(slug)
-    headers = {"User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7)"}
+    """Fetch a single conference's teams for a given year.
 
-    sess = session or requests.Session()
-    response = sess.get(url, headers=headers, timeout=30)
-    response.raise_for_status()
+    Requests go through the shared gamelog rate limiter; ``sleep_seconds`` is
+    only an extra pause on top of it.
+    """
+    url = site_url(BASE.format(slug))
 
-    df = pd.read_html(response.text, attrs={"id": "schools"})[0]
+    page = fetch_page_safe(url, f"conference {slug}", http_session=session)
+    if page is None:
+        raise requests.HTTPError(f"Could not fetch conference page: {url}")
+
+    df = pd.read_html(StringIO(page), attrs={"id": "schools"})[0]
     df["To"] = pd.to_numeric(df["To"], errors="coerce")
     df = df[df["To"] == to_year]
 
@@ -67,30 +82,33 @@ def fetch_conference_teams(
     df["conference"] = full_name
     df["conference_slug"] = slug
 
-    time.sleep(sleep_seconds)
+    if sleep_seconds:
+        time.sleep(sleep_seconds)
     return df[["team_name", "conference", "conference_slug"]]
 
 
 def build_conference_assignments(
     *,
     to_year: int = 2026,
-    sleep_seconds: float = 2.0,
+    sleep_seconds: float = 0.0,
     conference_map: Optional[dict[str, str]] = None,
+    workers: int = DEFAULT_WORKERS,
 ) -> pd.DataFrame:
     """Build a dataframe of teams with conference assignments."""
-    rows: list[pd.DataFrame] = []
     conf_map = conference_map or CONF_MAP
 
-    for full_name, slug in conf_map.items():
-        rows.append(
-            fetch_conference_teams(
-                full_name,
-                slug,
-                to_year=to_year,
-                sleep_seconds=sleep_seconds,
-            )
+    def fetch(item: tuple[str, str]) -> pd.DataFrame:
+        full_name, slug = item
+        return fetch_conference_teams(
+            full_name,
+            slug,
+            to_year=to_year,
+            sleep_seconds=sleep_seconds,
         )
 
+    with ThreadPoolExecutor(max_workers=max(workers, 1)) as pool:
+        rows: list[pd.DataFrame] = list(pool.map(fetch, conf_map.items()))
+
     return pd.concat(rows, ignore_index=True)
 
 
@@ -98,14 +116,16 @@ def save_conference_assignments(
     output_path: str,
     *,
     to_year: int = 2026,
-    sleep_seconds: float = 2.0,
+    sleep_seconds: float = 0.0,
     conference_map: Optional[dict[str, str]] = None,
+    workers: int = DEFAULT_WORKERS,
 ) -> pd.DataFrame:
     """Create and save the conference assignments CSV."""
     df = build_conference_assignments(
         to_year=to_year,
         sleep_seconds=sleep_seconds,
         conference_map=conference_map,
+        workers=workers,
     )
     df.to_csv(output_path, index=False)
     return df
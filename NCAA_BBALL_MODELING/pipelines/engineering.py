@@ -1,11 +1,14 @@
 from __future__ import annotations
 
+import argparse
+import os
 from pathlib import Path
 from typing import Optional
 
 try:
-    from NCAA_BBALL_MODELING import utils
+    from NCAA_BBALL_MODELING import feature_state, utils
 except ImportError:
+    import feature_state
     import utils
 
 
@@ -15,20 +18,35 @@ def update_gamelogs(
     input_path: Optional[str | Path] = None,
     output_path: Optional[str | Path] = None,
     max_teams: Optional[int] = None,
-) -> None:
-    """Update gamelogs for a specific date (YYYY-MM-DD)."""
-    utils.update_gamelogs_by_date(
+    workers: int = utils.DEFAULT_WORKERS,
+    requests_per_minute: Optional[float] = None,
+    mirror: bool = True,
+    export_xlsx: bool = False,
+) -> set[tuple]:
+    """Update gamelogs for a specific date (YYYY-MM-DD); returns the changed row keys."""
+    return utils.update_gamelogs_by_date(
         target_date=target_date,
         season=season,
         input_path=input_path,
         output_path=output_path,
         max_teams=max_teams,
+        workers=workers,
+        requests_per_minute=requests_per_minute,
+        mirror=mirror,
+        export_xlsx=export_xlsx,
     )
 
 
-def create_features(only_season: Optional[int] = None, base_dir: Optional[str | Path] = None) -> Path:
-    """Create feature CSVs. Returns the output path."""
-    utils.create_features(only_season=only_season, base_dir=base_dir)
+def create_features(
+    only_season: Optional[int] = None,
+    base_dir: Optional[str | Path] = None,
+    use_cache: bool = True,
+    workers: int = 1,
+) -> Path:
+    """Create feature CSVs, building seasons in ``workers`` processes. Returns the output path."""
+    utils.create_features(
+        only_season=only_season, base_dir=base_dir, use_cache=use_cache, workers=workers
+    )
 
     base_dir_resolved = Path(base_dir) if base_dir is not None else utils._resolve_base_dir()
     data_dir = base_dir_resolved / "data"
@@ -37,16 +55,38 @@ def create_features(only_season: Optional[int] = None, base_dir: Optional[str |
     return data_dir / "merged_dataset.csv"
 
 
+def update_features(
+    season: int = 2026,
+    base_dir: Optional[str | Path] = None,
+    verify: bool = False,
+) -> Path:
+    """Fold new games into the per-team feature state. Returns the season feature CSV."""
+    feature_state.update_features(season, base_dir=base_dir)
+    if verify:
+        feature_state.verify_features(season, base_dir=base_dir)
+    return feature_state._feature_csv_path(season, base_dir)
+
+
 def run_engineering(
     *,
     target_date: Optional[str] = None,
     season: int = 2026,
     run_update: bool = True,
     run_features: bool = True,
+    full_features: bool = False,
+    verify_features: bool = False,
     base_dir: Optional[str | Path] = None,
     max_teams: Optional[int] = None,
+    workers: int = utils.DEFAULT_WORKERS,
+    requests_per_minute: Optional[float] = None,
+    mirror: bool = True,
+    export_xlsx: bool = False,
 ) -> Optional[Path]:
-    """Run engineering steps separately or together."""
+    """Run engineering steps separately or together.
+
+    Features are updated incrementally from the per-team state unless
+    ``full_features`` asks for a full rebuild of the season.
+    """
     if run_update:
         if not target_date:
             raise ValueError("target_date is required when run_update=True")
@@ -54,9 +94,41 @@ def run_engineering(
             target_date=target_date,
             season=season,
             max_teams=max_teams,
+            workers=workers,
+            requests_per_minute=requests_per_minute,
+            mirror=mirror,
+            export_xlsx=export_xlsx,
         )
 
     if run_features:
-        return create_features(only_season=season, base_dir=base_dir)
+        if full_features:
+            return create_features(only_season=season, base_dir=base_dir)
+        return update_features(season, base_dir=base_dir, verify=verify_features)
 
     return None
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Rebuild the feature CSV from stored gamelogs.")
+    parser.add_argument("--only-season", type=int, default=None, help="Only this season (2026).")
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="Seasons built in parallel processes (default: CPU count).",
+    )
+    parser.add_argument("--no-cache", action="store_true", help="Ignore the stage cache.")
+    parser.add_argument("--base-dir", help="Project directory holding data/ (default: this package).")
+    args = parser.parse_args()
+
+    output_path = create_features(
+        only_season=args.only_season,
+        base_dir=args.base_dir,
+        use_cache=not args.no_cache,
+        workers=args.workers or os.cpu_count() or 1,
+    )
+    print(f"Features: {output_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -4,6 +4,7 @@ import os
 from pathlib import Path
 from typing import Optional
 
+import numpy as np
 import pandas as pd
 
 from pathlib import Path
@@ -26,9 +27,13 @@ except ImportError:
     from gamelog_scraping import get_schools
 
 try:
+    from NCAA_BBALL_MODELING.teams import TeamRegistry, load_team_registry, team_ids_path
     from NCAA_BBALL_MODELING.utils import _resolve_base_dir
+    from NCAA_BBALL_MODELING import warehouse
 except ImportError:
+    from teams import TeamRegistry, load_team_registry, team_ids_path
     from utils import _resolve_base_dir
+    import warehouse
 
 
 def login_kenpom(username: Optional[str] = None, password: Optional[str] = None):
@@ -62,13 +67,17 @@ def fetch_fanmatch(
     return fanmatch.fm_df
 
 
-def _map_team_name(name: str, team_name_map: Optional[dict[str, str]] = None) -> str:
-    if pd.isna(name):
-        return ""
-    value = str(name).strip()
-    if team_name_map:
-        return team_name_map.get(value, value)
-    return value
+def team_registry(
+    names=(), team_name_map: Optional[dict[str, str]] = None, base_dir=None
+) -> TeamRegistry:
+    """The saved team registry with ``names`` added and KenPom spellings as aliases."""
+    registry = load_team_registry(pd.unique(pd.Series(names, dtype=object)), base_dir=base_dir)
+    return registry.with_aliases(team_name_map) if team_name_map else registry
+
+
+def _team_names(values, registry: TeamRegistry) -> pd.Series:
+    """Canonical school names, '' where missing."""
+    return pd.Series(registry.canonical_names(values), index=values.index).fillna("")
 
 
 def enrich_fanmatch_predictions(fanmatch_df: pd.DataFrame) -> pd.DataFrame:
@@ -90,6 +99,7 @@ def _build_kenpom_merge_keys(
     fanmatch_df: pd.DataFrame,
     match_date: str,
     team_name_map: Optional[dict[str, str]] = None,
+    registry: Optional[TeamRegistry] = None,
 ) -> pd.DataFrame:
     enriched = enrich_fanmatch_predictions(fanmatch_df)
     if "KenPom_spread" not in enriched.columns:
@@ -97,12 +107,10 @@ def _build_kenpom_merge_keys(
             "KenPom_spread missing from FanMatch data. Expected PredictedScore or PredictedMOV."
         )
 
-    winner = enriched["PredictedWinner"].map(
-        lambda x: _map_team_name(x, team_name_map=team_name_map)
-    )
-    loser = enriched["PredictedLoser"].map(
-        lambda x: _map_team_name(x, team_name_map=team_name_map)
-    )
+    if registry is None:
+        registry = team_registry(team_name_map=team_name_map)
+    winner = _team_names(enriched["PredictedWinner"], registry)
+    loser = _team_names(enriched["PredictedLoser"], registry)
 
     merged = pd.DataFrame(
         {
@@ -166,6 +174,11 @@ def update_kenpom_history(
         team_name_map=team_name_map,
     )
 
+    # The first warehouse write starts from the full CSV history.
+    if history_path.exists() and not warehouse.has_table("kenpom_spreads", base_dir):
+        warehouse.replace_rows("kenpom_spreads", pd.read_csv(history_path), base_dir=base_dir)
+    warehouse.store_kenpom_spreads(daily, base_dir=base_dir)
+
     if history_path.exists():
         history = pd.read_csv(history_path)
         if "date" in history.columns:
@@ -185,8 +198,13 @@ def update_kenpom_history(
 def merge_kenpom_history_into_predictions(
     predictions_df: pd.DataFrame,
     history_df: pd.DataFrame,
+    registry: Optional[TeamRegistry] = None,
 ) -> pd.DataFrame:
-    """Merge KenPom history into predictions with school->opp fallback by date."""
+    """Merge KenPom history into predictions with school->opp fallback by date.
+
+    Favorites and teams are matched on ``team_id`` (``registry`` defaults
+    to the saved one, extended with the predictions' schools).
+    """
     pred = predictions_df.copy()
     pred["date"] = pd.to_datetime(pred["date"])
     # Avoid pandas suffix collisions when rerunning daily merges.
@@ -194,30 +212,26 @@ def merge_kenpom_history_into_predictions(
         columns=["KenPom_spread", "kenpom_spread_for_school", "kenpom_favorite"],
         errors="ignore",
     )
+    if registry is None:
+        registry = team_registry(pd.concat([pred["school_name"], pred["opp_name_abbr"]]))
 
     history = history_df.copy()
     history["date"] = pd.to_datetime(history["date"])
     if "KenPom_spread" not in history.columns and "kenpom_spread" in history.columns:
         history["KenPom_spread"] = history["kenpom_spread"]
-    keep_cols = ["date", "kenpom_favorite", "KenPom_spread"]
-    history = history[keep_cols].drop_duplicates(["date", "kenpom_favorite"], keep="last")
+    history["favorite_id"] = registry.ids(history["kenpom_favorite"])
+    keep_cols = ["date", "favorite_id", "kenpom_favorite", "KenPom_spread"]
+    history = history.loc[history["favorite_id"] >= 0, keep_cols]
+    history = history.drop_duplicates(["date", "favorite_id"], keep="last")
 
-    school_match = pred.merge(
-        history,
-        left_on=["date", "school_name"],
-        right_on=["date", "kenpom_favorite"],
-        how="left",
-        suffixes=("", "_school"),
+    school_match = pred.assign(favorite_id=registry.ids(pred["school_name"])).merge(
+        history, on=["date", "favorite_id"], how="left"
     )
-    opp_match = pred.merge(
-        history,
-        left_on=["date", "opp_name_abbr"],
-        right_on=["date", "kenpom_favorite"],
-        how="left",
-        suffixes=("", "_opp"),
+    opp_match = pred[["date"]].assign(favorite_id=registry.ids(pred["opp_name_abbr"])).merge(
+        history, on=["date", "favorite_id"], how="left"
     )
 
-    merged = school_match.copy()
+    merged = school_match.drop(columns="favorite_id")
     merged["kenpom_favorite"] = merged["kenpom_favorite"].where(
         merged["kenpom_favorite"].notna(),
         opp_match["kenpom_favorite"],
@@ -239,22 +253,31 @@ def merge_predictions_with_kenpom_history(
     history_path: Optional[str | Path] = None,
     output_path: Optional[str | Path] = None,
 ) -> Path:
-    """Merge persistent KenPom history into predictions.csv."""
+    """Merge persistent KenPom history into predictions.csv.
+
+    Without an explicit ``history_path``, only the prediction dates are read,
+    from the warehouse when it has KenPom spreads. The merged dates replace
+    their rows in the warehouse ``predictions`` table, which the app reads.
+    """
     base_dir = _resolve_base_dir()
     if predictions_path is None:
         predictions_path = base_dir / "data" / "predictions.csv"
-    if history_path is None:
-        history_path = base_dir / "data" / "kenpom_spreads_history.csv"
     if output_path is None:
         output_path = predictions_path
 
     pred = pd.read_csv(predictions_path)
-    history = pd.read_csv(history_path)
+    if history_path is None and warehouse.has_table("kenpom_spreads", base_dir):
+        history = warehouse.kenpom_spreads(pred["date"].unique(), base_dir=base_dir)
+    else:
+        if history_path is None:
+            history_path = base_dir / "data" / "kenpom_spreads_history.csv"
+        history = pd.read_csv(history_path)
     merged = merge_kenpom_history_into_predictions(pred, history)
 
     output_path = Path(output_path)
     output_path.parent.mkdir(parents=True, exist_ok=True)
     merged.to_csv(output_path, index=False)
+    warehouse.store_predictions(merged, base_dir=base_dir)
     return output_path
 
 
@@ -270,7 +293,7 @@ def run_kenpom_history_update(
     password: Optional[str] = None,
 ) -> Path:
     """Update KenPom history for one date, then merge it into predictions.csv."""
-    history_path = update_kenpom_history(
+    update_kenpom_history(
         match_date=match_date,
         history_path=history_path,
         name_map_path=name_map_path,
@@ -290,41 +313,39 @@ def merge_kenpom_into_predictions(
     fanmatch_df: pd.DataFrame,
     match_date: str,
     team_name_map: Optional[dict[str, str]] = None,
+    registry: Optional[TeamRegistry] = None,
 ) -> pd.DataFrame:
-    """Join KenPom spread into predictions by date + unordered team pair."""
+    """Join KenPom spread into predictions by date + unordered pair of team ids."""
     pred = predictions_df.copy()
     pred["date"] = pd.to_datetime(pred["date"])
-    pred["school_key"] = pred["school_name"].map(
-        lambda x: _map_team_name(x, team_name_map=team_name_map)
-    )
-    pred["opp_key"] = pred["opp_name_abbr"].map(
-        lambda x: _map_team_name(x, team_name_map=team_name_map)
-    )
-    pred["team_a"] = pred["school_key"].where(
-        pred["school_key"] <= pred["opp_key"], pred["opp_key"]
-    )
-    pred["team_b"] = pred["opp_key"].where(
-        pred["school_key"] <= pred["opp_key"], pred["school_key"]
-    )
-
-    kp_keys = _build_kenpom_merge_keys(
-        fanmatch_df,
-        match_date=match_date,
-        team_name_map=team_name_map,
+    if registry is None:
+        registry = team_registry(
+            pd.concat([pred["school_name"], pred["opp_name_abbr"]]), team_name_map
+        )
+    school_id = registry.ids(pred["school_name"])
+    opp_id = registry.ids(pred["opp_name_abbr"])
+    pred["team_a"] = np.minimum(school_id, opp_id)
+    pred["team_b"] = np.maximum(school_id, opp_id)
+
+    kp_keys = _build_kenpom_merge_keys(fanmatch_df, match_date=match_date, registry=registry)
+    low, high = registry.ids(kp_keys["team_a"]), registry.ids(kp_keys["team_b"])
+    kp_keys = kp_keys.assign(
+        team_a=np.minimum(low, high),
+        team_b=np.maximum(low, high),
+        favorite_id=registry.ids(kp_keys["kenpom_favorite"]),
     )
+    # Games with a team the registry doesn't know can't be paired.
+    kp_keys = kp_keys[kp_keys["team_a"] >= 0].drop_duplicates(["date", "team_a", "team_b"])
     merged = pred.merge(
         kp_keys,
         on=["date", "team_a", "team_b"],
         how="left",
     )
     merged["kenpom_spread_for_school"] = merged["KenPom_spread"].where(
-        merged["school_key"] == merged["kenpom_favorite"],
+        merged["favorite_id"].to_numpy() == school_id,
         -merged["KenPom_spread"],
     )
-    return merged.drop(
-        columns=["school_key", "opp_key", "team_a", "team_b"],
-        errors="ignore",
-    )
+    return merged.drop(columns=["team_a", "team_b", "favorite_id"], errors="ignore")
 
 
 def build_team_ids(year: int = 2026) -> pd.DataFrame:
@@ -342,8 +363,16 @@ def build_team_ids(year: int = 2026) -> pd.DataFrame:
     return teams_df[["team_id", "school_name", "school_slug"]]
 
 
-def save_team_ids(output_path: str, year: int = 2026) -> pd.DataFrame:
-    """Save team_ids CSV to disk."""
+def save_team_ids(output_path: Optional[str] = None, year: int = 2026) -> pd.DataFrame:
+    """Save team_ids CSV to disk, by default as the team registry (``teams``).
+
+    An existing registry keeps the ids it already issued; schools new to it
+    get the next ones.
+    """
     df = build_team_ids(year)
+    if output_path is None:
+        output_path = team_ids_path()
+        if output_path.exists():
+            return load_team_registry(df["school_name"]).to_frame()
     df.to_csv(output_path, index=False)
     return df
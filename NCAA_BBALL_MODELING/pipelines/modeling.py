@@ -87,6 +87,23 @@ DEFAULT_RESIDUAL_FEATURES = [
 ]
 
 
+# Columns ``add_interactions`` derives, and the inputs each one needs.
+INTERACTION_INPUTS = {
+    "net_rtg_home_interaction": ["net_rtg_comp", "is_Home"],
+}
+
+# Columns ``build_favorites_predictions`` keeps besides the predictions.
+PREDICTION_COLUMNS = [
+    "date",
+    "school_name",
+    "opp_name_abbr",
+    "is_Home",
+    "team_game_score",
+    "opp_team_game_score",
+    "score_diff",
+]
+
+
 @dataclass
 class ModelBundle:
     baseline_model: object
@@ -102,18 +119,64 @@ class TrainResults:
 
 
 try:
+    from NCAA_BBALL_MODELING import feature_registry
+    from NCAA_BBALL_MODELING.matrix_cache import read_csv_cached
+    from NCAA_BBALL_MODELING.teams import TEAM_ID_COLUMNS
     from NCAA_BBALL_MODELING.utils import _resolve_base_dir
+    from NCAA_BBALL_MODELING.warehouse import store_predictions
 except ImportError:
+    import feature_registry
+    from matrix_cache import read_csv_cached
+    from teams import TEAM_ID_COLUMNS
     from utils import _resolve_base_dir
+    from warehouse import store_predictions
+
+
+def _unique(columns: Iterable[str]) -> list[str]:
+    return list(dict.fromkeys(columns))
+
+
+def feature_columns(features: Iterable[str]) -> list[str]:
+    """Stored columns needed to build ``features``, with interactions expanded."""
+    columns = []
+    for feature in features:
+        columns.extend(INTERACTION_INPUTS.get(feature, [feature]))
+    return _unique(columns)
 
 
-def load_training_data(path: Optional[str | Path] = None) -> pd.DataFrame:
-    """Load merged dataset and drop rows missing required columns."""
+def bundle_columns(model_bundle: ModelBundle) -> list[str]:
+    """Stored columns the bundle's two models read."""
+    return feature_columns(
+        model_bundle.baseline_features + model_bundle.residual_features
+    )
+
+
+def training_columns(
+    baseline_features: Optional[list[str]] = None,
+    residual_features: Optional[list[str]] = None,
+) -> list[str]:
+    """Stored columns ``train_models`` needs for the given feature lists."""
+    features = (baseline_features or DEFAULT_BASELINE_FEATURES) + (
+        residual_features or DEFAULT_RESIDUAL_FEATURES
+    )
+    return _unique(["season", "score_diff"] + feature_columns(features) + REQUIRED_COLUMNS)
+
+
+def load_training_data(
+    path: Optional[str | Path] = None, columns: Optional[list[str]] = None
+) -> pd.DataFrame:
+    """Load merged dataset (via its Arrow cache) and drop rows missing required columns.
+
+    ``columns`` limits the read to those columns (see ``training_columns``);
+    the ``REQUIRED_COLUMNS`` filter is always loaded.
+    """
     if path is None:
         base_dir = _resolve_base_dir()
         path = base_dir / "data" / "merged_dataset.csv"
 
-    df = pd.read_csv(path)
+    if columns is not None:
+        columns = _unique(list(columns) + REQUIRED_COLUMNS)
+    df = read_csv_cached(path, columns)
     df = df.dropna(subset=REQUIRED_COLUMNS)
     return df
 
@@ -224,38 +287,69 @@ def predict_from_features(
     return df
 
 
-def load_features(path: str | Path) -> pd.DataFrame:
-    df = pd.read_csv(path)
+def load_features(path: str | Path, columns: Optional[list[str]] = None) -> pd.DataFrame:
+    df = read_csv_cached(path, columns)
     if "date" in df.columns:
         df["date"] = pd.to_datetime(df["date"])
     return df
 
 
+def build_prediction_features(
+    model_bundle: ModelBundle,
+    season: int,
+    base_dir: Optional[str | Path] = None,
+    favorites_only: bool = True,
+) -> pd.DataFrame:
+    """Only the columns ``model_bundle`` scores on, computed from the season's gamelogs.
+
+    The registry builds named features only, so the full frame the
+    non-favorites path reads from the features CSV is not available here.
+    """
+    columns = prediction_input_columns(model_bundle, favorites_only)
+    if columns is None:
+        raise ValueError("lazy_features builds only the model's columns; it needs favorites_only")
+    return feature_registry.build_features(columns, season, base_dir=base_dir)
+
+
+def prediction_input_columns(
+    model_bundle: ModelBundle, favorites_only: bool = True
+) -> Optional[list[str]]:
+    """Feature columns to load for predictions; None (all) unless favorites_only."""
+    if not favorites_only:
+        return None
+    return _unique(PREDICTION_COLUMNS + TEAM_ID_COLUMNS + bundle_columns(model_bundle))
+
+
 def build_favorites_predictions(pred_df: pd.DataFrame) -> pd.DataFrame:
-    favored_df = pred_df[pred_df["pred_final"] > 0].copy()
-    favored_df["team_a"] = favored_df[["school_name", "opp_name_abbr"]].min(axis=1)
-    favored_df["team_b"] = favored_df[["school_name", "opp_name_abbr"]].max(axis=1)
-    favored_df = favored_df.drop_duplicates(["date", "team_a", "team_b"])
-
-    keep_cols = [
-        "date",
-        "school_name",
-        "opp_name_abbr",
-        "pred_final",
-        "pred_baseline",
-        "pred_residual",
-        "is_Home",
-        "team_game_score",
-        "opp_team_game_score",
-        "score_diff",
-    ]
+    favored_df = pred_df[pred_df["pred_final"] > 0]
+    # One row per game: the unordered pair of team ids on a date.
+    team = favored_df["team_id"].to_numpy(dtype=np.int64)
+    opp = favored_df["opp_team_id"].to_numpy(dtype=np.int64)
+    pairs = pd.DataFrame(
+        {
+            "date": favored_df["date"].to_numpy(),
+            "team_a": np.minimum(team, opp),
+            "team_b": np.maximum(team, opp),
+        }
+    )
+    favored_df = favored_df[~pairs.duplicated().to_numpy()]
+
+    keep_cols = (
+        PREDICTION_COLUMNS[:3]
+        + ["pred_final", "pred_baseline", "pred_residual"]
+        + PREDICTION_COLUMNS[3:]
+    )
     return favored_df[keep_cols]
 
 
-def save_predictions(pred_df: pd.DataFrame, output_path: str | Path) -> Path:
+def save_predictions(
+    pred_df: pd.DataFrame, output_path: str | Path, base_dir: Optional[str | Path] = None
+) -> Path:
+    """Write predictions to CSV and replace their dates in the warehouse."""
     output_path = Path(output_path)
     output_path.parent.mkdir(parents=True, exist_ok=True)
     pred_df.to_csv(output_path, index=False)
+    store_predictions(pred_df, base_dir=base_dir or _resolve_base_dir())
     return output_path
 
 
@@ -289,9 +383,19 @@ def run_modeling_pipeline(
     baseline_features: Optional[list[str]] = None,
     residual_features: Optional[list[str]] = None,
     favorites_only: bool = True,
+    lazy_features: bool = False,
 ) -> Path:
-    """Train models and write predictions to CSV."""
-    df = load_training_data(training_path)
+    """Train models and write predictions to CSV.
+
+    With ``lazy_features`` the test season is scored from its gamelogs,
+    building only the model's features instead of reading ``features_path``.
+    """
+    if lazy_features and not favorites_only:
+        # Checked before training; build_prediction_features would raise after it.
+        raise ValueError("lazy_features builds only the model's columns; it needs favorites_only")
+    df = load_training_data(
+        training_path, training_columns(baseline_features, residual_features)
+    )
     results = train_models(
         df,
         seasons_train=seasons_train,
@@ -308,13 +412,19 @@ def run_modeling_pipeline(
             model_path = base_dir / "data" / "model_bundle.pkl"
         save_model_bundle(results.model_bundle, model_path)
 
-    if features_path is None:
-        base_dir = _resolve_base_dir()
-        features_path = (
-            base_dir / "data" / str(season_test) / f"features_{season_test}.csv"
+    if lazy_features:
+        features_df = build_prediction_features(
+            results.model_bundle, season_test, favorites_only=favorites_only
+        )
+    else:
+        if features_path is None:
+            base_dir = _resolve_base_dir()
+            features_path = (
+                base_dir / "data" / str(season_test) / f"features_{season_test}.csv"
+            )
+        features_df = load_features(
+            features_path, prediction_input_columns(results.model_bundle, favorites_only)
         )
-
-    features_df = load_features(features_path)
     pred_df = predict_from_features(features_df, model_bundle=results.model_bundle)
 
     if favorites_only:
@@ -334,8 +444,13 @@ def run_predictions_only(
     predictions_path: Optional[str | Path] = None,
     season_test: int = 2026,
     favorites_only: bool = True,
+    lazy_features: bool = False,
 ) -> Path:
-    """Load a saved model bundle and refresh predictions without retraining."""
+    """Load a saved model bundle and refresh predictions without retraining.
+
+    ``lazy_features`` scores from the season's gamelogs, as in
+    ``run_modeling_pipeline``.
+    """
     base_dir = _resolve_base_dir()
 
     if model_path is None:
@@ -345,7 +460,14 @@ def run_predictions_only(
         features_path = base_dir / "data" / str(season_test) / f"features_{season_test}.csv"
 
     model_bundle = load_model_bundle(model_path)
-    features_df = load_features(features_path)
+    if lazy_features:
+        features_df = build_prediction_features(
+            model_bundle, season_test, base_dir, favorites_only
+        )
+    else:
+        features_df = load_features(
+            features_path, prediction_input_columns(model_bundle, favorites_only)
+        )
     pred_df = predict_from_features(features_df, model_bundle=model_bundle)
 
     if favorites_only:
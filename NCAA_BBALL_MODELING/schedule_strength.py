@@ -0,0 +1,157 @@
+"""Strength of schedule from a sparse team-by-opponent adjacency matrix.
+
+For a row dated ``d``, ``sos_net_rtg`` is the mean, over the team's games
+before ``d``, of each opponent's net rating as of ``d`` (its ``cum_net_rtg``
+over completed games). ``sos_net_rtg_last_<w>`` does the same over the
+team's last ``w`` games. Opponents are rated as of ``d``, not as of the
+game, so an early opponent's rating keeps improving through the season.
+
+Each season walks its dates once. The schedule so far is a sparse
+``teams x opponents`` count matrix that grows by one date's games at a
+time, alongside a second matrix of the games that have dropped out of each
+team's last ``w``. The rows on a date then read their sums from two sparse
+matrix-vector products against that date's net-rating snapshot.
+"""
+
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+try:
+    from .teams import dense_codes
+except ImportError:
+    from teams import dense_codes
+
+
+# Games in the rolling schedule window (utils.BASE_WINDOW).
+SOS_WINDOW = 10
+
+SOS_COLUMNS = ["sos_net_rtg", f"sos_net_rtg_last_{SOS_WINDOW}"]
+
+# Columns ``add_schedule_strength`` reads.
+SOS_INPUTS = [
+    "season",
+    "date",
+    "team_id",
+    "opp_team_id",
+    "team_game_score",
+    "opp_team_game_score",
+    "possessions",
+]
+
+
+def _adjacency(team: np.ndarray, opp: np.ndarray, n_teams: int) -> sparse.csr_matrix:
+    return sparse.csr_matrix(
+        (np.ones(len(team)), (team, opp)), shape=(n_teams, n_teams), dtype=np.float64
+    )
+
+
+def season_schedule_strength(
+    date, team, opp, points, opp_points, possessions, window: int = SOS_WINDOW
+) -> np.ndarray:
+    """(cumulative, last-``window``) strength of schedule for every row of one season.
+
+    ``team`` and ``opp`` are team ids; rows with both scores, positive
+    possessions and a known opponent are the games played. A row's window
+    is the team's previous ``window`` rows, like the rolling columns, and
+    rows with no earlier game get 0.
+    """
+    date = np.asarray(date, dtype="datetime64[ns]")
+    points = np.asarray(points, dtype=np.float64)
+    opp_points = np.asarray(opp_points, dtype=np.float64)
+    possessions = np.asarray(possessions, dtype=np.float64)
+
+    team_code, opp_code, n_teams = dense_codes(team, opp)
+    played = (
+        np.isfinite(points)
+        & np.isfinite(opp_points)
+        & (possessions > 0)
+        & (team_code >= 0)
+        & (opp_code >= 0)
+    )
+
+    # A game leaves its team's window once the team has ``window`` more
+    # rows, i.e. after the date of the row ``window`` places later.
+    order = np.lexsort((date, team_code))
+    position = np.empty(len(date), dtype=np.int64)
+    position[order] = np.arange(len(date))
+    later = position + window
+    same_team = np.zeros(len(date), dtype=bool)
+    inside = later < len(date)
+    same_team[inside] = team_code[order[later[inside]]] == team_code[inside]
+    retire = np.full(len(date), np.datetime64("NaT"), dtype="datetime64[ns]")
+    retire[same_team] = date[order[later[same_team]]]
+
+    dates = np.unique(date)
+    step = np.searchsorted(dates, date)
+    retire_step = np.where(same_team, np.searchsorted(dates, retire), -1)
+    retired = np.flatnonzero(played & same_team)
+    retired = retired[np.argsort(retire_step[retired], kind="stable")]
+    retired_bounds = np.searchsorted(retire_step[retired], np.arange(len(dates) + 1))
+    rows_by_step = np.argsort(step, kind="stable")
+    row_bounds = np.searchsorted(step[rows_by_step], np.arange(len(dates) + 1))
+
+    schedule = _adjacency(np.array([], int), np.array([], int), n_teams)
+    dropped = schedule.copy()
+    degree, dropped_degree = np.zeros(n_teams), np.zeros(n_teams)
+    totals = np.zeros((n_teams, 3))
+    out = np.zeros((len(date), 2))
+    for k in range(len(dates)):
+        # Each team's net rating over its games before this date.
+        with np.errstate(invalid="ignore", divide="ignore"):
+            snapshot = 100 * (totals[:, 0] - totals[:, 1]) / totals[:, 2]
+        snapshot = np.where(totals[:, 2] > 0, snapshot, 0.0)
+
+        on_date = rows_by_step[row_bounds[k] : row_bounds[k + 1]]
+        rows = on_date[team_code[on_date] >= 0]
+        if len(rows) and degree.any():
+            faced = schedule @ snapshot
+            recent = faced - dropped @ snapshot
+            t = team_code[rows]
+            count, recent_count = degree[t], degree[t] - dropped_degree[t]
+            with np.errstate(invalid="ignore", divide="ignore"):
+                out[rows, 0] = np.where(count > 0, faced[t] / count, 0.0)
+                out[rows, 1] = np.where(recent_count > 0, recent[t] / recent_count, 0.0)
+
+        today = on_date[played[on_date]]
+        if len(today):
+            schedule = schedule + _adjacency(team_code[today], opp_code[today], n_teams)
+            np.add.at(degree, team_code[today], 1.0)
+            np.add.at(
+                totals,
+                team_code[today],
+                np.column_stack([points[today], opp_points[today], possessions[today]]),
+            )
+        gone = retired[retired_bounds[k] : retired_bounds[k + 1]]
+        if len(gone):
+            dropped = dropped + _adjacency(team_code[gone], opp_code[gone], n_teams)
+            np.add.at(dropped_degree, team_code[gone], 1.0)
+    return out
+
+
+def schedule_strength(frame: pd.DataFrame, window: int = SOS_WINDOW) -> pd.DataFrame:
+    """``SOS_COLUMNS`` for every row of ``frame``, season by season, on its index."""
+    out = np.zeros((len(frame), 2))
+    seasons = frame["season"].to_numpy()
+    for season in pd.unique(seasons):
+        rows = np.flatnonzero(seasons == season)
+        part = frame.iloc[rows]
+        out[rows] = season_schedule_strength(
+            part["date"].to_numpy(),
+            part["team_id"].to_numpy(),
+            part["opp_team_id"].to_numpy(),
+            part["team_game_score"].to_numpy(dtype=np.float64, na_value=np.nan),
+            part["opp_team_game_score"].to_numpy(dtype=np.float64, na_value=np.nan),
+            part["possessions"].to_numpy(dtype=np.float64, na_value=np.nan),
+            window,
+        )
+    columns = ["sos_net_rtg", f"sos_net_rtg_last_{window}"]
+    return pd.DataFrame(out, index=frame.index, columns=columns)
+
+
+def add_schedule_strength(df: pd.DataFrame) -> pd.DataFrame:
+    """``df`` (an ``add_features`` frame) with the ``SOS_COLUMNS``."""
+    strength = schedule_strength(df)
+    return pd.concat([df.drop(columns=SOS_COLUMNS, errors="ignore"), strength], axis=1)
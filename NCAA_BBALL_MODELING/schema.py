@@ -0,0 +1,161 @@
+"""Compact column types shared by the gamelog store, features and modeling.
+
+Team, location and result columns are categoricals, box-score counts are
+16-bit nullable ints, and rates plus every derived average are float32.
+"""
+
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+
+
+BOX_SCORE_COUNTS = [
+    "fg",
+    "fga",
+    "fg3",
+    "fg3a",
+    "fg2",
+    "fg2a",
+    "ft",
+    "fta",
+    "orb",
+    "drb",
+    "trb",
+    "ast",
+    "stl",
+    "blk",
+    "tov",
+    "pf",
+]
+
+BOX_SCORE_RATES = [
+    "fg_pct",
+    "fg3_pct",
+    "fg2_pct",
+    "efg_pct",
+    "ft_pct",
+]
+
+GAMELOG_INT_COLUMNS = (
+    ["season", "ranker", "team_game_num_season", "team_game_score", "opp_team_game_score"]
+    + BOX_SCORE_COUNTS
+    + [f"opp_{col}" for col in BOX_SCORE_COUNTS]
+)
+
+GAMELOG_FLOAT_COLUMNS = BOX_SCORE_RATES + [f"opp_{col}" for col in BOX_SCORE_RATES]
+
+GAMELOG_DATE_COLUMNS = ["date"]
+
+GAMELOG_CATEGORY_COLUMNS = [
+    "school_name",
+    "school_slug",
+    "opp_name_abbr",
+    "game_location",
+    "game_type",
+    "team_game_result",
+    "overtimes",
+]
+
+# pandas dtype each scraped column is stored as.
+GAMELOG_DTYPES = {
+    **{col: "Int16" for col in GAMELOG_INT_COLUMNS},
+    **{col: "float32" for col in GAMELOG_FLOAT_COLUMNS},
+    **{col: "datetime64[ns]" for col in GAMELOG_DATE_COLUMNS},
+    **{col: "category" for col in GAMELOG_CATEGORY_COLUMNS},
+}
+
+# Hash identifiers (utils.assign_game_ids) keep their full int64 width.
+ID_COLUMNS = ["game_id"]
+
+# Derived float columns (ratings, rolling averages, comps) are kept at this width.
+FEATURE_FLOAT_DTYPE = "float32"
+
+# Text columns with at most this share of distinct values become categoricals.
+CATEGORY_MAX_UNIQUE_RATIO = 0.5
+
+
+def _to_category(series: pd.Series) -> pd.Series:
+    values = series.astype(object)
+    return values.where(values.notna(), None).astype("category")
+
+
+def compact_frame(df: pd.DataFrame) -> pd.DataFrame:
+    """Apply the compact schema to any gamelog, feature or prediction frame.
+
+    Scraped columns get ``GAMELOG_DTYPES`` where the values allow it; other
+    float64 columns drop to float32, int64 columns (except ``ID_COLUMNS``) to
+    the smallest int that holds them, and repetitive text columns become
+    categoricals. Columns are replaced in place on a shallow copy, so peak
+    memory stays near one frame.
+    """
+    df = df.copy(deep=False)
+    for column in df.columns:
+        series = df[column]
+        dtype = series.dtype
+        target = GAMELOG_DTYPES.get(column)
+        if target == "category" or (
+            target is None
+            and (pd.api.types.is_object_dtype(dtype) or pd.api.types.is_string_dtype(dtype))
+            and not isinstance(dtype, pd.CategoricalDtype)
+        ):
+            if isinstance(dtype, pd.CategoricalDtype):
+                continue
+            if target is None and series.nunique() > CATEGORY_MAX_UNIQUE_RATIO * max(len(series), 1):
+                continue
+            df[column] = _to_category(series)
+        elif target is not None and not str(target).startswith("datetime"):
+            if str(dtype) == target:
+                continue
+            numeric = pd.to_numeric(series, errors="coerce")
+            if target.startswith("Int"):
+                if (numeric.dropna() % 1 != 0).any():
+                    df[column] = numeric.astype(FEATURE_FLOAT_DTYPE)
+                    continue
+                numeric = numeric.round()
+            df[column] = numeric.astype(target)
+        elif dtype == np.float64 or str(dtype) == "Float64":
+            df[column] = series.to_numpy(dtype=FEATURE_FLOAT_DTYPE, na_value=np.nan)
+        elif dtype == np.int64 and column not in ID_COLUMNS:
+            df[column] = pd.to_numeric(series, downcast="integer")
+    return df
+
+
+def memory_usage_mb(df: pd.DataFrame) -> float:
+    return df.memory_usage(deep=True).sum() / 1e6
+
+
+def widen_frame(df: pd.DataFrame) -> pd.DataFrame:
+    """The frame with pandas' default dtypes (float64/int64/object), for comparison."""
+    df = df.copy(deep=False)
+    for column in df.columns:
+        dtype = df[column].dtype
+        if isinstance(dtype, pd.CategoricalDtype):
+            df[column] = df[column].astype(object)
+        elif pd.api.types.is_bool_dtype(dtype) or pd.api.types.is_datetime64_any_dtype(dtype):
+            continue
+        elif pd.api.types.is_integer_dtype(dtype) and not df[column].hasnans:
+            df[column] = df[column].astype(np.int64)
+        elif pd.api.types.is_numeric_dtype(dtype):
+            df[column] = df[column].to_numpy(dtype=np.float64, na_value=np.nan)
+    return df
+
+
+def memory_report(df: pd.DataFrame, label: str = "frame") -> pd.DataFrame:
+    """Print and return deep memory use per column kind, default dtypes vs compact."""
+    before_df, after_df = widen_frame(df), compact_frame(df)
+
+    def by_kind(frame):
+        usage = frame.memory_usage(deep=True, index=False)
+        return usage.groupby(frame.dtypes.astype(str)).sum() / 1e6
+
+    report = pd.DataFrame(
+        {"default_mb": by_kind(before_df), "compact_mb": by_kind(after_df)}
+    ).fillna(0.0)
+    before, after = memory_usage_mb(before_df), memory_usage_mb(after_df)
+    ratio = after / before if before else 1.0
+    print(
+        f"{label}: {len(df)} rows x {df.shape[1]} cols, "
+        f"{before:.1f} MB -> {after:.1f} MB ({ratio:.0%})"
+    )
+    return report
@@ -0,0 +1,73 @@
+"""Append-only journal of per-team scrape results for resumable runs."""
+
+from __future__ import annotations
+
+import json
+import os
+import threading
+from pathlib import Path
+
+
+class ScrapeJournal:
+    """JSON Lines file with one ``{"slug": ..., "rows": [...]}`` entry per team.
+
+    Each entry is flushed and fsynced as soon as a team finishes, so a crash
+    loses at most the team in flight. A torn final line is ignored on read
+    and cut off before the first new entry is appended.
+    """
+
+    def __init__(self, path: str | Path):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self._checked_tail = False
+
+    def _truncate_torn_tail(self) -> None:
+        """Cut the file back to its last newline so appends start on a fresh line."""
+        if not self.path.exists():
+            return
+        with self.path.open("r+b") as handle:
+            end = handle.seek(0, os.SEEK_END)
+            position = end
+            while position > 0:
+                start = max(position - 65536, 0)
+                handle.seek(start)
+                newline = handle.read(position - start).rfind(b"\n")
+                if newline >= 0:
+                    position = start + newline + 1
+                    break
+                position = start
+            if position < end:
+                handle.truncate(position)
+                handle.flush()
+                os.fsync(handle.fileno())
+
+    def reset(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.path.write_text("", encoding="utf-8")
+        self._checked_tail = True
+
+    def record(self, slug: str, rows: list[dict]) -> None:
+        line = json.dumps({"slug": slug, "rows": rows}, default=str)
+        with self._lock:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            if not self._checked_tail:
+                self._truncate_torn_tail()
+                self._checked_tail = True
+            with self.path.open("a", encoding="utf-8") as handle:
+                handle.write(line + "\n")
+                handle.flush()
+                os.fsync(handle.fileno())
+
+    def completed(self) -> dict[str, list[dict]]:
+        """Rows per completed slug (the latest entry wins)."""
+        done: dict[str, list[dict]] = {}
+        if not self.path.exists():
+            return done
+        with self.path.open(encoding="utf-8") as handle:
+            for line in handle:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue
+                done[entry["slug"]] = entry["rows"]
+        return done
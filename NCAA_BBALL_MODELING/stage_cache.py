@@ -0,0 +1,199 @@
+"""On-disk cache of feature pipeline stage outputs, keyed by content hash.
+
+Layout under ``<base_dir>/data/stage_cache``::
+
+    clean/season=2024/<key>.parquet
+    possessions/season=2024/<key>.parquet
+    ...
+    log.jsonl                                # one line per stage lookup
+
+A stage's key hashes its name, the source of the modules that compute it,
+its parameters and its upstream key, so a key chain starting from the raw
+season frame identifies every output. Frozen seasons hit on every run; a
+season whose gamelogs or stage code changed misses from that stage on. Only
+the newest entry per stage and season is kept.
+
+    python -m NCAA_BBALL_MODELING.stage_cache clear [--stage S] [--season N]
+    python -m NCAA_BBALL_MODELING.stage_cache log
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import inspect
+import json
+import os
+import shutil
+import time
+import uuid
+from pathlib import Path
+from typing import Callable, Iterable, Optional
+
+import pandas as pd
+
+
+CACHE_DIRNAME = "stage_cache"
+LOG_FILENAME = "log.jsonl"
+
+
+def _resolve_base_dir(base_dir=None) -> Path:
+    if base_dir is not None:
+        return Path(base_dir)
+    return Path(__file__).resolve().parent
+
+
+def cache_dir(base_dir=None) -> Path:
+    return _resolve_base_dir(base_dir) / "data" / CACHE_DIRNAME
+
+
+def frame_key(df: pd.DataFrame) -> str:
+    """Hash of a frame's columns, dtypes and values (row order included)."""
+    digest = hashlib.sha256()
+    digest.update(json.dumps([[str(c), str(t)] for c, t in df.dtypes.items()]).encode())
+    digest.update(pd.util.hash_pandas_object(df, index=False).to_numpy().tobytes())
+    return digest.hexdigest()
+
+
+def code_key(sources: Iterable) -> str:
+    """Hash of the source of ``sources`` (modules, or single functions and classes).
+
+    Editing any of them changes the key. Pass whole modules where a stage's
+    behaviour also rests on module constants, regexes or dtype tables.
+    """
+    digest = hashlib.sha256()
+    for source in sources:
+        digest.update(inspect.getsource(source).encode())
+    return digest.hexdigest()
+
+
+def stage_key(stage: str, upstream: str, code: str, params=None) -> str:
+    payload = json.dumps([stage, upstream, code, params], sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def _entry_dir(stage: str, season: int, base_dir=None) -> Path:
+    return cache_dir(base_dir) / stage / f"season={int(season)}"
+
+
+def _log(record: dict, base_dir=None) -> None:
+    path = cache_dir(base_dir) / LOG_FILENAME
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with path.open("a", encoding="utf-8") as handle:
+        handle.write(json.dumps(record) + "\n")
+
+
+class StageCache:
+    """Runs pipeline stages per season, reusing outputs whose key is unchanged.
+
+    ``hits`` and ``misses`` collect ``(stage, season)`` pairs for the run; each
+    lookup is also printed and appended to ``log.jsonl``.
+    """
+
+    def __init__(self, base_dir=None, enabled: bool = True):
+        self.base_dir = base_dir
+        self.enabled = enabled
+        self.hits: list[tuple[str, int]] = []
+        self.misses: list[tuple[str, int]] = []
+
+    def run(
+        self,
+        stage: str,
+        season: int,
+        upstream: str,
+        compute: Callable[[], pd.DataFrame],
+        *,
+        code: Iterable,
+        params=None,
+    ) -> tuple[pd.DataFrame, str]:
+        """Load or compute one stage for one season; returns (frame, key)."""
+        key = stage_key(stage, upstream, code_key(code), params)
+        path = _entry_dir(stage, season, self.base_dir) / f"{key}.parquet"
+        start = time.perf_counter()
+        if self.enabled and path.exists():
+            df, status = pd.read_parquet(path), "hit"
+            self.hits.append((stage, season))
+        else:
+            df, status = compute(), "miss"
+            self.misses.append((stage, season))
+            if self.enabled:
+                self._store(df, path)
+        seconds = time.perf_counter() - start
+        print(f"[stage cache] {stage:<12} {season}: {status} ({seconds:.2f}s)")
+        if self.enabled:
+            _log(
+                {
+                    "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                    "stage": stage,
+                    "season": int(season),
+                    "key": key,
+                    "status": status,
+                    "seconds": round(seconds, 3),
+                },
+                self.base_dir,
+            )
+        return df, key
+
+    @staticmethod
+    def _store(df: pd.DataFrame, path: Path) -> None:
+        """Write the entry atomically and drop older entries for the stage/season."""
+        path.parent.mkdir(parents=True, exist_ok=True)
+        scratch = path.with_name(f".{path.name}.{uuid.uuid4().hex}")
+        try:
+            df.to_parquet(scratch, index=False)
+            os.replace(scratch, path)
+        finally:
+            if scratch.exists():
+                scratch.unlink()
+        for stale in path.parent.glob("*.parquet"):
+            if stale != path:
+                stale.unlink()
+
+
+def invalidate(
+    stage: Optional[str] = None, season: Optional[int] = None, *, base_dir=None
+) -> list[Path]:
+    """Delete cached entries for a stage and/or season (everything by default)."""
+    root = cache_dir(base_dir)
+    stages = [root / stage] if stage else [p for p in root.glob("*") if p.is_dir()]
+    removed = []
+    for stage_path in stages:
+        targets = [stage_path / f"season={int(season)}"] if season is not None else [stage_path]
+        for target in targets:
+            if target.exists():
+                shutil.rmtree(target)
+                removed.append(target)
+    return removed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Manage the feature stage cache.")
+    parser.add_argument("--base-dir", help="Project directory holding data/ (default: this package).")
+    commands = parser.add_subparsers(dest="command", required=True)
+    clear = commands.add_parser("clear", help="Invalidate cached stage outputs.")
+    clear.add_argument(
+        "--stage",
+        help="Only this stage (clean, possessions, features, ratings, schedule, opponent).",
+    )
+    clear.add_argument("--season", type=int, help="Only this season.")
+    commands.add_parser("log", help="Print the most recent cache lookups.")
+    args = parser.parse_args()
+
+    if args.command == "clear":
+        removed = invalidate(args.stage, args.season, base_dir=args.base_dir)
+        print(f"Removed {len(removed)} cache entries")
+        for path in removed:
+            print(f"  {path}")
+    else:
+        path = cache_dir(args.base_dir) / LOG_FILENAME
+        lines = path.read_text(encoding="utf-8").splitlines() if path.exists() else []
+        for line in lines[-20:]:
+            entry = json.loads(line)
+            print(
+                f"{entry['time']}  {entry['stage']:<12} {entry['season']}  "
+                f"{entry['status']:<4} {entry['seconds']:.2f}s"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,285 @@
+"""Parquet gamelog store partitioned by season (and optionally by team).
+
+Layout under ``<base_dir>/data/gamelogs``::
+
+    season=2026/part-0.parquet                      # one file per season
+    season=2026/school_slug=duke/part-0.parquet     # or one file per team
+
+Partition values are also kept as columns inside the files, so each file
+reads back on its own. Seasons that were never imported are loaded from the
+legacy CSV/xlsx files on first use.
+"""
+
+from __future__ import annotations
+
+import os
+import shutil
+import uuid
+from pathlib import Path
+from typing import Iterable, Optional
+
+import pandas as pd
+
+try:
+    from .schema import GAMELOG_DTYPES
+except ImportError:
+    from schema import GAMELOG_DTYPES
+
+
+STORE_DIRNAME = "gamelogs"
+
+# One row per team-game; upserts match on these columns.
+GAMELOG_KEY = ["season", "school_slug", "date", "team_game_num_season"]
+
+# Where each season lived before the Parquet store.
+LEGACY_GAMELOG_FILES = {
+    2023: "2023/gamelogs_2023.csv",
+    2024: "2024/gamelogs_2024.csv",
+    2025: "2025/gamelogs_2025.csv",
+    2026: "2026/NCAAB_2026_Team_Gamelogs_now.xlsx",
+}
+
+
+def _resolve_base_dir(base_dir=None) -> Path:
+    if base_dir is not None:
+        return Path(base_dir)
+    return Path(__file__).resolve().parent
+
+
+def store_dir(base_dir=None) -> Path:
+    return _resolve_base_dir(base_dir) / "data" / STORE_DIRNAME
+
+
+def season_dir(season: int, base_dir=None) -> Path:
+    return store_dir(base_dir) / f"season={int(season)}"
+
+
+def stored_seasons(base_dir=None) -> list[int]:
+    root = store_dir(base_dir)
+    if not root.exists():
+        return []
+    return sorted(
+        int(path.name.split("=", 1)[1])
+        for path in root.glob("season=*")
+        if any(path.rglob("*.parquet"))
+    )
+
+
+def coerce_gamelogs(df: pd.DataFrame) -> pd.DataFrame:
+    """Cast known gamelog columns to the schema dtypes; others are left alone."""
+    df = df.copy()
+    for column, dtype in GAMELOG_DTYPES.items():
+        if column not in df.columns or df[column].dtype == dtype:
+            continue
+        series = df[column]
+        if dtype.startswith("datetime"):
+            df[column] = pd.to_datetime(series, errors="coerce").astype(dtype)
+        elif dtype == "category":
+            series = series.astype("string").astype(object)
+            df[column] = series.where(series.notna() & (series != ""), None).astype(dtype)
+        elif dtype.startswith("Int"):
+            numeric = pd.to_numeric(series, errors="coerce")
+            df[column] = numeric.round().astype(dtype)
+        else:
+            df[column] = pd.to_numeric(series, errors="coerce").astype(dtype)
+    return df
+
+
+def read_legacy_gamelogs(path: str | Path) -> pd.DataFrame:
+    path = Path(path)
+    if path.suffix in (".xlsx", ".xls"):
+        return pd.read_excel(path, index_col=False)
+    return pd.read_csv(path, index_col=False)
+
+
+def _write_partition(df: pd.DataFrame, target: Path, partition_by_team: bool) -> None:
+    """Write one season into a scratch directory, then swap it into place."""
+    scratch = target.with_name(f".{target.name}.{uuid.uuid4().hex}")
+    scratch.mkdir(parents=True)
+    try:
+        if partition_by_team:
+            for slug, team_df in df.groupby("school_slug", observed=True, sort=False):
+                team_dir = scratch / f"school_slug={slug}"
+                team_dir.mkdir()
+                team_df.to_parquet(team_dir / "part-0.parquet", index=False)
+        else:
+            df.to_parquet(scratch / "part-0.parquet", index=False)
+
+        if target.exists():
+            retired = target.with_name(f".{target.name}.old.{uuid.uuid4().hex}")
+            target.rename(retired)
+            scratch.rename(target)
+            shutil.rmtree(retired, ignore_errors=True)
+        else:
+            scratch.rename(target)
+    finally:
+        if scratch.exists():
+            shutil.rmtree(scratch, ignore_errors=True)
+
+
+def _team_file(season: int, slug: str, base_dir=None) -> Path:
+    return season_dir(season, base_dir) / f"school_slug={slug}" / "part-0.parquet"
+
+
+def _write_file(df: pd.DataFrame, path: Path) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    scratch = path.with_name(f".{path.name}.{uuid.uuid4().hex}")
+    try:
+        df.to_parquet(scratch, index=False)
+        os.replace(scratch, path)
+    finally:
+        if scratch.exists():
+            scratch.unlink()
+
+
+def _ensure_team_partitions(season: int, base_dir=None) -> None:
+    """Split a single-file season into per-team files so upserts stay local."""
+    directory = season_dir(season, base_dir)
+    if not (directory / "part-0.parquet").exists():
+        return
+    df = pd.read_parquet(directory / "part-0.parquet")
+    _write_partition(df, directory, partition_by_team=True)
+
+
+def write_gamelogs(
+    df: pd.DataFrame,
+    *,
+    base_dir=None,
+    partition_by_team: bool = False,
+    xlsx_path: Optional[str | Path] = None,
+) -> list[int]:
+    """Replace the stored partition of every season present in ``df``.
+
+    ``xlsx_path`` additionally exports the same rows to Excel as a side output.
+    Returns the seasons written.
+    """
+    df = coerce_gamelogs(df)
+    seasons = sorted(int(season) for season in df["season"].dropna().unique())
+    for season in seasons:
+        season_df = df[df["season"] == season].reset_index(drop=True)
+        _write_partition(season_df, season_dir(season, base_dir), partition_by_team)
+        print(f"Stored {len(season_df)} rows: {season_dir(season, base_dir)}")
+    if xlsx_path is not None:
+        export_xlsx(df, xlsx_path)
+    return seasons
+
+
+def import_legacy_season(season: int, base_dir=None, path=None) -> bool:
+    """Load a season's legacy CSV/xlsx into the store; False if there is none."""
+    if path is None:
+        relative = LEGACY_GAMELOG_FILES.get(int(season))
+        if relative is None:
+            return False
+        path = _resolve_base_dir(base_dir) / "data" / relative
+    path = Path(path)
+    if not path.exists():
+        return False
+    df = read_legacy_gamelogs(path)
+    if "season" not in df.columns:
+        df["season"] = season
+    df = df[pd.to_numeric(df["season"], errors="coerce") == season]
+    print(f"Importing {path} into the gamelog store")
+    write_gamelogs(df, base_dir=base_dir)
+    return True
+
+
+def read_gamelogs(
+    seasons: Optional[Iterable[int]] = None,
+    *,
+    columns: Optional[list[str]] = None,
+    base_dir=None,
+    import_legacy: bool = True,
+) -> pd.DataFrame:
+    """Read stored seasons (all of them by default) into one frame.
+
+    Seasons missing from the store are imported from their legacy files first
+    unless ``import_legacy`` is False.
+    """
+    if seasons is None:
+        seasons = stored_seasons(base_dir)
+        if import_legacy:
+            seasons = sorted(set(seasons) | set(LEGACY_GAMELOG_FILES))
+    frames = []
+    for season in seasons:
+        directory = season_dir(season, base_dir)
+        files = sorted(directory.rglob("*.parquet")) if directory.exists() else []
+        if not files and import_legacy and import_legacy_season(season, base_dir):
+            files = sorted(directory.rglob("*.parquet"))
+        for file in files:
+            frames.append(pd.read_parquet(file, columns=columns))
+
+    if not frames:
+        return coerce_gamelogs(pd.DataFrame(columns=columns or list(GAMELOG_DTYPES)))
+    frames = [frame for frame in frames if not frame.empty] or frames[:1]
+    # Categories differ between files, so re-apply the schema after concat.
+    return coerce_gamelogs(pd.concat(frames, ignore_index=True))
+
+
+def _row_hashes(df: pd.DataFrame, columns: list[str]) -> pd.Series:
+    keyed = df.reindex(columns=columns).set_index(GAMELOG_KEY, drop=False)
+    return pd.util.hash_pandas_object(keyed, index=False)
+
+
+def upsert_gamelogs(
+    rows: pd.DataFrame,
+    season: int,
+    *,
+    replace: Optional[dict] = None,
+    base_dir=None,
+) -> set[tuple]:
+    """Insert or update ``rows`` for one season, rewriting only touched teams.
+
+    Rows match stored rows on ``GAMELOG_KEY``. ``replace`` maps a school slug
+    to a start date (or None for the whole season); stored rows for that team
+    from that date on are dropped unless ``rows`` brings them back. Returns the
+    keys that were inserted, changed or removed.
+    """
+    replace = dict(replace or {})
+    rows = coerce_gamelogs(rows)
+    if not rows.empty:
+        rows = rows[rows["season"] == season]
+    if not season_dir(season, base_dir).exists():
+        import_legacy_season(season, base_dir)
+    _ensure_team_partitions(season, base_dir)
+
+    slugs = set(replace) | set(rows["school_slug"].dropna().astype(str))
+    changed: set[tuple] = set()
+    for slug in sorted(slugs):
+        path = _team_file(season, slug, base_dir)
+        old = coerce_gamelogs(pd.read_parquet(path)) if path.exists() else rows.iloc[0:0]
+        new = rows[rows["school_slug"].astype(str) == slug]
+
+        keep = pd.Series(True, index=old.index)
+        if slug in replace:
+            start = replace[slug]
+            keep &= (old["date"] < pd.Timestamp(start)) if start is not None else False
+        new_keys = pd.MultiIndex.from_frame(new[GAMELOG_KEY])
+        keep &= ~pd.MultiIndex.from_frame(old[GAMELOG_KEY]).isin(new_keys)
+        merged = pd.concat([old[keep], new], ignore_index=True)
+        merged = merged.drop_duplicates(GAMELOG_KEY, keep="last")
+        merged = coerce_gamelogs(
+            merged.sort_values(["date", "team_game_num_season"]).reset_index(drop=True)
+        )
+
+        columns = list(dict.fromkeys(list(old.columns) + list(merged.columns)))
+        before = dict(zip(pd.MultiIndex.from_frame(old[GAMELOG_KEY]), _row_hashes(old, columns)))
+        after = dict(zip(pd.MultiIndex.from_frame(merged[GAMELOG_KEY]), _row_hashes(merged, columns)))
+        team_changed = {key for key in before.keys() | after.keys() if before.get(key) != after.get(key)}
+        if not team_changed:
+            continue
+        changed |= team_changed
+        if merged.empty:
+            shutil.rmtree(path.parent, ignore_errors=True)
+        else:
+            _write_file(merged, path)
+
+    print(f"Upserted {season}: {len(changed)} rows changed across {len(slugs)} teams")
+    return changed
+
+
+def export_xlsx(df: pd.DataFrame, path: str | Path) -> Path:
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    df.to_excel(path, index=False)
+    print(f"Saved: {path}")
+    return path
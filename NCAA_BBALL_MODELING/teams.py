@@ -0,0 +1,194 @@
+"""Canonical team identity: every spelling of a school resolves to one integer ``team_id``.
+
+Sports-Reference names schools one way in its school list and gamelogs
+(with an ``NCAA`` suffix for tournament teams), another way in the
+opponent column, and KenPom has its own spellings. ``TeamRegistry`` maps
+each alias to the canonical school name and that name to a ``team_id``;
+``clean_gamelogs`` resolves the names of every row once, and the feature
+joins, pair keys and KenPom merges downstream compare the integers.
+
+Ids are numbered like ``pipelines.kenpom.build_team_ids`` (schools sorted
+by name, from 1) and saved to ``<base_dir>/data/team_ids.csv``. Schools
+seen later are appended with the next ids, so an id never changes once
+issued.
+"""
+
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Iterable, Optional
+
+import numpy as np
+import pandas as pd
+
+
+TEAM_IDS_FILENAME = "team_ids.csv"
+
+# Integer team columns ``clean_gamelogs`` adds next to the names.
+TEAM_ID_COLUMNS = ["team_id", "opp_team_id"]
+
+# Id of a name no school in the registry answers to.
+UNKNOWN_TEAM = -1
+
+# Sports-Reference opponent names that differ from the school list.
+RENAME_MAP = {
+    "Texas A&M–Commerce": "East Texas A&M",
+    "Texas–Rio Grande Valley": "Texas-Rio Grande Valley",
+    "Sam Houston State": "Sam Houston",
+    "USC Upstate": "South Carolina Upstate",
+    "Arkansas–Pine Bluff": "Arkansas-Pine Bluff",
+    "UNLV": "Nevada-Las Vegas",
+    "Prairie View A&M": "Prairie View",
+    "Grambling State": "Grambling",
+    "LIU": "Long Island University",
+    "Loyola Chicago": "Loyola (IL)",
+    "UMBC": "Maryland-Baltimore County",
+    "UMass Lowell": "Massachusetts-Lowell",
+    "Ole Miss": "Mississippi",
+    "Texas A&M–Corpus Christi": "Texas A&M-Corpus Christi",
+    "Louisiana–Monroe": "Louisiana-Monroe",
+    "UT Martin": "Tennessee-Martin",
+    "Illinois–Chicago": "Illinois-Chicago",
+    "St. Mary's (CA)": "Saint Mary's (CA)",
+    "Fairleigh Dickinson": "FDU",
+    "Maryland Eastern Shore": "Maryland-Eastern Shore",
+    "IUPUI": "IU Indy",
+    "SMU": "Southern Methodist",
+    "VCU": "Virginia Commonwealth",
+}
+
+
+def _distinct(values) -> tuple[np.ndarray, pd.Index]:
+    """(codes, distinct values) with -1 for missing; categoricals reuse their codes."""
+    codes, uniques = pd.factorize(pd.Series(values, copy=False))
+    return codes, pd.Index(uniques, dtype=object)
+
+
+class TeamRegistry:
+    """``team_id`` of every canonical school name, and the aliases that point at them.
+
+    ``teams`` maps canonical names to ids. ``aliases`` maps other spellings
+    to canonical names and defaults to ``RENAME_MAP``.
+    """
+
+    def __init__(self, teams: dict[str, int], aliases: Optional[dict[str, str]] = None):
+        self.teams = dict(teams)
+        self.aliases = dict(RENAME_MAP if aliases is None else aliases)
+
+    @classmethod
+    def from_frame(cls, frame: pd.DataFrame, aliases: Optional[dict[str, str]] = None):
+        """A registry from a ``team_id``/``school_name`` table such as ``build_team_ids``."""
+        registry = cls({}, aliases)
+        names = [registry.canonical(name) for name in frame["school_name"]]
+        registry.teams = dict(zip(names, frame["team_id"].astype(int).tolist()))
+        return registry
+
+    @classmethod
+    def from_names(cls, names: Iterable, aliases: Optional[dict[str, str]] = None):
+        """Ids 1..n for ``names`` in sorted order, as ``build_team_ids`` numbers them."""
+        return cls({}, aliases).with_names(names)
+
+    def canonical(self, name) -> str:
+        """The school name ``name`` stands for: ``NCAA`` suffix stripped, alias applied."""
+        name = str(name).strip()
+        if name.endswith("NCAA"):
+            name = name[:-4]
+        return self.aliases.get(name, name)
+
+    def with_names(self, names: Iterable) -> "TeamRegistry":
+        """This registry plus any new canonical names in ``names``, at the next ids."""
+        new = {self.canonical(name) for name in names if pd.notna(name)} - set(self.teams)
+        if not new:
+            return self
+        start = max(self.teams.values(), default=0) + 1
+        teams = {**self.teams, **{name: start + i for i, name in enumerate(sorted(new))}}
+        return TeamRegistry(teams, self.aliases)
+
+    def with_aliases(self, aliases: dict[str, str]) -> "TeamRegistry":
+        """This registry with more aliases, e.g. a KenPom name map."""
+        extra = {str(alias).strip(): self.canonical(name) for alias, name in aliases.items()}
+        return TeamRegistry(self.teams, {**self.aliases, **extra})
+
+    def canonical_names(self, values) -> np.ndarray:
+        """``canonical`` of every value (None where missing), one lookup per distinct value."""
+        codes, uniques = _distinct(values)
+        names = np.array([self.canonical(name) for name in uniques] + [None], dtype=object)
+        return names[codes]
+
+    def ids(self, values) -> np.ndarray:
+        """``team_id`` of every value, ``UNKNOWN_TEAM`` where missing or unknown.
+
+        Each distinct name is resolved once and the rows gather the result,
+        so a categorical column costs one lookup per category.
+        """
+        codes, uniques = _distinct(values)
+        lookup = np.array(
+            [self.teams.get(self.canonical(name), UNKNOWN_TEAM) for name in uniques]
+            + [UNKNOWN_TEAM],
+            dtype=np.int32,
+        )
+        return lookup[codes]
+
+    def names(self, ids) -> np.ndarray:
+        """Canonical school name of every id (None for unknown ids)."""
+        by_id = {team_id: name for name, team_id in self.teams.items()}
+        ids = np.asarray(ids)
+        distinct, inverse = np.unique(ids, return_inverse=True)
+        names = np.array([by_id.get(int(team_id)) for team_id in distinct], dtype=object)
+        return names[inverse.reshape(ids.shape)]
+
+    def to_frame(self) -> pd.DataFrame:
+        frame = pd.DataFrame({"team_id": list(self.teams.values()), "school_name": list(self.teams)})
+        return frame.sort_values("team_id").reset_index(drop=True)
+
+
+def dense_codes(team, opp) -> tuple[np.ndarray, np.ndarray, int]:
+    """Team ids renumbered 0..n-1 over the ids in ``team`` and ``opp``.
+
+    Unknown ids (negative) stay -1. Returns (team codes, opp codes, n).
+    """
+    team = np.asarray(team, dtype=np.int64)
+    opp = np.asarray(opp, dtype=np.int64)
+    known = np.unique(np.concatenate([team, opp]))
+    known = known[known >= 0]
+    team_code = np.where(team >= 0, np.searchsorted(known, team), -1)
+    opp_code = np.where(opp >= 0, np.searchsorted(known, opp), -1)
+    return team_code, opp_code, len(known)
+
+
+def team_ids_path(base_dir=None) -> Path:
+    if base_dir is None:
+        try:
+            from NCAA_BBALL_MODELING.utils import _resolve_base_dir
+        except ImportError:
+            from utils import _resolve_base_dir
+        base_dir = _resolve_base_dir()
+    return Path(base_dir) / "data" / TEAM_IDS_FILENAME
+
+
+def save_team_registry(registry: TeamRegistry, base_dir=None) -> Path:
+    """Write ``registry``; extra columns of the saved file (``school_slug``) are kept."""
+    path = team_ids_path(base_dir)
+    frame = registry.to_frame()
+    if path.exists():
+        saved = pd.read_csv(path).drop(columns=["school_name"])
+        frame = frame.merge(saved.drop_duplicates("team_id"), on="team_id", how="left")
+    path.parent.mkdir(parents=True, exist_ok=True)
+    frame.to_csv(path, index=False)
+    return path
+
+
+def load_team_registry(names: Iterable = (), base_dir=None) -> TeamRegistry:
+    """The saved registry extended with ``names``; saved again when any were new.
+
+    Without a saved registry the ids start from ``names``, sorted.
+    """
+    path = team_ids_path(base_dir)
+    if path.exists():
+        registry = TeamRegistry.from_frame(pd.read_csv(path))
+    else:
+        registry = TeamRegistry({})
+    extended = registry.with_names(names)
+    if extended is not registry:
+        save_team_registry(extended, base_dir)
+    return extended
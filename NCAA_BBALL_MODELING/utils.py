@@ -1,38 +1,50 @@
+import re
+import sys
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+
 import numpy as np
 import pandas as pd
 from pathlib import Path
-from time import sleep
 
 try:
-    from .gamelog_scraping import scrape_team_gamelog
+    from .gamelog_scraping import DEFAULT_WORKERS, scrape_teams, set_rate_limit
+    from .matrix_cache import build_matrix_cache
+    from .feature_kernels import PriorWindows, group_first_rows, pair_rows, prior_window_stats
+    from .ratings import RATING_COLUMNS, add_adjusted_ratings
+    from .schedule_strength import SOS_COLUMNS, add_schedule_strength
+    from .schema import compact_frame
+    from .stage_cache import StageCache, frame_key
+    from .storage import (
+        export_xlsx,
+        read_gamelogs,
+        read_legacy_gamelogs,
+        upsert_gamelogs,
+        write_gamelogs,
+    )
+    from .teams import RENAME_MAP, TeamRegistry, load_team_registry
+    from .warehouse import store_team_features, sync_games
+    from . import feature_kernels, ratings, schedule_strength, schema, teams
 except ImportError:
-    from gamelog_scraping import scrape_team_gamelog
-
-RENAME_MAP = {
-    "Texas A&M–Commerce": "East Texas A&M",
-    "Texas–Rio Grande Valley": "Texas-Rio Grande Valley",
-    "Sam Houston State": "Sam Houston",
-    "USC Upstate": "South Carolina Upstate",
-    "Arkansas–Pine Bluff": "Arkansas-Pine Bluff",
-    "UNLV": "Nevada-Las Vegas",
-    "Prairie View A&M": "Prairie View",
-    "Grambling State": "Grambling",
-    "LIU": "Long Island University",
-    "Loyola Chicago": "Loyola (IL)",
-    "UMBC": "Maryland-Baltimore County",
-    "UMass Lowell": "Massachusetts-Lowell",
-    "Ole Miss": "Mississippi",
-    "Texas A&M–Corpus Christi": "Texas A&M-Corpus Christi",
-    "Louisiana–Monroe": "Louisiana-Monroe",
-    "UT Martin": "Tennessee-Martin",
-    "Illinois–Chicago": "Illinois-Chicago",
-    "St. Mary's (CA)": "Saint Mary's (CA)",
-    "Fairleigh Dickinson": "FDU",
-    "Maryland Eastern Shore": "Maryland-Eastern Shore",
-    "IUPUI": "IU Indy",
-    "SMU": "Southern Methodist",
-    "VCU": "Virginia Commonwealth",
-}
+    from gamelog_scraping import DEFAULT_WORKERS, scrape_teams, set_rate_limit
+    from matrix_cache import build_matrix_cache
+    from feature_kernels import PriorWindows, group_first_rows, pair_rows, prior_window_stats
+    from ratings import RATING_COLUMNS, add_adjusted_ratings
+    from schedule_strength import SOS_COLUMNS, add_schedule_strength
+    from schema import compact_frame
+    from stage_cache import StageCache, frame_key
+    from storage import (
+        export_xlsx,
+        read_gamelogs,
+        read_legacy_gamelogs,
+        upsert_gamelogs,
+        write_gamelogs,
+    )
+    from teams import RENAME_MAP, TeamRegistry, load_team_registry
+    from warehouse import store_team_features, sync_games
+    import feature_kernels, ratings, schedule_strength, schema, teams
+
+TRAINING_SEASONS = [2023, 2024, 2025, 2026]
 
 
 def clean_names_gamelogs(df, rename_map=RENAME_MAP):
@@ -50,240 +62,357 @@ def clean_school_names(df):
     return df
 
 
-def clean_gamelogs(df, rename_map=RENAME_MAP):
-    df = df.copy()
-    df["school_name"] = df["school_name"].str.replace(r"NCAA$", "", regex=True)
-    df["date"] = pd.to_datetime(df["date"])
-    df["opp_name_abbr"] = df["opp_name_abbr"].replace(rename_map)
+def _map_categories(series, func):
+    """Apply func to each category once; the result stays categorical."""
+    new_codes, uniques = pd.factorize(series.cat.categories.map(func))
+    codes = series.cat.codes.to_numpy()
+    codes = np.where(codes >= 0, new_codes[codes], -1)
+    return pd.Series(
+        pd.Categorical.from_codes(codes, uniques), index=series.index, name=series.name
+    )
+
+
+def _strip_ncaa_suffix(series):
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        return _map_categories(series, lambda name: name[:-4] if name.endswith("NCAA") else name)
+    return series.str.replace(r"NCAA$", "", regex=True)
+
+
+def _rename_teams(series, rename_map):
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        return _map_categories(series, lambda name: rename_map.get(name, name))
+    return series.replace(rename_map)
 
-    valid_schools = set(df["school_name"].unique())
-    df = df[df["opp_name_abbr"].isin(valid_schools)]
-    return df
 
+def clean_gamelogs(df, rename_map=RENAME_MAP, valid_schools=None, registry=None):
+    """Normalize names, resolve team ids and drop games against opponents outside ``valid_schools``.
 
-def add_features(df):
+    ``valid_schools`` defaults to the schools present in ``df``; pass the full
+    season's set when cleaning only a slice of it. ``registry`` (a
+    ``teams.TeamRegistry``) gives the ``team_id`` and ``opp_team_id``
+    columns; it defaults to ids numbered over the valid schools, so pass
+    the saved one (``teams.load_team_registry``) for ids that match other runs.
+    """
     df = df.copy()
+    df["school_name"] = _strip_ncaa_suffix(df["school_name"])
+    if not pd.api.types.is_datetime64_any_dtype(df["date"].dtype):
+        df["date"] = pd.to_datetime(df["date"])
+    df["opp_name_abbr"] = _rename_teams(df["opp_name_abbr"], rename_map)
+
+    if valid_schools is None:
+        valid_schools = set(df["school_name"].unique())
+    if registry is None:
+        registry = TeamRegistry.from_names(
+            set(valid_schools) | set(df["school_name"].dropna().unique())
+        )
+    team_id = registry.ids(df["school_name"])
+    opp_team_id = registry.ids(df["opp_name_abbr"])
+    valid_ids = registry.ids(list(valid_schools))
+    keep = np.isin(opp_team_id, valid_ids[valid_ids >= 0])
+    df = df[keep]
+    df["team_id"] = team_id[keep]
+    df["opp_team_id"] = opp_team_id[keep]
+    df["game_id"] = assign_game_ids(df)
+    return df
 
-    # Basic columns
-    df["game_location"] = df["game_location"].fillna("")
-    df["is_Home"] = df["game_location"].apply(
-        lambda x: 1 if x == "" else (0.5 if x == "N" else 0)
+
+def assign_game_ids(df):
+    """Integer id shared by both team rows of a game.
+
+    Hashes season, date and the unordered pair of team ids, so a game gets
+    the same id in every run and from either side.
+    """
+    team = df["team_id"].to_numpy(dtype=np.int64)
+    opp = df["opp_team_id"].to_numpy(dtype=np.int64)
+    key = pd.DataFrame(
+        {
+            "season": pd.to_numeric(df["season"]).to_numpy(dtype="float64"),
+            "date": df["date"].to_numpy(dtype="datetime64[ns]"),
+            "low": np.minimum(team, opp),
+            "high": np.maximum(team, opp),
+        }
     )
-    df["score_diff"] = df["team_game_score"] - df["opp_team_game_score"]
-    df["win"] = df["team_game_result"].map({"W": 1, "L": 0})
+    hashes = pd.util.hash_pandas_object(key, index=False, categorize=False).to_numpy()
+    return pd.Series(hashes.view(np.int64), index=df.index, name="game_id")
 
-    # Sort + group
-    df = df.sort_values(["season", "school_name", "date"])
-    g = df.groupby(["season", "school_name"])
 
-    # Ratings (per 100 possessions)
-    df["off_rtg"] = 100 * (df["team_game_score"] / df["possessions"])
-    df["def_rtg"] = 100 * (df["opp_team_game_score"] / df["possessions"])
-    df["net_rtg"] = df["off_rtg"] - df["def_rtg"]
+def _fill_text(series, value):
+    """fillna that also works when a categorical lacks ``value`` as a category."""
+    if isinstance(series.dtype, pd.CategoricalDtype) and value not in series.cat.categories:
+        series = series.cat.add_categories([value])
+    return series.fillna(value)
 
-    # Cumulative ratings up to prior game
-    cum_pts = g["team_game_score"].transform(lambda s: s.shift(1).cumsum())
-    cum_opp_pts = g["opp_team_game_score"].transform(lambda s: s.shift(1).cumsum())
-    cum_poss = g["possessions"].transform(lambda s: s.shift(1).cumsum())
 
-    df["cum_off_rtg"] = 100 * (cum_pts / cum_poss)
-    df["cum_def_rtg"] = 100 * (cum_opp_pts / cum_poss)
-    df["cum_net_rtg"] = df["cum_off_rtg"] - df["cum_def_rtg"]
+def _float_values(series):
+    """A nullable Int/Float column as numpy floats with NaN; other columns as they are.
 
-    df["cum_off_rtg"] = df["cum_off_rtg"].fillna(0)
-    df["cum_def_rtg"] = df["cum_def_rtg"].fillna(0)
-    df["cum_net_rtg"] = df["cum_net_rtg"].fillna(0)
+    Columns of up to 16 bits (the compact schema's counts) become float32, which
+    holds them exactly; wider ones become float64.
+    """
+    dtype = series.dtype
+    if pd.api.types.is_extension_array_dtype(dtype) and pd.api.types.is_numeric_dtype(dtype):
+        width = "float32" if dtype.itemsize <= 2 or dtype == "Float32" else "float64"
+        return series.to_numpy(dtype=width, na_value=np.nan)
+    return series.to_numpy()
+
+
+def _nullable_to_float(df):
+    """Turn nullable Int/Float columns into numpy floats with NaN for the feature math."""
+    for col in df.columns:
+        dtype = df[col].dtype
+        if pd.api.types.is_extension_array_dtype(dtype) and pd.api.types.is_numeric_dtype(dtype):
+            df[col] = _float_values(df[col])
+    return df
 
-    # Cumulative ratings home and away
-    is_home = df["is_Home"] == 1
-    is_away = df["is_Home"] == 0
 
-    home_pts = (
-        df.loc[is_home]
-        .groupby(["season", "school_name"])["team_game_score"]
-        .transform(lambda s: s.shift(1).cumsum())
-    )
-    home_opp_pts = (
-        df.loc[is_home]
-        .groupby(["season", "school_name"])["opp_team_game_score"]
-        .transform(lambda s: s.shift(1).cumsum())
-    )
-    home_poss = (
-        df.loc[is_home]
-        .groupby(["season", "school_name"])["possessions"]
-        .transform(lambda s: s.shift(1).cumsum())
-    )
+# Per-game stats averaged over each team's previous 5 and 10 games.
+ROLL_COLS = [
+    "fta",
+    "ast",
+    "trb",
+    "orb",
+    "tov",
+    "team_game_score",
+    "opp_team_game_score",
+    "score_diff",
+    "possessions",
+]
 
-    away_pts = (
-        df.loc[is_away]
-        .groupby(["season", "school_name"])["team_game_score"]
-        .transform(lambda s: s.shift(1).cumsum())
-    )
-    away_opp_pts = (
-        df.loc[is_away]
-        .groupby(["season", "school_name"])["opp_team_game_score"]
-        .transform(lambda s: s.shift(1).cumsum())
-    )
-    away_poss = (
-        df.loc[is_away]
-        .groupby(["season", "school_name"])["possessions"]
-        .transform(lambda s: s.shift(1).cumsum())
-    )
+# Rolling windows (games) and EWMA half-lives add_features emits by default.
+ROLL_WINDOWS = (5, 10)
+EWM_HALFLIVES = ()
 
-    df["home_cum_net_rtg"] = 0.0
-    df["away_cum_net_rtg"] = 0.0
+# Win pct and the opponent comps use this window, so it is always computed.
+BASE_WINDOW = 10
 
-    df.loc[is_home, "home_cum_net_rtg"] = 100 * (home_pts / home_poss) - 100 * (
-        home_opp_pts / home_poss
-    )
-    df.loc[is_away, "away_cum_net_rtg"] = 100 * (away_pts / away_poss) - 100 * (
-        away_opp_pts / away_poss
-    )
+# Per-team rolling columns that get an opp_ copy in add_opponent_features.
+ROLLING_FEATURE = re.compile(r"(efg_pct|avg_\w+)_last_\d+|ewm_\w+_hl_[\d.]+")
 
-    df[["home_cum_net_rtg", "away_cum_net_rtg"]] = df[
-        ["home_cum_net_rtg", "away_cum_net_rtg"]
-    ].fillna(0)
 
-    df["home_road_split"] = df["home_cum_net_rtg"] - df["away_cum_net_rtg"]
+# Location labels for the split ratings, from is_Home (1 home, 0 away, 0.5 neutral).
+HOME, AWAY, NEUTRAL = 0, 1, 2
 
-    # Rolling helper
-    def roll_mean(col, window):
-        return g[col].transform(
-            lambda s: s.shift(1).rolling(window, min_periods=1).mean()
-        )
 
-    # Win pct
-    df["win_pct_last_10"] = roll_mean("win", 10).fillna(0)
+def _location_labels(is_home):
+    return np.select([is_home == 1, is_home == 0], [HOME, AWAY], NEUTRAL)
+
+
+# Feature formulas. add_features, add_opponent_features, the lazy feature
+# registry and the incremental feature state all compute through these.
+
+
+def _fill_zero(values):
+    return np.where(np.isnan(values), 0.0, values)
+
+
+def _home_flags(game_location):
+    """is_Home from game_location: 1 home (blank), 0.5 neutral ("N"), 0 away."""
+    location = _fill_text(game_location, "")
+    return np.where(location == "", 1.0, np.where(location == "N", 0.5, 0.0))
+
+
+def _win_flags(team_game_result):
+    """1 for a win, 0 for a loss, missing for games not played yet."""
+    return team_game_result.map({"W": 1, "L": 0})
+
+
+def _ratings(points, allowed, possessions):
+    """(offensive, defensive, net) rating per 100 possessions."""
+    with np.errstate(invalid="ignore", divide="ignore"):
+        off_rtg = 100 * (points / possessions)
+        def_rtg = 100 * (allowed / possessions)
+    return off_rtg, def_rtg, off_rtg - def_rtg
+
+
+def _cumulative_ratings(totals):
+    """``_ratings`` over each row's earlier games (a ``PriorWindows``); 0 before the first."""
+    return tuple(_fill_zero(values) for values in _ratings(*totals.cumsum().T))
+
+
+def _split_net_ratings(totals, is_home):
+    """(home, away, home - away) net rating over each row's earlier games at its location.
+
+    Every row reads its own location's earlier games from the same sums
+    (neutral sites included); the column of the other location is 0.
+    """
+    location = _location_labels(is_home)
+    _, _, net = _ratings(*totals.cumsum_by(location, 3).T)
+    net = _fill_zero(net)
+    home = np.where(location == HOME, net, 0.0)
+    away = np.where(location == AWAY, net, 0.0)
+    return home, away, home - away
+
+
+def _prior_sums(sums, counts):
+    """Window sums, missing where the window holds no earlier value."""
+    return np.where(counts > 0, sums, np.nan)
+
+
+def _prior_means(sums, counts):
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(counts > 0, sums / counts, np.nan)
 
-    # Weighted eFG%
-    fg_roll_5 = g["fg"].transform(
-        lambda s: s.shift(1).rolling(5, min_periods=1).sum()
-    )
-    fg3_roll_5 = g["fg3"].transform(
-        lambda s: s.shift(1).rolling(5, min_periods=1).sum()
-    )
-    fga_roll_5 = g["fga"].transform(
-        lambda s: s.shift(1).rolling(5, min_periods=1).sum()
-    )
-    df["efg_pct_last_5"] = (fg_roll_5 + 0.5 * fg3_roll_5) / fga_roll_5
 
-    df["efg_pct_last_5"] = df["efg_pct_last_5"].fillna(0)
+def _efg_pct(fg, fg3, fga):
+    """Effective field-goal percentage from made field goals, made threes and attempts."""
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return (fg + 0.5 * fg3) / fga
 
-    fg_roll_10 = g["fg"].transform(
-        lambda s: s.shift(1).rolling(10, min_periods=1).sum()
+
+def _rest_days(dates, first):
+    """(previous game date, days since it) per row of a team-sorted frame; 7 before the first."""
+    previous = dates.shift(1).where(first != np.arange(len(dates)))
+    return previous, (dates - previous).dt.days.fillna(7)
+
+
+def _opponent_rows(game_id, team_id):
+    """Each row's opponent row and whether it has one.
+
+    The opponent is the other row with its game_id. The id covers the team
+    pair, so a mirror from the same school is a duplicated row, not an
+    opponent; rows whose opponent's side is missing have none.
+    """
+    mirror = pair_rows(game_id)
+    matched = mirror >= 0
+    matched[matched] = team_id[mirror[matched]] != team_id[matched]
+    return mirror, matched
+
+
+def _home_interaction(net_rtg_comp, is_home):
+    return net_rtg_comp * is_home
+
+
+# Team-minus-opponent columns add_opponent_features adds, and the column each
+# compares; the feature registry resolves other windows by the same names.
+COMP_FEATURES = {
+    f"avg_score_comp_last_{BASE_WINDOW}": f"avg_team_game_score_last_{BASE_WINDOW}",
+    f"efg_comp_last_{BASE_WINDOW}": f"efg_pct_last_{BASE_WINDOW}",
+    f"avg_tov_comp_last_{BASE_WINDOW}": f"avg_tov_last_{BASE_WINDOW}",
+    f"avg_orb_comp_last_{BASE_WINDOW}": f"avg_orb_last_{BASE_WINDOW}",
+    f"avg_fta_comp_last_{BASE_WINDOW}": f"avg_fta_last_{BASE_WINDOW}",
+    "rest_days_comp": "rest_days",
+    "net_rtg_comp": "cum_net_rtg",
+    "sos_net_rtg_comp": "sos_net_rtg",
+    "home_road_split_comp": "home_road_split",
+    "pace_mismatch_signed": f"avg_possessions_last_{BASE_WINDOW}",
+    "adj_net_rtg_comp": "adj_net_rtg",
+}
+
+
+def add_game_columns(df):
+    """Per-game columns that need no earlier games: location, margin, result, ratings."""
+    # Basic columns
+    df["game_location"] = _fill_text(df["game_location"], "")
+    df["is_Home"] = _home_flags(df["game_location"])
+    df["score_diff"] = df["team_game_score"] - df["opp_team_game_score"]
+    df["win"] = _win_flags(df["team_game_result"])
+
+    # Ratings (per 100 possessions)
+    df["off_rtg"], df["def_rtg"], df["net_rtg"] = _ratings(
+        df["team_game_score"], df["opp_team_game_score"], df["possessions"]
     )
-    fg3_roll_10 = g["fg3"].transform(
-        lambda s: s.shift(1).rolling(10, min_periods=1).sum()
+    return df
+
+
+def add_features(df, windows=ROLL_WINDOWS, halflives=EWM_HALFLIVES, backend=None):
+    """Per-game columns plus each team's stats over its earlier games.
+
+    ``windows`` (games, ``BASE_WINDOW`` always included) and ``halflives``
+    pick the rolling and EWMA columns; ``backend`` picks the kernel
+    (``feature_kernels.BACKENDS``, default numba when installed).
+    """
+    df = add_game_columns(_nullable_to_float(df.copy()))
+
+    # Sort once; every windowed stat below is over each team-season's
+    # earlier rows in this order.
+    df = df.sort_values(["season", "team_id", "date"])
+    keys = [df["season"].to_numpy(), df["team_id"].to_numpy()]
+    first = group_first_rows(keys)
+
+    # Cumulative ratings up to prior game
+    totals = PriorWindows(df[["team_game_score", "opp_team_game_score", "possessions"]], first)
+    df["cum_off_rtg"], df["cum_def_rtg"], df["cum_net_rtg"] = _cumulative_ratings(totals)
+
+    # Cumulative ratings home and away
+    df["home_cum_net_rtg"], df["away_cum_net_rtg"], df["home_road_split"] = _split_net_ratings(
+        totals, df["is_Home"].to_numpy()
     )
-    fga_roll_10 = g["fga"].transform(
-        lambda s: s.shift(1).rolling(10, min_periods=1).sum()
+
+    # Every rolling input, window and half-life in one pass: win, the eFG
+    # inputs and ROLL_COLS.
+    efg_cols = ["fg", "fg3", "fga"]
+    windows = sorted(set(windows) | {BASE_WINDOW})
+    sums, counts, ewm = prior_window_stats(
+        df[["win"] + efg_cols + ROLL_COLS], first, windows, halflives, backend
     )
-    df["efg_pct_last_10"] = (fg_roll_10 + 0.5 * fg3_roll_10) / fga_roll_10
+    means = _prior_means(sums, counts)
+    sums = _prior_sums(sums, counts)
+    at = {window: i for i, window in enumerate(windows)}
+    rolled = {}
 
-    df["efg_pct_last_10"] = df["efg_pct_last_10"].fillna(0)
+    # Win pct
+    rolled[f"win_pct_last_{BASE_WINDOW}"] = means[at[BASE_WINDOW], :, 0]
+
+    # Weighted eFG%
+    for window in windows:
+        rolled[f"efg_pct_last_{window}"] = _efg_pct(*sums[at[window], :, 1:4].T)
 
     # Rolling stats
-    roll_cols = [
-        "fta",
-        "ast",
-        "trb",
-        "orb",
-        "tov",
-        "team_game_score",
-        "opp_team_game_score",
-        "score_diff",
-        "possessions",
-    ]
-    for col in roll_cols:
-        df[f"avg_{col}_last_5"] = roll_mean(col, 5)
-        df[f"avg_{col}_last_10"] = roll_mean(col, 10)
-
-    # Fill NaNs
-    fill_cols = (
-        [f"avg_{c}_last_5" for c in roll_cols]
-        + [f"avg_{c}_last_10" for c in roll_cols]
-    )
-    df[fill_cols] = df[fill_cols].fillna(0)
+    for i, col in enumerate(ROLL_COLS):
+        for window in windows:
+            rolled[f"avg_{col}_last_{window}"] = means[at[window], :, 4 + i]
+
+    # Exponentially weighted stats
+    for i, col in enumerate(ROLL_COLS):
+        for j, halflife in enumerate(halflives):
+            rolled[f"ewm_{col}_hl_{halflife:g}"] = ewm[j, :, 4 + i]
+
+    # Fill NaNs, then add the columns in one concat
+    rolled = {name: _fill_zero(v) for name, v in rolled.items()}
+    df = pd.concat([df, pd.DataFrame(rolled, index=df.index)], axis=1)
 
     # Rest days
-    df["prev_game_date"] = g["date"].shift(1)
-    df["rest_days"] = (df["date"] - df["prev_game_date"]).dt.days
-    df["rest_days"] = df["rest_days"].fillna(7)
+    df["prev_game_date"], df["rest_days"] = _rest_days(df["date"], first)
 
     return df
 
 
-def add_opponent_features(all_df):
-    df = all_df.copy()
-
-    opp_cols = [
-        "opp_name_abbr",
-        "date",
-        "opp_team_game_score",
-        "rest_days",
-        "win_pct_last_10",
-        "efg_pct_last_5",
-        "efg_pct_last_10",
-        "avg_fta_last_5",
-        "avg_fta_last_10",
-        "avg_ast_last_5",
-        "avg_ast_last_10",
-        "avg_trb_last_5",
-        "avg_trb_last_10",
-        "avg_orb_last_5",
-        "avg_orb_last_10",
-        "avg_tov_last_5",
-        "avg_tov_last_10",
-        "avg_team_game_score_last_5",
-        "avg_team_game_score_last_10",
-        "avg_opp_team_game_score_last_5",
-        "avg_opp_team_game_score_last_10",
-        "avg_score_diff_last_5",
-        "avg_score_diff_last_10",
-        "avg_possessions_last_5",
-        "avg_possessions_last_10",
-        "cum_off_rtg",
-        "cum_def_rtg",
-        "cum_net_rtg",
-        "home_cum_net_rtg",
-        "away_cum_net_rtg",
-        "home_road_split",
-    ]
+def _take(series, positions):
+    """Values of ``series`` at ``positions``, keeping categorical and nullable dtypes."""
+    if isinstance(series.dtype, np.dtype):
+        return series.to_numpy()[positions]
+    return series.array.take(positions)
 
-    opp_df = df[opp_cols].add_prefix("opp_")
 
-    merged = pd.merge(
-        df,
-        opp_df,
-        left_on=["date", "school_name", "team_game_score"],
-        right_on=["opp_date", "opp_opp_name_abbr", "opp_opp_team_game_score"],
-        how="left",
+def add_opponent_features(all_df):
+    df = all_df
+
+    opp_cols = (
+        ["opp_name_abbr", "date", "opp_team_game_score", "rest_days", f"win_pct_last_{BASE_WINDOW}"]
+        + [col for col in df.columns if ROLLING_FEATURE.fullmatch(col)]
+        + [
+            "cum_off_rtg",
+            "cum_def_rtg",
+            "cum_net_rtg",
+            "home_cum_net_rtg",
+            "away_cum_net_rtg",
+            "home_road_split",
+        ]
+        + RATING_COLUMNS
+        + SOS_COLUMNS
     )
 
-    merged["avg_score_comp_last_10"] = (
-        merged["avg_team_game_score_last_10"]
-        - merged["opp_avg_team_game_score_last_10"]
-    )
-    merged["efg_comp_last_10"] = (
-        merged["efg_pct_last_10"] - merged["opp_efg_pct_last_10"]
-    )
-    merged["avg_tov_comp_last_10"] = (
-        merged["avg_tov_last_10"] - merged["opp_avg_tov_last_10"]
-    )
-    merged["avg_orb_comp_last_10"] = (
-        merged["avg_orb_last_10"] - merged["opp_avg_orb_last_10"]
-    )
-    merged["avg_fta_comp_last_10"] = (
-        merged["avg_fta_last_10"] - merged["opp_avg_fta_last_10"]
-    )
-    merged["rest_days_comp"] = merged["rest_days"] - merged["opp_rest_days"]
-    merged["net_rtg_comp"] = merged["cum_net_rtg"] - merged["opp_cum_net_rtg"]
-    merged["home_road_split_comp"] = merged["home_road_split"] - merged["opp_home_road_split"]
-    merged["pace_mismatch_signed"] = merged["avg_possessions_last_10"] - merged["opp_avg_possessions_last_10"]
-    merged["net_rtg_home_interaction"] = merged["net_rtg_comp"] * merged["is_Home"]
-    
+    # Rows without an opponent row are dropped.
+    mirror, matched = _opponent_rows(df["game_id"].to_numpy(), df["team_id"].to_numpy())
+    positions = mirror[matched]
+    opp_df = pd.DataFrame({f"opp_{col}": _take(df[col], positions) for col in opp_cols})
+    if not matched.all():
+        df = df[matched]
+    merged = pd.concat([df.reset_index(drop=True), opp_df], axis=1)
 
-    merged = merged.dropna(subset=["avg_score_comp_last_10"])
+    for name, column in COMP_FEATURES.items():
+        merged[name] = merged[column] - merged[f"opp_{column}"]
+    merged["net_rtg_home_interaction"] = _home_interaction(merged["net_rtg_comp"], merged["is_Home"])
 
     return merged
 
@@ -337,102 +466,489 @@ def _resolve_base_dir():
     return base_dir
 
 
-def create_features(only_season=None, base_dir=None):
-    base_dir = Path(base_dir) if base_dir is not None else _resolve_base_dir()
-    data_dir = base_dir / "data"
+# Modules whose source keys each cached stage. Every module a stage runs is
+# hashed whole, so an edit anywhere in it (a kernel, a schema dtype table, a
+# solver setting) makes that stage and the ones after it miss.
+_THIS_MODULE = sys.modules[__name__]
+STAGE_MODULES = {
+    "clean": [_THIS_MODULE, teams],
+    "possessions": [_THIS_MODULE, schema],
+    "features": [_THIS_MODULE, feature_kernels, schema],
+    "ratings": [_THIS_MODULE, ratings, teams, schema],
+    "schedule": [_THIS_MODULE, schedule_strength, teams, schema],
+    "opponent": [_THIS_MODULE, feature_kernels, schema],
+}
+
+
+def build_season_features(
+    season_df,
+    valid_schools,
+    cache,
+    windows=ROLL_WINDOWS,
+    halflives=EWM_HALFLIVES,
+    registry=None,
+):
+    """Run the six feature stages on one season through the stage cache.
+
+    Every stage groups or joins within a season, so seasons are independent;
+    ``valid_schools`` is passed in so cleaning matches an all-season run.
+    ``windows`` and ``halflives`` go to ``add_features`` and its cache key;
+    ``registry`` (default: ids numbered over ``valid_schools``) gives the team ids.
+    """
+    if registry is None:
+        registry = TeamRegistry.from_names(valid_schools)
+    season = int(season_df["season"].dropna().iloc[0])
+    key = frame_key(season_df)
+    # Only the season's own opponents decide what cleaning keeps, so the key
+    # doesn't change when schools from other seasons come and go.
+    opponents = set(_rename_teams(season_df["opp_name_abbr"], RENAME_MAP).dropna().unique())
+    kept_opponents = sorted(opponents & valid_schools)
+    schools = set(_strip_ncaa_suffix(season_df["school_name"]).dropna().unique())
+    names = sorted(schools | set(kept_opponents))
+    team_ids = dict(zip(names, registry.ids(names).tolist()))
+
+    # Each stage's output is narrowed to the compact schema before the next
+    # one copies it, which keeps the peak near one compact frame.
+    clean_df, key = cache.run(
+        "clean",
+        season,
+        key,
+        lambda: clean_gamelogs(season_df, valid_schools=valid_schools, registry=registry),
+        code=STAGE_MODULES["clean"],
+        params={
+            "kept_opponents": kept_opponents,
+            "rename_map": RENAME_MAP,
+            "team_ids": team_ids,
+        },
+    )
+    merged_df, key = cache.run(
+        "possessions",
+        season,
+        key,
+        lambda: compact_frame(calculate_possessions(clean_df)),
+        code=STAGE_MODULES["possessions"],
+    )
+    del clean_df
+    added_df, key = cache.run(
+        "features",
+        season,
+        key,
+        lambda: compact_frame(add_features(merged_df, windows, halflives)),
+        code=STAGE_MODULES["features"],
+        params={"windows": sorted(windows), "halflives": list(halflives)},
+    )
+    del merged_df
+    rated_df, key = cache.run(
+        "ratings",
+        season,
+        key,
+        lambda: compact_frame(add_adjusted_ratings(added_df)),
+        code=STAGE_MODULES["ratings"],
+    )
+    del added_df
+    scheduled_df, key = cache.run(
+        "schedule",
+        season,
+        key,
+        lambda: compact_frame(add_schedule_strength(rated_df)),
+        code=STAGE_MODULES["schedule"],
+    )
+    del rated_df
+    opp_df, _ = cache.run(
+        "opponent",
+        season,
+        key,
+        lambda: compact_frame(add_opponent_features(scheduled_df)),
+        code=STAGE_MODULES["opponent"],
+    )
+    return opp_df
+
+
+def _season_features_job(season, valid_schools, registry, base_dir, use_cache):
+    """One season's feature build in a worker process.
+
+    The worker reads its own season from the store so only finished feature
+    frames cross the process boundary; returns (frame, hits, misses).
+    """
+    season_df = read_gamelogs([season], base_dir=base_dir)
+    if season_df.empty:
+        return None, [], []
+    cache = StageCache(base_dir, enabled=use_cache)
+    frame = build_season_features(season_df, valid_schools, cache, registry=registry)
+    return frame, cache.hits, cache.misses
 
-    if only_season == 2026:
-        all_df = pd.read_excel(
-            data_dir / "2026" / "NCAAB_2026_Team_Gamelogs_now.xlsx", index_col=False
-        )
-    else:
-        df_2023 = pd.read_csv(data_dir / "2023" / "gamelogs_2023.csv", index_col=False)
-        df_2024 = pd.read_csv(data_dir / "2024" / "gamelogs_2024.csv", index_col=False)
-        df_2025 = pd.read_csv(data_dir / "2025" / "gamelogs_2025.csv", index_col=False)
-        df_2026 = pd.read_excel(
-            data_dir / "2026" / "NCAAB_2026_Team_Gamelogs_now.xlsx",
-            index_col=False,
-        )
-        all_df = pd.concat([df_2023, df_2024, df_2025, df_2026], ignore_index=True)
 
-    clean_df = clean_gamelogs(all_df)
-    merged_df = calculate_possessions(clean_df)
-    added_df = add_features(merged_df)
-    merged_df = add_opponent_features(added_df)
+def _csv_text(frame, header):
+    return frame.to_csv(index=False, header=header)
 
+
+def _csv_blocks(df, pool, blocks):
+    """Futures of ``df`` formatted as CSV text in ``blocks`` row blocks."""
+    blocks = max(min(blocks, len(df)), 1)
+    bounds = np.linspace(0, len(df), blocks + 1).astype(int)
+    return [
+        pool.submit(_csv_text, df.iloc[lo:hi], lo == 0)
+        for lo, hi in zip(bounds[:-1], bounds[1:])
+    ]
+
+
+def create_features(only_season=None, base_dir=None, use_cache=True, workers=1):
+    """Build the feature CSV; unchanged seasons and stages come from the stage cache.
+
+    With ``workers`` above one, seasons are built in a process pool, which
+    then formats the CSV in row blocks while this process fills the
+    warehouse. Every stage groups and joins within a season, so the shards
+    need nothing from each other but the all-season ``valid_schools`` set
+    and the team registry, which is loaded (and extended) once here.
+    """
+    base_dir = Path(base_dir) if base_dir is not None else _resolve_base_dir()
+    data_dir = base_dir / "data"
+
+    seasons = [2026] if only_season == 2026 else TRAINING_SEASONS
     output_path = (
         data_dir / "2026" / "features_2026.csv"
         if only_season == 2026
         else data_dir / "merged_dataset.csv"
     )
-    merged_df.to_csv(output_path, index=False)
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    workers = max(workers or 1, 1)
+    if workers > 1:
+        names = read_gamelogs(seasons, columns=["school_name"], base_dir=base_dir)
+        valid_schools = set(_strip_ncaa_suffix(names["school_name"]).dropna().unique())
+        del names
+        registry = load_team_registry(valid_schools, base_dir=base_dir)
+        frames, hits, misses = [], [], []
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            jobs = [
+                pool.submit(
+                    _season_features_job, season, valid_schools, registry, base_dir, use_cache
+                )
+                for season in seasons
+            ]
+            for job in jobs:
+                frame, season_hits, season_misses = job.result()
+                if frame is not None:
+                    frames.append(frame)
+                hits += season_hits
+                misses += season_misses
+            merged_df = compact_frame(pd.concat(frames, ignore_index=True))
+            del frames
+            texts = _csv_blocks(merged_df, pool, workers)
+            # The warehouse insert runs here while the workers format the CSV.
+            store_team_features(merged_df, base_dir=base_dir)
+            with open(output_path, "w", encoding="utf-8", newline="") as handle:
+                handle.writelines(text.result() for text in texts)
+    else:
+        all_df = read_gamelogs(seasons, base_dir=base_dir)
+        valid_schools = set(_strip_ncaa_suffix(all_df["school_name"]).dropna().unique())
+        registry = load_team_registry(valid_schools, base_dir=base_dir)
+
+        cache = StageCache(base_dir, enabled=use_cache)
+        frames = [
+            build_season_features(season_df, valid_schools, cache, registry=registry)
+            for _, season_df in all_df.groupby("season", observed=True, sort=True)
+        ]
+        del all_df
+        hits, misses = cache.hits, cache.misses
+        merged_df = compact_frame(pd.concat(frames, ignore_index=True))
+        del frames
+        merged_df.to_csv(output_path, index=False)
+        store_team_features(merged_df, base_dir=base_dir)
+    # The Arrow cache parses the CSV back in; don't hold both copies.
+    del merged_df
+    print(f"Stage cache: {len(hits)} hits, {len(misses)} misses")
+
+    build_matrix_cache(output_path)
     print(f"Saved: {output_path}")
 
 
+# Box-score stats that appear once for the team and once with an "opp_" prefix.
+MIRROR_STATS = [
+    "team_game_score",
+    "fg",
+    "fga",
+    "fg_pct",
+    "fg3",
+    "fg3a",
+    "fg3_pct",
+    "fg2",
+    "fg2a",
+    "fg2_pct",
+    "efg_pct",
+    "ft",
+    "fta",
+    "ft_pct",
+    "orb",
+    "drb",
+    "trb",
+    "ast",
+    "stl",
+    "blk",
+    "tov",
+    "pf",
+]
+
+MIRROR_LOCATION = {"": "@", "@": "", "N": "N"}
+MIRROR_RESULT = {"W": "L", "L": "W", "": ""}
+
+
+def mirror_gamelog_row(row, school_slug, school_name, opp_name):
+    """Rebuild the opponent's gamelog row by swapping team/opp columns.
+
+    Returns None when the row can't be mirrored (unknown location/result).
+    """
+    location = row.get("game_location") or ""
+    result = row.get("team_game_result") or ""
+    if location not in MIRROR_LOCATION or result not in MIRROR_RESULT:
+        return None
+
+    mirrored = dict(row)
+    mirrored["school_slug"] = school_slug
+    mirrored["school_name"] = school_name
+    mirrored["opp_name_abbr"] = opp_name
+    mirrored["game_location"] = MIRROR_LOCATION[location]
+    mirrored["team_game_result"] = MIRROR_RESULT[result]
+    for stat in MIRROR_STATS:
+        mirrored[stat] = row.get(f"opp_{stat}")
+        mirrored[f"opp_{stat}"] = row.get(stat)
+    return mirrored
+
+
+def plan_date_update(df, target_date, season):
+    """Pick one team per game on target_date to scrape; mirror the other side.
+
+    Returns (scrape, mirrors): ``scrape`` lists (slug, name) pairs and
+    ``mirrors`` maps each mirrored slug to (name, scraped slug, scraped name).
+    """
+    season_df = df[df["season"] == season]
+    slug_by_name = (
+        season_df.dropna(subset=["school_name", "school_slug"])
+        .drop_duplicates("school_name")
+        .set_index("school_name")["school_slug"]
+    )
+    today = (
+        season_df.loc[
+            season_df["date"] == target_date,
+            ["school_slug", "school_name", "opp_name_abbr"],
+        ]
+        .dropna(subset=["school_slug", "school_name"])
+        .drop_duplicates("school_slug")
+    )
+    name_by_slug = dict(zip(today["school_slug"], today["school_name"]))
+    opp_by_slug = dict(zip(today["school_slug"], today["opp_name_abbr"]))
+
+    scrape, mirrors, planned = [], {}, set()
+    for slug in sorted(name_by_slug):
+        if slug in planned:
+            continue
+        name = name_by_slug[slug]
+        opp_slug = slug_by_name.get(opp_by_slug[slug])
+        if opp_slug is None or opp_slug in planned or opp_by_slug.get(opp_slug) != name:
+            scrape.append((slug, name))
+            planned.add(slug)
+            continue
+
+        # Alternate which side gets scraped so no team is always mirrored.
+        pair = sorted([slug, opp_slug])
+        if zlib.crc32(f"{target_date.date()}|{pair[0]}".encode()) % 2:
+            pair.reverse()
+        scraped_slug, mirrored_slug = pair
+        scrape.append((scraped_slug, name_by_slug[scraped_slug]))
+        mirrors[mirrored_slug] = (
+            name_by_slug[mirrored_slug],
+            scraped_slug,
+            name_by_slug[scraped_slug],
+        )
+        planned.update(pair)
+
+    return scrape, mirrors
+
+
+def build_mirrored_rows(scraped, mirrors, df, target_date, rename_map=RENAME_MAP):
+    """Mirror scraped games onto the unscraped side of each pairing.
+
+    ``scraped`` maps slug -> scraped rows. A mirrored team needs its completed
+    row for target_date and its next scheduled game, taken from a scraped
+    team's upcoming row that names it as the opponent. Teams missing either,
+    or with an earlier upcoming game known from the stored rows, are returned
+    in ``fallback`` for a direct scrape.
+    """
+    completed, upcoming = {}, {}
+    for rows in scraped.values():
+        for row in rows:
+            opp_name = rename_map.get(row.get("opp_name_abbr"), row.get("opp_name_abbr"))
+            row_date = pd.to_datetime(row.get("date"), errors="coerce")
+            if pd.isna(row_date):
+                continue
+            row_date = row_date.normalize()
+            if row_date == target_date and row.get("team_game_result"):
+                completed[(row["school_name"], opp_name)] = row
+            elif row_date > target_date and not row.get("team_game_result"):
+                best = upcoming.get(opp_name)
+                if best is None or row_date < best[0]:
+                    upcoming[opp_name] = (row_date, row)
+
+    # Upcoming games other teams already have stored against a mirrored team.
+    stored_future = df[(df["date"] > target_date) & df["team_game_result"].isna()]
+    known_next = stored_future.groupby("opp_name_abbr")["date"].min()
+
+    stored = df[df["date"] == target_date].drop_duplicates("school_slug")
+    stored = stored.set_index("school_slug")
+
+    mirrored_rows, fallback = [], []
+    for slug, (name, _, scraped_name) in mirrors.items():
+        row = completed.get((scraped_name, name))
+        game = row and mirror_gamelog_row(row, slug, name, scraped_name)
+        next_date, next_row = upcoming.get(name, (None, None))
+        next_game = next_row and mirror_gamelog_row(
+            next_row, slug, name, next_row["school_name"]
+        )
+        game_num = pd.to_numeric(
+            stored["team_game_num_season"].get(slug), errors="coerce"
+        )
+        if (
+            not game
+            or not next_game
+            or pd.isna(game_num)
+            or known_next.get(name, next_date) < next_date
+        ):
+            fallback.append((slug, name))
+            continue
+
+        game["team_game_num_season"] = str(int(game_num))
+        next_game["team_game_num_season"] = str(int(game_num) + 1)
+        if "ranker" in stored.columns and pd.notna(stored.at[slug, "ranker"]):
+            ranker = int(stored.at[slug, "ranker"])
+            game["ranker"] = str(ranker)
+            next_game["ranker"] = str(ranker + 1)
+        mirrored_rows.extend([game, next_game])
+
+    return mirrored_rows, fallback
+
+
 def update_gamelogs_for_date(
-    input_path, output_path, target_date, season, sleep_seconds=6, max_teams=None
+    input_path,
+    output_path,
+    target_date,
+    season,
+    max_teams=None,
+    workers=DEFAULT_WORKERS,
+    requests_per_minute=None,
+    mirror=True,
+    base_dir=None,
 ):
-    df = pd.read_excel(input_path, index_col=False)
+    """Rescrape the teams that played on ``target_date`` and store the season.
+
+    Gamelogs come from the Parquet store unless ``input_path`` names a legacy
+    CSV/xlsx to seed it from; ``output_path`` adds an xlsx export of the
+    season. Only the touched teams are rewritten, and the keys of the rows that
+    changed are returned (see ``storage.upsert_gamelogs``). Team names are
+    resolved to ids here, against the saved registry that new schools extend.
+    """
+    if input_path is not None:
+        df = read_legacy_gamelogs(input_path)
+        registry = load_team_registry(
+            _strip_ncaa_suffix(df["school_name"]).dropna().unique(), base_dir=base_dir
+        )
+        df = clean_gamelogs(df, registry=registry)
+        write_gamelogs(df[df["season"] == season], base_dir=base_dir)
+    else:
+        df = read_gamelogs([season], base_dir=base_dir)
     df["date"] = pd.to_datetime(df["date"]).dt.normalize()
+    source = input_path or f"the {season} gamelog store"
 
     target_date = pd.to_datetime(target_date).normalize()
     teams_today = df.loc[df["date"] == target_date, ["school_slug", "school_name"]]
     teams_today = teams_today.dropna().drop_duplicates()
 
     if teams_today.empty:
-        print(f"No teams found for {target_date.date()} in {input_path}")
-        return
+        print(f"No teams found for {target_date.date()} in {source}")
+        return set()
 
     if max_teams is not None:
         teams_today = teams_today.head(max_teams)
+        mirror = False
         print(f"Checker mode: scraping first {len(teams_today)} teams for {target_date.date()}")
 
-    updated_rows = []
-    for i, row in teams_today.reset_index(drop=True).iterrows():
-        slug = row["school_slug"]
-        name = row["school_name"]
-        print(f"{i + 1}/{len(teams_today)}  Updating {slug}")
-        updated_rows.extend(scrape_team_gamelog(slug, season, name))
-        sleep(sleep_seconds)
+    if requests_per_minute is not None:
+        set_rate_limit(requests_per_minute)
 
-    updated_df = pd.DataFrame(updated_rows)
-    if updated_df.empty:
-        print("No updated rows scraped; leaving file unchanged.")
-        return
+    if mirror:
+        to_scrape, mirrors = plan_date_update(df, target_date, season)
+        print(
+            f"Plan: scraping {len(to_scrape)} teams, mirroring {len(mirrors)} "
+            f"for {target_date.date()}"
+        )
+    else:
+        to_scrape = list(zip(teams_today["school_slug"], teams_today["school_name"]))
+        mirrors = {}
 
-    # Replace rows for updated teams in this season with fresh scrape
-    updated_slugs = set(teams_today["school_slug"].tolist())
-    keep_mask = ~(
-        (df["season"] == season) & (df["school_slug"].isin(updated_slugs))
+    scraped = dict(
+        zip(
+            [slug for slug, _ in to_scrape],
+            scrape_teams(to_scrape, season, workers=workers),
+        )
     )
-    merged = pd.concat([df[keep_mask], updated_df], ignore_index=True)
-    merged = clean_gamelogs(merged)
+    mirrored_rows, fallback = build_mirrored_rows(scraped, mirrors, df, target_date)
+    if fallback:
+        print(f"Could not mirror {len(fallback)} teams; scraping them directly")
+        scraped.update(
+            zip(
+                [slug for slug, _ in fallback],
+                scrape_teams(fallback, season, workers=workers),
+            )
+        )
 
-    merged.to_excel(output_path, index=False)
-    print(f"Saved: {output_path}")
+    updated_rows = [row for rows in scraped.values() for row in rows]
+    updated_df = pd.DataFrame(updated_rows + mirrored_rows)
+    if updated_df.empty:
+        print("No updated rows scraped; leaving the store unchanged.")
+        return set()
+
+    # Replace rows for scraped teams in this season with the fresh scrape,
+    # and rows from target_date on for teams rebuilt from a mirrored game.
+    # A team whose scrape came back empty keeps its stored rows.
+    replace = {slug: target_date for slug in mirrors if slug not in scraped}
+    replace.update({slug: None for slug, rows in scraped.items() if rows})
+
+    school_names = _strip_ncaa_suffix(updated_df["school_name"].astype(str))
+    valid_schools = set(df["school_name"].dropna()) | set(school_names)
+    registry = load_team_registry(valid_schools, base_dir=base_dir)
+    updated_df = clean_gamelogs(updated_df, valid_schools=valid_schools, registry=registry)
+
+    changed = upsert_gamelogs(updated_df, season, replace=replace, base_dir=base_dir)
+    if changed:
+        sync_games(season, {key[1] for key in changed}, base_dir=base_dir)
+    if output_path is not None:
+        export_xlsx(read_gamelogs([season], base_dir=base_dir), output_path)
+    return changed
 
 
 def update_gamelogs_by_date(
-    target_date, season=2026, input_path=None, output_path=None, max_teams=None
+    target_date,
+    season=2026,
+    input_path=None,
+    output_path=None,
+    max_teams=None,
+    workers=DEFAULT_WORKERS,
+    requests_per_minute=None,
+    mirror=True,
+    export_xlsx=False,
 ):
     base_dir = _resolve_base_dir()
     data_dir = base_dir / "data" / str(season)
 
-    input_path = (
-        Path(input_path)
-        if input_path
-        else data_dir / f"NCAAB_{season}_Team_Gamelogs_now.xlsx"
-    )
-    output_path = (
-        Path(output_path)
-        if output_path
-        else data_dir / f"NCAAB_{season}_Team_Gamelogs_now.xlsx"
-    )
+    if output_path is None and export_xlsx:
+        output_path = data_dir / f"NCAAB_{season}_Team_Gamelogs_now.xlsx"
 
-    update_gamelogs_for_date(
+    return update_gamelogs_for_date(
         input_path=input_path,
         output_path=output_path,
         target_date=target_date,
         season=season,
         max_teams=max_teams,
+        workers=workers,
+        requests_per_minute=requests_per_minute,
+        mirror=mirror,
+        base_dir=base_dir,
     )
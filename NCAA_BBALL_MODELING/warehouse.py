@@ -0,0 +1,442 @@
+"""Embedded SQLite warehouse for gamelogs, features, KenPom spreads and predictions.
+
+One file, ``<base_dir>/data/warehouse.sqlite``, holds a table per kind of
+state. Each table has indexes on the keys consumers look up by (date, team,
+season), so a single date or team is an indexed query, not a full file scan.
+
+    games           one row per team-game, mirrored from the gamelog store
+    team_features   one row per team-game from ``create_features``
+    kenpom_spreads  one row per (date, team_a, team_b) from KenPom FanMatch
+    predictions     one row per (date, school_name, opp_name_abbr)
+
+Dates are stored as ``YYYY-MM-DD`` text. Writers replace whole scopes
+(seasons, teams or dates) inside a transaction. Readers return frames with
+the compact schema applied. The CSV/Parquet files stay the source of record;
+``build_warehouse`` loads whatever already exists into a fresh database.
+"""
+
+from __future__ import annotations
+
+import sqlite3
+from contextlib import closing
+from pathlib import Path
+from typing import Iterable, Iterator, Optional
+
+import numpy as np
+import pandas as pd
+
+try:
+    from .schema import compact_frame
+except ImportError:
+    from schema import compact_frame
+
+
+WAREHOUSE_FILENAME = "warehouse.sqlite"
+
+# Values (rows x columns) converted to Python objects at a time while
+# inserting: ~1,700 rows of the 149-column feature matrix, ~8 MB.
+RECORD_CHUNK_CELLS = 250_000
+
+# Columns indexed per table; the first entry is the table's unique key.
+TABLE_INDEXES = {
+    "games": [
+        ["season", "school_slug", "date", "team_game_num_season"],
+        ["date"],
+        ["school_name", "date"],
+    ],
+    "team_features": [
+        ["season", "school_name", "date", "team_game_num_season"],
+        ["date"],
+        ["school_name", "date"],
+        ["game_id"],
+    ],
+    "kenpom_spreads": [
+        ["date", "team_a", "team_b"],
+        ["date", "kenpom_favorite"],
+    ],
+    "predictions": [
+        ["date", "school_name", "opp_name_abbr"],
+        ["school_name", "date"],
+    ],
+}
+
+
+def _resolve_base_dir(base_dir=None) -> Path:
+    if base_dir is not None:
+        return Path(base_dir)
+    return Path(__file__).resolve().parent
+
+
+def warehouse_path(base_dir=None) -> Path:
+    return _resolve_base_dir(base_dir) / "data" / WAREHOUSE_FILENAME
+
+
+def connect(base_dir=None) -> sqlite3.Connection:
+    path = warehouse_path(base_dir)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(path)
+    conn.execute("PRAGMA journal_mode=WAL")
+    return conn
+
+
+def _quote(name: str) -> str:
+    return '"' + str(name).replace('"', '""') + '"'
+
+
+def _sql_type(dtype) -> str:
+    if isinstance(dtype, pd.CategoricalDtype):
+        dtype = dtype.categories.dtype
+    if pd.api.types.is_bool_dtype(dtype) or pd.api.types.is_integer_dtype(dtype):
+        return "INTEGER"
+    if pd.api.types.is_numeric_dtype(dtype):
+        return "REAL"
+    return "TEXT"
+
+
+def _date_text(values) -> pd.Series:
+    dates = pd.to_datetime(pd.Series(values), errors="coerce")
+    return dates.dt.strftime("%Y-%m-%d")
+
+
+def _python_values(series: pd.Series) -> list:
+    """``series`` as plain Python scalars, None for missing."""
+    missing = series.isna().to_numpy()
+    if isinstance(series.dtype, np.dtype) and series.dtype.kind in "biuf":
+        values = series.to_numpy().tolist()
+    else:
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            # Gathered through the codes so integer categories stay integers;
+            # code -1 (missing) picks the trailing None.
+            categories = np.append(series.cat.categories.to_numpy(dtype=object), None)
+            objects = categories.take(series.cat.codes.to_numpy())
+        else:
+            objects = series.to_numpy(dtype=object)
+        values = [
+            value.item() if isinstance(value, np.generic) else value for value in objects.tolist()
+        ]
+    for position in np.flatnonzero(missing).tolist():
+        values[position] = None
+    return values
+
+
+def _records(df: pd.DataFrame, chunk_cells: int = RECORD_CHUNK_CELLS) -> Iterator[tuple]:
+    """Plain-Python rows (None for missing) ready for sqlite3, converted a chunk at a time.
+
+    Only about ``chunk_cells`` values exist as Python objects at once, so
+    inserting a compact frame doesn't cost several times the frame itself.
+    """
+    chunk_rows = max(chunk_cells // max(len(df.columns), 1), 1)
+    for start in range(0, len(df), chunk_rows):
+        chunk = df.iloc[start : start + chunk_rows]
+        columns = []
+        for column in chunk.columns:
+            series = chunk[column]
+            if column == "date" or pd.api.types.is_datetime64_any_dtype(series.dtype):
+                series = _date_text(series)
+            columns.append(_python_values(series))
+        yield from zip(*columns)
+
+
+def table_columns(conn: sqlite3.Connection, table: str) -> list[str]:
+    return [row[1] for row in conn.execute(f"PRAGMA table_info({_quote(table)})")]
+
+
+def _ensure_table(conn: sqlite3.Connection, table: str, df: pd.DataFrame) -> None:
+    """Create ``table`` (and its indexes) or add any columns it is missing."""
+    existing = table_columns(conn, table)
+    if not existing:
+        columns = ", ".join(f"{_quote(col)} {_sql_type(df[col].dtype)}" for col in df.columns)
+        conn.execute(f"CREATE TABLE {_quote(table)} ({columns})")
+        for i, index in enumerate(TABLE_INDEXES.get(table, [])):
+            if not set(index) <= set(df.columns):
+                continue
+            unique = "UNIQUE " if i == 0 else ""
+            conn.execute(
+                f"CREATE {unique}INDEX {_quote(f'{table}_by_' + '_'.join(index))} "
+                f"ON {_quote(table)} ({', '.join(_quote(col) for col in index)})"
+            )
+        return
+    for column in df.columns:
+        if column not in existing:
+            conn.execute(
+                f"ALTER TABLE {_quote(table)} ADD COLUMN {_quote(column)} "
+                f"{_sql_type(df[column].dtype)}"
+            )
+
+
+def replace_rows(
+    table: str,
+    df: pd.DataFrame,
+    scope: Optional[dict[str, Iterable]] = None,
+    *,
+    base_dir=None,
+) -> int:
+    """Delete the rows of ``table`` in ``scope``, then insert ``df``.
+
+    ``scope`` maps column -> values; rows matching any value of every listed
+    column are replaced (e.g. ``{"season": [2026]}``). Without a scope the
+    table is replaced wholesale. Returns the number of rows inserted.
+    """
+    columns = list(df.columns)
+    with closing(connect(base_dir)) as conn, conn:
+        _ensure_table(conn, table, df)
+        if scope is None:
+            conn.execute(f"DELETE FROM {_quote(table)}")
+        else:
+            clauses, params = [], []
+            for column, values in scope.items():
+                values = list(values)
+                if column == "date":
+                    values = _date_text(values).tolist()
+                if not values:
+                    return 0
+                clauses.append(f"{_quote(column)} IN ({', '.join('?' * len(values))})")
+                params.extend(value.item() if isinstance(value, np.generic) else value for value in values)
+            conn.execute(f"DELETE FROM {_quote(table)} WHERE {' AND '.join(clauses)}", params)
+        if len(df):
+            placeholders = ", ".join("?" * len(columns))
+            names = ", ".join(_quote(col) for col in columns)
+            conn.executemany(
+                f"INSERT OR REPLACE INTO {_quote(table)} ({names}) VALUES ({placeholders})",
+                _records(df),
+            )
+    return len(df)
+
+
+def has_table(table: str, base_dir=None) -> bool:
+    if not warehouse_path(base_dir).exists():
+        return False
+    with closing(connect(base_dir)) as conn:
+        return bool(table_columns(conn, table))
+
+
+def query(
+    table: str,
+    where: str = "",
+    params: Iterable = (),
+    *,
+    columns: Optional[list[str]] = None,
+    order_by: Optional[list[str]] = None,
+    base_dir=None,
+) -> pd.DataFrame:
+    """``SELECT columns FROM table WHERE ...`` as a compact frame (empty if no table)."""
+    if not has_table(table, base_dir):
+        return pd.DataFrame(columns=columns)
+    with closing(connect(base_dir)) as conn:
+        available = table_columns(conn, table)
+        selected = available if columns is None else [c for c in columns if c in available]
+        sql = f"SELECT {', '.join(_quote(col) for col in selected)} FROM {_quote(table)}"
+        if where:
+            sql += f" WHERE {where}"
+        if order_by:
+            sql += f" ORDER BY {', '.join(_quote(col) for col in order_by)}"
+        df = pd.read_sql_query(sql, conn, params=list(params))
+    for column in df.columns:
+        if column == "date" or column.endswith("_date"):
+            df[column] = pd.to_datetime(df[column])
+    return compact_frame(df)
+
+
+# Writers ---------------------------------------------------------------------
+
+
+def store_games(df: pd.DataFrame, *, base_dir=None) -> int:
+    """Replace the stored games of every (season, team) present in ``df``."""
+    count = 0
+    for season, season_df in df.groupby("season", observed=True):
+        slugs = season_df["school_slug"].dropna().astype(str).unique()
+        count += replace_rows(
+            "games",
+            season_df.assign(school_slug=season_df["school_slug"].astype(str)),
+            {"season": [int(season)], "school_slug": slugs},
+            base_dir=base_dir,
+        )
+    return count
+
+
+def sync_games(season: int, slugs: Optional[Iterable[str]] = None, *, base_dir=None) -> int:
+    """Copy a season's teams (all of them if ``slugs`` is None) from the gamelog store.
+
+    A season the warehouse has never seen is always copied in full.
+    """
+    try:
+        from .storage import read_gamelogs
+    except ImportError:
+        from storage import read_gamelogs
+
+    if slugs is not None:
+        known = query("games", "season = ?", [int(season)], columns=["season"], base_dir=base_dir)
+        if known.empty:
+            slugs = None
+    df = read_gamelogs([season], base_dir=base_dir)
+    if slugs is not None:
+        slugs = {str(slug) for slug in slugs}
+        df = df[df["school_slug"].astype(str).isin(slugs)]
+        # Teams whose rows were all removed still need their old rows cleared.
+        return replace_rows(
+            "games",
+            df.assign(school_slug=df["school_slug"].astype(str)),
+            {"season": [int(season)], "school_slug": sorted(slugs)},
+            base_dir=base_dir,
+        )
+    return replace_rows("games", df, {"season": [int(season)]}, base_dir=base_dir)
+
+
+def store_team_features(df: pd.DataFrame, *, base_dir=None) -> int:
+    """Replace the stored features of every season present in ``df``."""
+    seasons = [int(season) for season in df["season"].dropna().unique()]
+    return replace_rows("team_features", df, {"season": seasons}, base_dir=base_dir)
+
+
+def store_kenpom_spreads(df: pd.DataFrame, *, base_dir=None) -> int:
+    """Replace the stored KenPom spreads of every date present in ``df``."""
+    return replace_rows("kenpom_spreads", df, {"date": df["date"].unique()}, base_dir=base_dir)
+
+
+def store_predictions(df: pd.DataFrame, *, base_dir=None) -> int:
+    """Replace the stored predictions of every date present in ``df``."""
+    return replace_rows("predictions", df, {"date": df["date"].unique()}, base_dir=base_dir)
+
+
+# Query helpers ---------------------------------------------------------------
+
+
+def _in(column: str, values: Iterable) -> tuple[str, list]:
+    values = list(values)
+    return f"{_quote(column)} IN ({', '.join('?' * len(values))})", values
+
+
+def games_on_date(
+    date, season: Optional[int] = None, *, columns: Optional[list[str]] = None, base_dir=None
+) -> pd.DataFrame:
+    """Every stored team-game on ``date`` (optionally within one season)."""
+    where, params = "date = ?", [_date_text([date])[0]]
+    if season is not None:
+        where += " AND season = ?"
+        params.append(int(season))
+    return query("games", where, params, columns=columns, order_by=["school_name"], base_dir=base_dir)
+
+
+def team_history(
+    school_name: str,
+    season: Optional[int] = None,
+    *,
+    before=None,
+    table: str = "games",
+    columns: Optional[list[str]] = None,
+    base_dir=None,
+) -> pd.DataFrame:
+    """One team's rows from ``table`` in date order, optionally before a date."""
+    where, params = "school_name = ?", [school_name]
+    if season is not None:
+        where += " AND season = ?"
+        params.append(int(season))
+    if before is not None:
+        where += " AND date < ?"
+        params.append(_date_text([before])[0])
+    return query(table, where, params, columns=columns, order_by=["date"], base_dir=base_dir)
+
+
+def latest_features(
+    school_names: Optional[Iterable[str]] = None,
+    *,
+    as_of=None,
+    columns: Optional[list[str]] = None,
+    base_dir=None,
+) -> pd.DataFrame:
+    """Each team's most recent ``team_features`` row on or before ``as_of``."""
+    clauses, params = [], []
+    if as_of is not None:
+        clauses.append("date <= ?")
+        params.append(_date_text([as_of])[0])
+    if school_names is not None:
+        clause, names = _in("school_name", school_names)
+        clauses.append(clause)
+        params.extend(names)
+    scope = " AND ".join(clauses) or "1"
+    where = (
+        f"rowid IN (SELECT rowid FROM (SELECT rowid, ROW_NUMBER() OVER ("
+        f"PARTITION BY school_name ORDER BY date DESC, team_game_num_season DESC) AS rn "
+        f"FROM team_features WHERE {scope}) WHERE rn = 1)"
+    )
+    return query(
+        "team_features", where, params, columns=columns, order_by=["school_name"], base_dir=base_dir
+    )
+
+
+def kenpom_spreads(dates: Optional[Iterable] = None, *, base_dir=None) -> pd.DataFrame:
+    """Stored KenPom spreads, limited to ``dates`` when given."""
+    if dates is None:
+        return query("kenpom_spreads", order_by=["date", "team_a", "team_b"], base_dir=base_dir)
+    where, params = _in("date", _date_text(list(dates)).dropna().unique())
+    return query(
+        "kenpom_spreads", where, params, order_by=["date", "team_a", "team_b"], base_dir=base_dir
+    )
+
+
+def prediction_dates(*, base_dir=None) -> list[pd.Timestamp]:
+    if not has_table("predictions", base_dir):
+        return []
+    with closing(connect(base_dir)) as conn:
+        rows = conn.execute("SELECT DISTINCT date FROM predictions ORDER BY date").fetchall()
+    return [pd.Timestamp(row[0]) for row in rows if row[0] is not None]
+
+
+def predictions_on_date(
+    date, *, columns: Optional[list[str]] = None, base_dir=None
+) -> pd.DataFrame:
+    return query(
+        "predictions",
+        "date = ?",
+        [_date_text([date])[0]],
+        columns=columns,
+        order_by=["school_name"],
+        base_dir=base_dir,
+    )
+
+
+# Backfill --------------------------------------------------------------------
+
+
+def build_warehouse(base_dir=None) -> dict[str, int]:
+    """Load the gamelog store and existing CSV outputs into the warehouse.
+
+    Returns rows loaded per table; sources that don't exist are skipped.
+    """
+    try:
+        from .storage import read_gamelogs
+    except ImportError:
+        from storage import read_gamelogs
+
+    data_dir = _resolve_base_dir(base_dir) / "data"
+    loaded = {}
+
+    games = read_gamelogs(base_dir=base_dir)
+    if not games.empty:
+        loaded["games"] = store_games(games, base_dir=base_dir)
+
+    features = [
+        path
+        for path in (data_dir / "merged_dataset.csv", data_dir / "2026" / "features_2026.csv")
+        if path.exists()
+    ]
+    if features:
+        frames = [compact_frame(pd.read_csv(path)) for path in features]
+        # features_2026.csv is the fresher copy of the current season.
+        df = pd.concat(frames, ignore_index=True).drop_duplicates(
+            TABLE_INDEXES["team_features"][0], keep="last"
+        )
+        loaded["team_features"] = store_team_features(df, base_dir=base_dir)
+
+    kenpom_path = data_dir / "kenpom_spreads_history.csv"
+    if kenpom_path.exists():
+        loaded["kenpom_spreads"] = replace_rows(
+            "kenpom_spreads", pd.read_csv(kenpom_path), base_dir=base_dir
+        )
+
+    predictions_path = data_dir / "predictions.csv"
+    if predictions_path.exists():
+        loaded["predictions"] = store_predictions(
+            pd.read_csv(predictions_path), base_dir=base_dir
+        )
+    return loaded